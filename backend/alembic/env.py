@@ -29,6 +29,8 @@ import app.models.user
 import app.models.vocabulary
 import app.models.mnemonic
 import app.models.mnemonic_cache
+import app.models.image_variant
+import app.models.pre_generation_job
 import app.models.user_word_history
 import app.models.crossword
 import app.models.crossword_attempts
@@ -0,0 +1,98 @@
+"""Move mnemonic images to blob store
+
+Revision ID: 8b41d2e6f0a7
+Revises: 3670a29c6612
+Create Date: 2026-10-17 10:12:44.512087
+
+Copies images into the blob store but keeps image_base64: the column is only dropped by
+a later revision (a9d3e6f1c8b2), once the blobs are known to live on persistent storage.
+"""
+import base64
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.blob_store import get_blob_store
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b41d2e6f0a7'
+down_revision: Union[str, Sequence[str], None] = '3670a29c6612'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 100
+
+
+def _sniff_mime(data: bytes) -> str:
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('mnemonic_cache', sa.Column('image_digest', sa.String(length=64), nullable=True))
+    op.add_column('mnemonic_cache', sa.Column('image_mime', sa.String(length=64), nullable=True))
+    op.add_column('mnemonic_cache', sa.Column('image_size', sa.Integer(), nullable=True))
+
+    # Move inline base64 images into the blob store, a batch at a time
+    conn = op.get_bind()
+    store = get_blob_store()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, image_base64 FROM mnemonic_cache "
+                "WHERE id > :last_id AND image_base64 IS NOT NULL "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+        for row_id, image_base64 in rows:
+            last_id = row_id
+            try:
+                data = base64.b64decode(image_base64)
+            except ValueError:
+                print(f"Skipping mnemonic_cache row {row_id}: invalid base64 image")
+                continue
+            ref = store.put(data)
+            conn.execute(
+                sa.text(
+                    "UPDATE mnemonic_cache SET image_digest = :digest, image_mime = :mime, "
+                    "image_size = :size WHERE id = :id"
+                ),
+                {"digest": ref.digest, "mime": _sniff_mime(data), "size": ref.size, "id": row_id},
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Images generated since the upgrade only exist in the blob store
+    conn = op.get_bind()
+    store = get_blob_store()
+    rows = conn.execute(
+        sa.text(
+            "SELECT id, image_digest FROM mnemonic_cache "
+            "WHERE image_digest IS NOT NULL AND image_base64 IS NULL"
+        )
+    ).fetchall()
+    for row_id, digest in rows:
+        data = store.get(digest)
+        if data is None:
+            continue
+        conn.execute(
+            sa.text("UPDATE mnemonic_cache SET image_base64 = :image WHERE id = :id"),
+            {"image": base64.b64encode(data).decode("utf-8"), "id": row_id},
+        )
+
+    op.drop_column('mnemonic_cache', 'image_size')
+    op.drop_column('mnemonic_cache', 'image_mime')
+    op.drop_column('mnemonic_cache', 'image_digest')
@@ -0,0 +1,125 @@
+"""Drop mnemonic_cache.image_base64
+
+Revision ID: a9d3e6f1c8b2
+Revises: f1b8d4a6c253
+Create Date: 2026-10-17 18:40:11.203561
+
+Images have been served from the blob store since 8b41d2e6f0a7; this drops the inline
+copies that revision kept. Only run it once BLOB_STORE_DIR is on persistent storage (a
+mounted disk or volume), otherwise the next redeploy loses every image. Run migrations
+where that storage is mounted (e.g. Render's start command: disks aren't mounted during
+the build).
+
+The column is only dropped when every image it backs is already in the blob store. It
+refuses to run while BLOB_STORE_DIR is left at its in-repo default; blobs missing from
+the store are restored from image_base64 and the migration stops, since a store that lost
+blobs isn't persistent. Run it again once the restored blobs have survived a restart.
+"""
+import base64
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.blob_store import BLOB_STORE_DIR, BLOB_STORE_DIR_CONFIGURED, get_blob_store
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3e6f1c8b2'
+down_revision: Union[str, Sequence[str], None] = 'f1b8d4a6c253'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 100
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not BLOB_STORE_DIR_CONFIGURED:
+        raise RuntimeError(
+            "Refusing to drop mnemonic_cache.image_base64 while BLOB_STORE_DIR is unset: "
+            f"the default ({BLOB_STORE_DIR}) is not persistent on most hosts. Point "
+            "BLOB_STORE_DIR at a mounted disk or volume (or set it explicitly for local "
+            "development) and run the migration again."
+        )
+
+    conn = op.get_bind()
+    store = get_blob_store()
+    restored = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, image_digest, image_base64 FROM mnemonic_cache "
+                "WHERE id > :last_id AND image_base64 IS NOT NULL AND image_digest IS NOT NULL "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+        for row_id, digest, image_base64 in rows:
+            last_id = row_id
+            if store.exists(digest):
+                continue
+            try:
+                data = base64.b64decode(image_base64)
+            except ValueError:
+                continue
+            if store.put(data).digest == digest:
+                restored += 1
+    if restored:
+        raise RuntimeError(
+            f"Restored {restored} images missing from {BLOB_STORE_DIR}, so it doesn't look persistent "
+            "(were migrations run where the disk isn't mounted, e.g. during the build?). Keeping "
+            "mnemonic_cache.image_base64; run the migration again once the restored images have "
+            "survived a restart."
+        )
+
+    missing = _count_missing_blobs(conn, store)
+    if missing:
+        raise RuntimeError(
+            f"{missing} images referenced by mnemonic_cache are neither in {BLOB_STORE_DIR} nor in "
+            "image_base64. Keeping mnemonic_cache.image_base64; clear or regenerate those rows first."
+        )
+
+    op.drop_column('mnemonic_cache', 'image_base64')
+
+
+def _count_missing_blobs(conn, store) -> int:
+    """Rows whose image_digest has no blob in the store."""
+    missing = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, image_digest FROM mnemonic_cache "
+                "WHERE id > :last_id AND image_digest IS NOT NULL ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            return missing
+        for row_id, digest in rows:
+            last_id = row_id
+            if not store.exists(digest):
+                missing += 1
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('mnemonic_cache', sa.Column('image_base64', sa.Text(), nullable=True))
+
+    conn = op.get_bind()
+    store = get_blob_store()
+    rows = conn.execute(
+        sa.text("SELECT id, image_digest FROM mnemonic_cache WHERE image_digest IS NOT NULL")
+    ).fetchall()
+    for row_id, digest in rows:
+        data = store.get(digest)
+        if data is None:
+            continue
+        conn.execute(
+            sa.text("UPDATE mnemonic_cache SET image_base64 = :image WHERE id = :id"),
+            {"image": base64.b64encode(data).decode("utf-8"), "id": row_id},
+        )
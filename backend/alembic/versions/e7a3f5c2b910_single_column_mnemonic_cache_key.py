@@ -0,0 +1,121 @@
+"""Single-column mnemonic cache key
+
+Revision ID: e7a3f5c2b910
+Revises: c4e2a9b1d7f3
+Create Date: 2026-10-17 15:02:37.884120
+
+The downgrade deletes every cached mnemonic (see downgrade()).
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3f5c2b910'
+down_revision: Union[str, Sequence[str], None] = 'c4e2a9b1d7f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+# Prompt version of every row cached before keys carried one
+BACKFILL_PROMPT_VERSION = 1
+
+
+def _cache_key(word_hash: str, language: str, definition_hash: str) -> bytes:
+    # Frozen copy of mnemonic_service.cache_key, starting from the stored hashes
+    parts = (word_hash, language, definition_hash, str(BACKFILL_PROMPT_VERSION))
+    return hashlib.sha256(":".join(parts).encode()).digest()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('mnemonic_cache', sa.Column('cache_key', sa.LargeBinary(length=32), nullable=True))
+
+    conn = op.get_bind()
+    cache = sa.table(
+        'mnemonic_cache',
+        sa.column('id', sa.Integer),
+        sa.column('word_hash', sa.String),
+        sa.column('language', sa.String),
+        sa.column('definition_hash', sa.String),
+        sa.column('cache_key', sa.LargeBinary),
+        sa.column('mnemonic_word', sa.Text),
+        sa.column('image_digest', sa.String),
+    )
+
+    # Language is now normalized to lower case, so 'ES' and 'es' rows collapse into one
+    # key. Keep the most complete row of each group (with an image, then with text), the
+    # newest among equals.
+    kept = {}  # key -> (rank, row id, normalized language)
+    duplicates = []
+    last_id = None
+    while True:
+        query = sa.select(
+            cache.c.id, cache.c.word_hash, cache.c.language, cache.c.definition_hash,
+            cache.c.image_digest.isnot(None), sa.func.length(cache.c.mnemonic_word) > 0
+        )
+        if last_id is not None:
+            query = query.where(cache.c.id > last_id)
+        rows = conn.execute(query.order_by(cache.c.id).limit(BATCH_SIZE)).fetchall()
+        if not rows:
+            break
+        for row_id, word_hash, language, definition_hash, has_image, has_text in rows:
+            language = language.lower().strip()
+            key = _cache_key(word_hash, language, definition_hash)
+            rank = (bool(has_image), bool(has_text), row_id)
+            current = kept.get(key)
+            if current is None or rank > current[0]:
+                if current is not None:
+                    duplicates.append(current[1])
+                kept[key] = (rank, row_id, language)
+            else:
+                duplicates.append(row_id)
+        last_id = rows[-1][0]
+
+    updates = [{"row_id": row_id, "key": key, "lang": language} for key, (_, row_id, language) in kept.items()]
+    for start in range(0, len(updates), BATCH_SIZE):
+        conn.execute(
+            cache.update()
+            .where(cache.c.id == sa.bindparam("row_id"))
+            .values(cache_key=sa.bindparam("key"), language=sa.bindparam("lang")),
+            updates[start:start + BATCH_SIZE]
+        )
+    for start in range(0, len(duplicates), BATCH_SIZE):
+        conn.execute(cache.delete().where(cache.c.id.in_(duplicates[start:start + BATCH_SIZE])))
+
+    op.alter_column('mnemonic_cache', 'cache_key', nullable=False)
+    op.create_index('uq_mnemonic_cache_key', 'mnemonic_cache', ['cache_key'], unique=True)
+
+    # The primary key is already indexed
+    op.drop_index(op.f('ix_mnemonic_cache_id'), table_name='mnemonic_cache')
+    op.drop_index('idx_word_lang_def', table_name='mnemonic_cache')
+    op.drop_index(op.f('ix_mnemonic_cache_definition_hash'), table_name='mnemonic_cache')
+    op.drop_index(op.f('ix_mnemonic_cache_word_hash'), table_name='mnemonic_cache')
+    op.drop_constraint('uq_mnemonic_cache', 'mnemonic_cache', type_='unique')
+    op.drop_column('mnemonic_cache', 'definition_hash')
+    op.drop_column('mnemonic_cache', 'word_hash')
+
+
+def downgrade() -> None:
+    """
+    Downgrade schema.
+
+    DESTRUCTIVE: deletes every mnemonic_cache row. The digest can't be turned back into
+    the per-field hashes the old schema is keyed by, so no row could be found again.
+    Mnemonics (and their images) are regenerated on demand afterwards, at the cost of
+    AI calls; back up the table first if that matters.
+    """
+    print("⚠️ Deleting all mnemonic_cache rows: the old key columns can't be rebuilt from cache_key")
+    op.execute("DELETE FROM mnemonic_cache")
+    op.add_column('mnemonic_cache', sa.Column('word_hash', sa.String(length=64), nullable=False))
+    op.add_column('mnemonic_cache', sa.Column('definition_hash', sa.String(length=64), nullable=False))
+    op.create_unique_constraint('uq_mnemonic_cache', 'mnemonic_cache', ['word_hash', 'language', 'definition_hash'])
+    op.create_index(op.f('ix_mnemonic_cache_word_hash'), 'mnemonic_cache', ['word_hash'], unique=False)
+    op.create_index(op.f('ix_mnemonic_cache_definition_hash'), 'mnemonic_cache', ['definition_hash'], unique=False)
+    op.create_index('idx_word_lang_def', 'mnemonic_cache', ['word_hash', 'language', 'definition_hash'], unique=False)
+    op.create_index(op.f('ix_mnemonic_cache_id'), 'mnemonic_cache', ['id'], unique=False)
+    op.drop_index('uq_mnemonic_cache_key', table_name='mnemonic_cache')
+    op.drop_column('mnemonic_cache', 'cache_key')
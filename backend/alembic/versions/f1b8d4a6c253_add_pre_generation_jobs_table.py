@@ -0,0 +1,47 @@
+"""Add pre-generation jobs table
+
+Revision ID: f1b8d4a6c253
+Revises: e7a3f5c2b910
+Create Date: 2026-10-17 16:25:03.517942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b8d4a6c253'
+down_revision: Union[str, Sequence[str], None] = 'e7a3f5c2b910'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('pre_generation_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('combinations', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('stats', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Only unfinished jobs are ever looked up by status
+    op.create_index(
+        'ix_pre_generation_jobs_active', 'pre_generation_jobs', ['status'], unique=False,
+        postgresql_where=sa.text("status IN ('queued', 'running')")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_pre_generation_jobs_active', table_name='pre_generation_jobs')
+    op.drop_table('pre_generation_jobs')
@@ -2,9 +2,11 @@ from fastapi import APIRouter, HTTPException, Depends
 from google.oauth2 import id_token
 from google.auth.transport import requests
 from google.auth.exceptions import GoogleAuthError
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from typing import Dict, Any
-from app.core.db import get_db
+from app.core.db import get_async_db
 from app.models.user import User
 from app.core.security import create_access_token
 from app.schemas.auth import GoogleVerifyRequest, AuthResponse, UserResponse
@@ -21,9 +23,9 @@ if GOOGLE_CLIENT_ID is None:
 
 
 @router.post("/google/verify", response_model=AuthResponse)
-def google_verify(
+async def google_verify(
     payload: GoogleVerifyRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> AuthResponse:
     """
     Verify Google OAuth token and create/return user with JWT token.
@@ -42,7 +44,9 @@ def google_verify(
         raise HTTPException(status_code=400, detail="Missing id_token")
 
     try:
-        info = id_token.verify_oauth2_token(
+        # Verification may fetch Google's certs over HTTP, so keep it off the event loop
+        info = await run_in_threadpool(
+            id_token.verify_oauth2_token,
             payload.id_token, requests.Request(), GOOGLE_CLIENT_ID
         )
     except (ValueError, GoogleAuthError) as e:
@@ -57,7 +61,7 @@ def google_verify(
     if not google_id or not email or not name:
         raise HTTPException(status_code=400, detail="Invalid token payload")
 
-    user = db.query(User).filter(User.google_id == google_id).first()
+    user = await db.scalar(select(User).where(User.google_id == google_id).limit(1))
 
     if not user:
         user = User(
@@ -67,8 +71,8 @@ def google_verify(
             profile_picture=info.get("picture")
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
 
     jwt_token = create_access_token({"user_id": user.id})
     
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any, Optional
-from app.core.db import get_db
+from app.core.db import get_async_db
 from app.models.vocabulary import Vocabulary
-from app.services.crossword_service import generate_crossword
+from app.services.crossword_service import CROSSWORD_MAX_GRID_SIZE, generate_best_crossword
+from app.services.vocabulary_catalog import sample_words
 from app.schemas.crossword import (
     CrosswordTodayRequest, 
     CrosswordTodayResponse, 
@@ -11,14 +12,12 @@ from app.schemas.crossword import (
     CrosswordSubmitRequest,
     CrosswordSubmitResponse
 )
-from sqlalchemy import func
-
 router = APIRouter(prefix="/crossword", tags=["Crossword"])
 
 
-def get_random_words(db: Session, limit: int = 10) -> List[Vocabulary]:
+async def get_random_words(db: AsyncSession, limit: int = 10) -> List[Vocabulary]:
     """
-    Get random words from database (database-agnostic approach).
+    Get random words (any level) from the in-memory vocabulary catalog.
     
     Args:
         db: Database session
@@ -27,31 +26,25 @@ def get_random_words(db: Session, limit: int = 10) -> List[Vocabulary]:
     Returns:
         List of random Vocabulary objects
     """
-    try:
-        return (
-            db.query(Vocabulary)
-            .order_by(func.random())
-            .limit(limit)
-            .all()
-        )
-    except Exception:
-        # Fallback: get all and shuffle in Python (not ideal for large datasets)
-        import random
-        all_words = db.query(Vocabulary).all()
-        return random.sample(all_words, min(limit, len(all_words)))
+    return await sample_words(db, limit)
 
 
 @router.post("/today", response_model=CrosswordTodayResponse)
-def crossword_today(
+async def crossword_today(
     payload: CrosswordTodayRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> CrosswordTodayResponse:
     """
     Generate a crossword puzzle with words from vocabulary.
     If words are provided, use those. Otherwise, get random words.
+    The grid is payload.size squared, by default just large enough for the words. The
+    layout search runs off the event loop for at most payload.time_budget_ms; with
+    payload.candidates > 1 several layouts are searched in parallel in the process pool
+    and the best one is used.
     
     Args:
-        payload: Request containing optional words list or limit
+        payload: Request containing optional words list or limit, grid size, time budget
+                 and number of candidate layouts
         db: Database session
     
     Returns:
@@ -79,7 +72,7 @@ def crossword_today(
     else:
         # Get random words
         limit = payload.limit or 10
-        words = get_random_words(db, limit=limit)
+        words = await get_random_words(db, limit=limit)
         
         if not words:
             raise HTTPException(status_code=404, detail="No words found in database")
@@ -95,9 +88,9 @@ def crossword_today(
     if not formatted:
         raise HTTPException(status_code=404, detail="No words found in database")
 
-    # Filter out words that are too long for the grid (10x10)
-    MAX_WORD_LENGTH = 10
-    filtered_formatted = [w for w in formatted if len(w["word"]) <= MAX_WORD_LENGTH]
+    # Filter out words that are too long for the grid
+    max_length = payload.size or CROSSWORD_MAX_GRID_SIZE
+    filtered_formatted = [w for w in formatted if len(w["word"]) <= max_length]
     
     if not filtered_formatted:
         raise HTTPException(
@@ -105,7 +98,9 @@ def crossword_today(
             detail="No words suitable for crossword (all words are too long)"
         )
 
-    result = generate_crossword(filtered_formatted)
+    result = await generate_best_crossword(
+        filtered_formatted, payload.size, payload.time_budget_ms, payload.candidates
+    )
 
     grid = result["grid"]
     placements = result["placements"]
@@ -1,32 +1,70 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
-import google.generativeai as genai
-from google.api_core import exceptions as google_exceptions
-from sqlalchemy.orm import Session
-import base64
-import os
-import json
-import hashlib
-from typing import Optional, List, Dict, Any
-
-from app.core.db import get_db
-from app.models.mnemonic_cache import MnemonicCache
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import logging
+import math
+import re
+from typing import Optional, List, Dict, Any, Literal, Tuple
+
+from app.core.db import AsyncSessionLocal, get_async_db
+from app.services import ai_service, image_variants, mnemonic_service
+from app.services.ai_service import AIServiceError, AIParseError, AIUnavailableError
+from app.services.blob_store import get_blob_store, is_valid_digest, sniff_mime_type
+from app.services.image_variants import Variant
+from app.services.response_cache import etag_matches
 
 load_dotenv()
 
-API_KEY = os.getenv("GEMINI_API_KEY")
-if API_KEY is None:
-    raise RuntimeError("GEMINI_API_KEY environment variable is not set")
+router = APIRouter(prefix="/mnemonic", tags=["Mnemonic"])
 
-genai.configure(api_key=API_KEY)
+# How images are returned: inline base64 (default, legacy) or a URL to GET /mnemonic/image/{digest}
+ImageMode = Literal["base64", "url"]
+IMAGE_MODE_DESCRIPTION = "'base64' to inline the image, 'url' to get a link to /mnemonic/image/{digest}"
+IMAGE_VARIANT_DESCRIPTION = "'original' as generated, 'webp' (compressed, full size) or 'thumb' (small WebP)"
 
-router = APIRouter(prefix="/mnemonic", tags=["Mnemonic"])
+
+def image_url(digest: str, variant: Variant = "original") -> str:
+    """Path of the binary image endpoint for a blob digest."""
+    url = f"{router.prefix}/image/{digest}"
+    return url if variant == "original" else f"{url}?variant={variant}"
 
 
-def _hash_string(s: str) -> str:
-    """Generate SHA256 hash of a string for cache keys."""
-    return hashlib.sha256(s.lower().strip().encode()).hexdigest()
+async def _image_fields(
+    db: AsyncSession,
+    digest: Optional[str],
+    mime_type: Optional[str],
+    mode: ImageMode,
+    variant: Variant = "original"
+) -> Dict[str, Any]:
+    """
+    Response fields for an image reference in the requested mode and variant.
+    image_digest always identifies the original; URL mode leaves variant resolution
+    to the image endpoint, so it costs nothing here. Whether that endpoint serves the
+    variant or falls back to the original is only known when it's fetched, so URL mode
+    reports no image_mime_type for variants (the response's Content-Type has it).
+    """
+    if not digest:
+        return {}
+    fields: Dict[str, Any] = {"image_digest": digest, "image_mime_type": mime_type}
+    if mode == "url":
+        fields["image_url"] = image_url(digest, variant)
+        if variant != "original":
+            fields["image_mime_type"] = None
+        return fields
+
+    if variant != "original":
+        ref = await image_variants.get_or_create_variant(db, digest, variant)
+        if ref is not None:
+            data = await mnemonic_service.load_image_base64(ref.digest)
+            if data is not None:
+                fields.update(image_base64=data, image_mime_type=ref.mime)
+                return fields
+    # The original, also when the variant (or its blob) isn't available
+    fields["image_base64"] = await mnemonic_service.load_image_base64(digest)
+    return fields
 
 
 class MnemonicRequest(BaseModel):
@@ -53,6 +91,11 @@ class MnemonicTextResponse(BaseModel):
 class MnemonicImageResponse(BaseModel):
     """Response schema for image-only mnemonic generation."""
     image_base64: Optional[str] = None
+    image_url: Optional[str] = None
+    image_digest: Optional[str] = Field(default=None, description="Blob store reference (SHA-256 of the image)")
+    image_mime_type: Optional[str] = Field(
+        default=None, description="Type of the inline image, or of image_url for the original (None for URL variants)"
+    )
     cached: bool = False
 
 
@@ -62,6 +105,8 @@ class MnemonicImageRequest(BaseModel):
     definition: str = Field(..., min_length=1, description="Definition of the word")
     mnemonic_sentence: str = Field(..., min_length=1, description="Mnemonic sentence for image generation")
     language: Optional[str] = Field(default=None, description="Language code ('es' or 'fr')")
+    image_mode: ImageMode = Field(default="base64", description=IMAGE_MODE_DESCRIPTION)
+    variant: Variant = Field(default="original", description=IMAGE_VARIANT_DESCRIPTION)
 
 
 @router.post("/generate", response_model=MnemonicResponse)
@@ -81,116 +126,35 @@ async def generate_mnemonic(req: MnemonicRequest) -> MnemonicResponse:
     # ----------------------------------------------------------
     # 1. Generate mnemonic JSON
     # ----------------------------------------------------------
-    prompt_text = f"""
-    Create mnemonic JSON.
-
-    Word: {req.word}
-    Definition: {req.definition}
-
-    STRICT OUTPUT:
-    {{
-      "mnemonic_word": "...",
-      "mnemonic_sentence": "..."
-    }}
-    """
-
+    # One budget for both AI calls
+    deadline = ai_service.request_deadline()
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        text_res = model.generate_content(contents=[prompt_text])
-    except (google_exceptions.GoogleAPIError, Exception) as e:
-        raise HTTPException(
-            status_code=503,
-            detail=f"Failed to generate mnemonic text: {str(e)}"
+        mnemonic_word, mnemonic_sentence = await ai_service.generate_mnemonic_text(
+            req.word, req.definition, deadline
         )
-
-    if not text_res or not text_res.text:
-        raise HTTPException(
-            status_code=503,
-            detail="Empty response from AI service"
-        )
-
-    # Clean markdown
-    raw = text_res.text.strip()
-    raw = raw.replace("```json", "").replace("```", "")
-    raw = raw.replace("**", "")
-    raw = raw.strip()
-
-    try:
-        parsed = json.loads(raw)
-        mnemonic_word = parsed.get("mnemonic_word")
-        mnemonic_sentence = parsed.get("mnemonic_sentence")
-        
-        if not mnemonic_word or not mnemonic_sentence:
-            raise ValueError("Missing required fields in response")
-    except (json.JSONDecodeError, KeyError, ValueError) as e:
+    except AIParseError as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to parse mnemonic response: {str(e)}"
         )
+    except AIServiceError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Failed to generate mnemonic text: {str(e)}"
+        )
 
     # ----------------------------------------------------------
     # 2. Generate image
     # ----------------------------------------------------------
-    # Image should combine the mnemonic (for the word being learned) with the definition context
-    prompt_image = (
-        f"Funny colorful cartoon illustration representing the mnemonic: {mnemonic_sentence}. "
-        f"This is a memory aid for the word '{req.word}' which means: {req.definition}. "
-        "No text in the image. Highly visual and memorable. "
-        "The illustration should help remember the word through the mnemonic connection."
-    )
-
     image_base64 = None
     try:
         print(f"🖼️ Generating image in combined endpoint for word: {req.word}")
-        try:
-            img_model = genai.GenerativeModel("gemini-2.5-flash-image")
-        except:
-            try:
-                img_model = genai.GenerativeModel("gemini-2.0-flash-exp")
-            except:
-                img_model = genai.GenerativeModel("gemini-2.5-flash")
-        print(f"📝 Image prompt: {prompt_image[:100]}...")
-        img_res = img_model.generate_content(prompt_image)
-        print(f"✅ Image generation response received")
-
-        # Extract raw bytes from inline_data
-        if img_res and img_res.parts:
-            print(f"📦 Checking {len(img_res.parts)} parts for image data")
-            for i, part in enumerate(img_res.parts):
-                print(f"  Part {i}: has inline_data={part.inline_data is not None}")
-                if part.inline_data is not None:
-                    print(f"  Part {i}: mime_type={part.inline_data.mime_type}")
-                    print(f"  Part {i}: data type={type(part.inline_data.data)}, length={len(part.inline_data.data) if part.inline_data.data else 0}")
-                    
-                    if part.inline_data.data:
-                        if isinstance(part.inline_data.data, bytes):
-                            raw_bytes = part.inline_data.data
-                            image_base64 = base64.b64encode(raw_bytes).decode("utf-8")
-                            print(f"✅ Image extracted from bytes: {len(image_base64)} chars base64")
-                        elif isinstance(part.inline_data.data, str):
-                            try:
-                                base64.b64decode(part.inline_data.data)
-                                image_base64 = part.inline_data.data
-                                print(f"✅ Image extracted from string (already base64): {len(image_base64)} chars")
-                            except:
-                                image_base64 = base64.b64encode(part.inline_data.data.encode()).decode("utf-8")
-                                print(f"✅ Image extracted from string (encoded): {len(image_base64)} chars base64")
-                        else:
-                            raw_bytes = bytes(part.inline_data.data)
-                            image_base64 = base64.b64encode(raw_bytes).decode("utf-8")
-                            print(f"✅ Image extracted (converted to bytes): {len(image_base64)} chars base64")
-                        
-                        if image_base64 and len(image_base64) > 0:
-                            break
-            else:
-                print(f"⚠️ No inline_data found in response parts")
-                if hasattr(img_res, 'text') and img_res.text:
-                    print(f"📄 Response text: {img_res.text[:200]}")
-        else:
-            print(f"⚠️ No parts in response")
-    except (google_exceptions.GoogleAPIError, Exception) as e:
+        image = await ai_service.generate_mnemonic_image(
+            req.word, req.definition, mnemonic_sentence, deadline
+        )
+        image_base64 = image.to_base64()
+    except AIServiceError as e:
         # Image generation failure is not critical in combined endpoint
-        import logging
         error_msg = f"Image generation failed (non-critical): {str(e)}"
         logging.warning(error_msg)
         print(f"⚠️ {error_msg}")
@@ -205,7 +169,7 @@ async def generate_mnemonic(req: MnemonicRequest) -> MnemonicResponse:
 @router.post("/generate-text", response_model=MnemonicTextResponse)
 async def generate_mnemonic_text(
     req: MnemonicRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> MnemonicTextResponse:
     """
     Generate mnemonic text only (fast, ~2 seconds).
@@ -218,115 +182,103 @@ async def generate_mnemonic_text(
     Returns:
         MnemonicTextResponse with mnemonic word and sentence
     """
-    # Generate cache key
-    word_hash = _hash_string(req.word)
-    definition_hash = _hash_string(req.definition)
     language = req.language or "en"  # Default to 'en' if not specified
+    key = mnemonic_service.cache_key(req.word, req.definition, language)
     
     # Check cache first
-    cached = db.query(MnemonicCache).filter(
-        MnemonicCache.word_hash == word_hash,
-        MnemonicCache.language == language,
-        MnemonicCache.definition_hash == definition_hash
-    ).first()
+    cached = await mnemonic_service.lookup(db, key)
     
-    if cached and cached.mnemonic_word and cached.mnemonic_sentence:
+    if cached and cached.has_text:
         return MnemonicTextResponse(
             mnemonic_word=cached.mnemonic_word,
             mnemonic_sentence=cached.mnemonic_sentence,
             cached=True
         )
     
-    # Generate mnemonic text
-    prompt_text = f"""
-    Create mnemonic JSON.
-
-    Word: {req.word}
-    Definition: {req.definition}
-
-    STRICT OUTPUT:
-    {{
-      "mnemonic_word": "...",
-      "mnemonic_sentence": "..."
-    }}
-    """
-
+    # Generate (coalesced with any concurrent request for the same key) and cache
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        text_res = model.generate_content(contents=[prompt_text])
-    except (google_exceptions.GoogleAPIError, Exception) as e:
+        result = await mnemonic_service.get_or_generate_text(
+            req.word, req.definition, language, deadline=ai_service.request_deadline()
+        )
+    except AIParseError as e:
         raise HTTPException(
-            status_code=503,
-            detail=f"Failed to generate mnemonic text: {str(e)}"
+            status_code=500,
+            detail=f"Failed to parse mnemonic response: {str(e)}"
         )
-
-    if not text_res or not text_res.text:
+    except AIServiceError as e:
         raise HTTPException(
             status_code=503,
-            detail="Empty response from AI service"
+            detail=f"Failed to generate mnemonic text: {str(e)}"
         )
 
-    # Clean markdown
-    raw = text_res.text.strip()
-    raw = raw.replace("```json", "").replace("```", "")
-    raw = raw.replace("**", "")
-    raw = raw.strip()
+    return MnemonicTextResponse(
+        mnemonic_word=result.mnemonic_word,
+        mnemonic_sentence=result.mnemonic_sentence,
+        cached=result.cached
+    )
 
-    try:
-        parsed = json.loads(raw)
-        mnemonic_word = parsed.get("mnemonic_word")
-        mnemonic_sentence = parsed.get("mnemonic_sentence")
-        
-        if not mnemonic_word or not mnemonic_sentence:
-            raise ValueError("Missing required fields in response")
-    except (json.JSONDecodeError, KeyError, ValueError) as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to parse mnemonic response: {str(e)}"
-        )
-    
-    # Save to cache (without image for now)
-    # Use merge to handle case where entry might already exist
-    try:
-        existing = db.query(MnemonicCache).filter(
-            MnemonicCache.word_hash == word_hash,
-            MnemonicCache.language == language,
-            MnemonicCache.definition_hash == definition_hash
-        ).first()
-        
-        if existing:
-            # Update existing entry
-            existing.mnemonic_word = mnemonic_word
-            existing.mnemonic_sentence = mnemonic_sentence
-        else:
-            # Create new entry
-            cache_entry = MnemonicCache(
-                word_hash=word_hash,
-                language=language,
-                definition_hash=definition_hash,
-                mnemonic_word=mnemonic_word,
-                mnemonic_sentence=mnemonic_sentence,
-                image_base64=None  # Image will be added later
-            )
-            db.add(cache_entry)
-        db.commit()
-    except Exception as e:
-        # If cache save fails, continue anyway (not critical)
-        db.rollback()
-        import logging
-        logging.warning(f"Failed to cache mnemonic: {str(e)}")
 
-    return MnemonicTextResponse(
-        mnemonic_word=mnemonic_word,
-        mnemonic_sentence=mnemonic_sentence,
-        cached=False
+MAX_TEXT_BATCH_WORDS = 50
+
+
+class MnemonicTextBatchRequest(BaseModel):
+    """Request schema for generating mnemonic text for several words."""
+    words: List[MnemonicRequest] = Field(
+        ..., min_length=1, max_length=MAX_TEXT_BATCH_WORDS, description="Words to create mnemonics for"
+    )
+
+
+class MnemonicTextBatchItem(BaseModel):
+    """One word's result in a batch text generation (error set if it failed)."""
+    word: str
+    mnemonic_word: Optional[str] = None
+    mnemonic_sentence: Optional[str] = None
+    cached: bool = False
+    error: Optional[str] = None
+
+
+class MnemonicTextBatchResponse(BaseModel):
+    """Response schema for batch text generation, in request order."""
+    results: List[MnemonicTextBatchItem]
+
+
+@router.post("/generate-text/batch", response_model=MnemonicTextBatchResponse)
+async def generate_mnemonic_text_batch(req: MnemonicTextBatchRequest) -> MnemonicTextBatchResponse:
+    """
+    Generate mnemonic text for several words, several words per AI call.
+    Cached words are returned as-is; a word that fails is reported in its own item
+    instead of failing the whole request.
+    
+    Args:
+        req: Request containing the words (word, definition, language each)
+    
+    Returns:
+        MnemonicTextBatchResponse with one item per requested word
+    """
+    results = await mnemonic_service.get_or_generate_text_batch(
+        [(w.word, w.definition, w.language or "en") for w in req.words],
+        deadline=ai_service.request_deadline()
     )
+    
+    items = []
+    for word_req, result in zip(req.words, results):
+        if isinstance(result, Exception):
+            print(f"❌ Batch text generation failed for '{word_req.word}': {result}")
+            items.append(MnemonicTextBatchItem(word=word_req.word, error=str(result)))
+        else:
+            items.append(MnemonicTextBatchItem(
+                word=word_req.word,
+                mnemonic_word=result.mnemonic_word,
+                mnemonic_sentence=result.mnemonic_sentence,
+                cached=result.cached
+            ))
+    return MnemonicTextBatchResponse(results=items)
 
 
 @router.post("/generate-image", response_model=MnemonicImageResponse)
 async def generate_mnemonic_image(
     req: MnemonicImageRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> MnemonicImageResponse:
     """
     Generate mnemonic image only (slower, ~8 seconds).
@@ -339,156 +291,46 @@ async def generate_mnemonic_image(
     Returns:
         MnemonicImageResponse with base64 image
     """
-    # Generate cache key
-    word_hash = _hash_string(req.word)
-    definition_hash = _hash_string(req.definition)
     language = req.language or "en"  # Default to 'en' if not specified
+    key = mnemonic_service.cache_key(req.word, req.definition, language)
     
     # Check cache first
-    cached = db.query(MnemonicCache).filter(
-        MnemonicCache.word_hash == word_hash,
-        MnemonicCache.language == language,
-        MnemonicCache.definition_hash == definition_hash
-    ).first()
+    cached = await mnemonic_service.lookup(db, key)
     
-    if cached and cached.image_base64:
+    if cached and cached.has_image:
         return MnemonicImageResponse(
-            image_base64=cached.image_base64,
+            **await _image_fields(db, cached.image_digest, cached.image_mime, req.image_mode, req.variant),
             cached=True
         )
     
-    # Generate image
-    prompt_image = (
-        f"Funny colorful cartoon illustration representing the mnemonic: {req.mnemonic_sentence}. "
-        f"This is a memory aid for the word '{req.word}' which means: {req.definition}. "
-        "No text in the image. Highly visual and memorable. "
-        "The illustration should help remember the word through the mnemonic connection."
-    )
-
-    image_base64 = None
+    # Generate (coalesced with any concurrent request for the same key) and cache
     try:
         print(f"🖼️ Generating image for word: {req.word}")
-        # Use gemini-2.5-flash-image for image generation (official Google model)
-        try:
-            img_model = genai.GenerativeModel("gemini-2.5-flash-image")
-        except Exception as model_err:
-            print(f"⚠️ Model gemini-2.5-flash-image not available, trying alternatives: {model_err}")
-            # Fallback options
-            try:
-                img_model = genai.GenerativeModel("gemini-2.0-flash-exp")
-            except:
-                try:
-                    img_model = genai.GenerativeModel("gemini-1.5-flash")
-                except:
-                    img_model = genai.GenerativeModel("gemini-pro")
-        
-        print(f"📝 Image prompt: {prompt_image[:100]}...")
-        img_res = img_model.generate_content(prompt_image)
-        print(f"✅ Image generation response received, type: {type(img_res)}")
-
-        # Extract raw bytes from inline_data
-        if img_res and img_res.parts:
-            print(f"📦 Checking {len(img_res.parts)} parts for image data")
-            for i, part in enumerate(img_res.parts):
-                print(f"  Part {i}: has inline_data={part.inline_data is not None}")
-                if part.inline_data is not None:
-                    print(f"  Part {i}: mime_type={part.inline_data.mime_type}")
-                    print(f"  Part {i}: data type={type(part.inline_data.data)}, length={len(part.inline_data.data) if part.inline_data.data else 0}")
-                    
-                    # Try different ways to extract the data
-                    if part.inline_data.data:
-                        # Data might be bytes or base64 string
-                        if isinstance(part.inline_data.data, bytes):
-                            raw_bytes = part.inline_data.data
-                            image_base64 = base64.b64encode(raw_bytes).decode("utf-8")
-                            print(f"✅ Image extracted from bytes: {len(image_base64)} chars base64")
-                        elif isinstance(part.inline_data.data, str):
-                            # Already a base64 string or needs encoding
-                            try:
-                                # Try to decode if it's base64, otherwise encode it
-                                base64.b64decode(part.inline_data.data)
-                                image_base64 = part.inline_data.data
-                                print(f"✅ Image extracted from string (already base64): {len(image_base64)} chars")
-                            except:
-                                # Not base64, encode it
-                                image_base64 = base64.b64encode(part.inline_data.data.encode()).decode("utf-8")
-                                print(f"✅ Image extracted from string (encoded): {len(image_base64)} chars base64")
-                        else:
-                            # Try to convert to bytes
-                            raw_bytes = bytes(part.inline_data.data)
-                            image_base64 = base64.b64encode(raw_bytes).decode("utf-8")
-                            print(f"✅ Image extracted (converted to bytes): {len(image_base64)} chars base64")
-                        
-                        if image_base64 and len(image_base64) > 0:
-                            break
-                    
-            if not image_base64 or len(image_base64) == 0:
-                print(f"⚠️ No image data extracted from parts")
-                # Check if response has text (maybe error message)
-                if hasattr(img_res, 'text') and img_res.text:
-                    print(f"📄 Response text: {img_res.text[:500]}")
-                    
-                    # Try to extract base64 from text if it's in the response
-                    import re
-                    base64_match = re.search(r'data:image/[^;]+;base64,([A-Za-z0-9+/=]+)', img_res.text)
-                    if base64_match:
-                        image_base64 = base64_match.group(1)
-                        print(f"✅ Extracted base64 from response text: {len(image_base64)} chars")
-        else:
-            print(f"⚠️ No parts in response, response: {img_res}")
-            
-        if not image_base64 or len(image_base64) == 0:
-            raise ValueError(f"Image generation returned empty data. Response had {len(img_res.parts) if img_res and img_res.parts else 0} parts.")
-            
-    except (google_exceptions.GoogleAPIError, Exception) as e:
+        result = await mnemonic_service.get_or_generate_image(
+            req.word, req.definition, language, req.mnemonic_sentence,
+            deadline=ai_service.request_deadline()
+        )
+    except AIUnavailableError as e:
+        # Known-failing (circuit open or recent failure for this key): fail fast
+        print(f"⚡ Image generation skipped for '{req.word}': {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=f"Image generation is currently unavailable. {str(e)}",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+        )
+    except AIServiceError as e:
         # Image generation failure - log and raise
-        import logging
         error_msg = f"Image generation failed: {str(e)}"
         logging.error(error_msg, exc_info=True)
         print(f"❌ {error_msg}")
-        print(f"❌ Exception type: {type(e).__name__}")
-        print(f"❌ Full traceback:")
-        import traceback
-        traceback.print_exc()
         raise HTTPException(
             status_code=503,
-            detail=f"Image generation is currently unavailable. Gemini models analyze images but don't generate them. {str(e)}"
+            detail=f"Image generation is currently unavailable. {str(e)}"
         )
-    
-    # Update cache with image
-    if image_base64:
-        try:
-            # Find or create cache entry
-            cache_entry = db.query(MnemonicCache).filter(
-                MnemonicCache.word_hash == word_hash,
-                MnemonicCache.language == language,
-                MnemonicCache.definition_hash == definition_hash
-            ).first()
-            
-            if cache_entry:
-                # Update existing cache entry with image
-                cache_entry.image_base64 = image_base64
-            else:
-                # Create new cache entry (edge case - text endpoint wasn't called first)
-                cache_entry = MnemonicCache(
-                    word_hash=word_hash,
-                    language=language,
-                    definition_hash=definition_hash,
-                    mnemonic_word="",  # Empty if text wasn't generated first
-                    mnemonic_sentence=req.mnemonic_sentence,
-                    image_base64=image_base64
-                )
-                db.add(cache_entry)
-            db.commit()
-        except Exception as e:
-            # If cache update fails, continue anyway (not critical)
-            db.rollback()
-            import logging
-            logging.warning(f"Failed to update cache with image: {str(e)}")
 
     return MnemonicImageResponse(
-        image_base64=image_base64,
-        cached=False
+        **await _image_fields(db, result.image_digest, result.image_mime, req.image_mode, req.variant),
+        cached=result.cached
     )
 
 
@@ -507,12 +349,26 @@ class CachedMnemonicResponse(BaseModel):
     mnemonic_word: Optional[str] = None
     mnemonic_sentence: Optional[str] = None
     image_base64: Optional[str] = None
+    image_url: Optional[str] = None
+    image_digest: Optional[str] = Field(default=None, description="Blob store reference (SHA-256 of the image)")
+    image_mime_type: Optional[str] = None
     found: bool = False
 
 
+MAX_CACHED_LOOKUP_WORDS = 200
+
+
 class BulkCachedMnemonicRequest(BaseModel):
     """Request schema for fetching multiple cached mnemonics."""
-    words: List[CachedMnemonicRequest] = Field(..., description="List of words to look up")
+    words: List[CachedMnemonicRequest] = Field(
+        ..., max_length=MAX_CACHED_LOOKUP_WORDS, description="List of words to look up"
+    )
+    image_mode: ImageMode = Field(default="base64", description=IMAGE_MODE_DESCRIPTION)
+    variant: Variant = Field(default="original", description=IMAGE_VARIANT_DESCRIPTION)
+    fields: Literal["all", "text", "image"] = Field(
+        default="all",
+        description="'text' skips images entirely, 'image' returns only image references"
+    )
 
 
 class BulkCachedMnemonicResponse(BaseModel):
@@ -523,11 +379,13 @@ class BulkCachedMnemonicResponse(BaseModel):
 @router.post("/get-cached", response_model=BulkCachedMnemonicResponse)
 async def get_cached_mnemonics(
     req: BulkCachedMnemonicRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> BulkCachedMnemonicResponse:
     """
     Fetch cached mnemonics for multiple words.
     Useful for displaying word history with images.
+    All words are resolved with a single query (after the in-process tier); results
+    keep the request order.
     
     Args:
         req: Request containing list of words to look up
@@ -536,37 +394,212 @@ async def get_cached_mnemonics(
     Returns:
         BulkCachedMnemonicResponse with cached mnemonic data for each word
     """
+    keys = [
+        mnemonic_service.cache_key(word_req.word, word_req.definition, word_req.language.lower())
+        for word_req in req.words
+    ]
+    found = await mnemonic_service.lookup_many(db, keys)
+    if req.fields in ("all", "image") and req.image_mode == "base64" and req.variant != "original":
+        # Resolve (and transcode) every word's variant up front and concurrently; the
+        # per-word lookups below then hit the in-process variant cache
+        await image_variants.get_or_create_variants(
+            db, [cached.image_digest for cached in found.values() if cached.image_digest], req.variant
+        )
+    
     results = []
+    for word_req, key in zip(req.words, keys):
+        results.append(await _cached_response(db, word_req, found.get(key), req))
     
-    for word_req in req.words:
-        # Generate cache key
-        word_hash = _hash_string(word_req.word)
-        definition_hash = _hash_string(word_req.definition)
-        language = word_req.language.lower()
-        
-        # Look up in cache
-        cached = db.query(MnemonicCache).filter(
-            MnemonicCache.word_hash == word_hash,
-            MnemonicCache.language == language,
-            MnemonicCache.definition_hash == definition_hash
-        ).first()
-        
-        if cached:
-            results.append(CachedMnemonicResponse(
-                word=word_req.word,
-                definition=word_req.definition,
-                language=word_req.language,
-                mnemonic_word=cached.mnemonic_word if cached.mnemonic_word else None,
-                mnemonic_sentence=cached.mnemonic_sentence if cached.mnemonic_sentence else None,
-                image_base64=cached.image_base64 if cached.image_base64 else None,
-                found=True
-            ))
+    return BulkCachedMnemonicResponse(results=results)
+
+
+async def _cached_response(
+    db: AsyncSession,
+    word_req: CachedMnemonicRequest,
+    cached: Optional[mnemonic_service.CachedMnemonic],
+    req: BulkCachedMnemonicRequest
+) -> CachedMnemonicResponse:
+    """Build one word's entry, including only the requested fields."""
+    if cached is None:
+        return CachedMnemonicResponse(
+            word=word_req.word,
+            definition=word_req.definition,
+            language=word_req.language,
+            found=False
+        )
+    
+    fields: Dict[str, Any] = {}
+    if req.fields in ("all", "text"):
+        fields.update(mnemonic_word=cached.mnemonic_word, mnemonic_sentence=cached.mnemonic_sentence)
+    if req.fields in ("all", "image"):
+        fields.update(await _image_fields(db, cached.image_digest, cached.image_mime, req.image_mode, req.variant))
+    return CachedMnemonicResponse(
+        word=word_req.word,
+        definition=word_req.definition,
+        language=word_req.language,
+        **fields,
+        found=True
+    )
+
+
+class CachedMnemonicStreamItem(CachedMnemonicResponse):
+    """One NDJSON line of /get-cached/stream."""
+    index: int = Field(..., description="Position of the word in the request")
+
+
+@router.post("/get-cached/stream")
+async def stream_cached_mnemonics(req: BulkCachedMnemonicRequest) -> StreamingResponse:
+    """
+    Streaming version of /get-cached: one NDJSON line per word, sent as soon as it resolves.
+    Lines arrive in resolution order (cached in memory first, then as rows come off the
+    database cursor, then words that weren't found); use `index` to place them.
+    
+    Args:
+        req: Request containing list of words to look up
+    
+    Returns:
+        StreamingResponse of application/x-ndjson CachedMnemonicStreamItem lines
+    """
+    positions: Dict[mnemonic_service.CacheKey, List[int]] = {}
+    for index, word_req in enumerate(req.words):
+        key = mnemonic_service.cache_key(word_req.word, word_req.definition, word_req.language.lower())
+        positions.setdefault(key, []).append(index)
+    
+    def line(index: int, entry: CachedMnemonicResponse) -> bytes:
+        item = CachedMnemonicStreamItem(**entry.model_dump(), index=index)
+        return item.model_dump_json().encode() + b"\n"
+    
+    async def generate():
+        # The request's dependencies are torn down before the body streams, so this
+        # opens its own sessions: one holds the cursor, the other resolves image variants
+        async with AsyncSessionLocal() as db, AsyncSessionLocal() as variant_db:
+            async for key, cached in mnemonic_service.stream_cached(db, positions):
+                for index in positions.pop(key):
+                    yield line(index, await _cached_response(variant_db, req.words[index], cached, req))
+            for indexes in positions.values():
+                for index in indexes:
+                    yield line(index, await _cached_response(variant_db, req.words[index], None, req))
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+# Blobs are content-addressed, so a given URL's bytes never change
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Served the original in place of a variant that couldn't be produced (yet)
+FALLBACK_CACHE_CONTROL = "public, max-age=3600"
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header into inclusive (start, end).
+    
+    Returns:
+        (start, end), or None if the header should be ignored (malformed or multi-range)
+    
+    Raises:
+        HTTPException: 416 if the range can't be satisfied
+    """
+    match = _RANGE_RE.match(range_header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+    first, last = match.group(1), match.group(2)
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+@router.get("/image/{digest}")
+async def get_mnemonic_image(
+    digest: str,
+    variant: Variant = Query(default="original", description=IMAGE_VARIANT_DESCRIPTION),
+    range_header: Optional[str] = Header(default=None, alias="Range"),
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stream a stored mnemonic image as raw bytes.
+    Supports Range requests and If-None-Match, and is cacheable forever (content-addressed).
+    
+    Args:
+        digest: SHA-256 of the image (image_digest / image_url from the mnemonic endpoints)
+        variant: Which variant of the image to serve (transcoded on first request if needed)
+        range_header: Optional Range header (single byte range)
+        if_none_match: Optional If-None-Match header
+        db: Database session (only used to resolve variants)
+    
+    Returns:
+        200 with the image, 206 with the requested range, or 304
+    """
+    if not is_valid_digest(digest):
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    store = get_blob_store()
+    cache_control = IMMUTABLE_CACHE_CONTROL
+    if variant != "original":
+        ref = await image_variants.get_or_create_variant(db, digest, variant)
+        if ref is not None:
+            digest = ref.digest
         else:
-            results.append(CachedMnemonicResponse(
-                word=word_req.word,
-                definition=word_req.definition,
-                language=word_req.language,
-                found=False
-            ))
+            cache_control = FALLBACK_CACHE_CONTROL
     
-    return BulkCachedMnemonicResponse(results=results)
+    size = await asyncio.to_thread(store.size, digest)
+    if size is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    etag = f'"{digest}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    media_type = sniff_mime_type(await asyncio.to_thread(store.read_head, digest) or b"")
+    byte_range = _parse_range(range_header, size) if range_header else None
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    
+    return StreamingResponse(
+        store.iter_range(digest, start, end),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
+
+
+@router.get("/cache-stats")
+async def get_cache_stats() -> Dict[str, Any]:
+    """
+    Counters for this worker's in-process mnemonic cache tier, cache writes, Gemini rate
+    limiters and image generation circuit breaker.
+    
+    Returns:
+        Dict with hit/miss/eviction counters and current size, failed cache writes,
+        per-model limiter state, circuit state (closed/open/half_open) with transition
+        counts, and negative cache counters
+    """
+    return {
+        "memory_tier": mnemonic_service.memory_tier.stats(),
+        "cache_writes": mnemonic_service.write_stats(),
+        "rate_limits": ai_service.rate_limit_stats(),
+        "image_circuit": ai_service.image_breaker.stats(),
+        "image_negative_cache": mnemonic_service.negative_cache.stats(),
+    }
@@ -1,62 +1,76 @@
 """
 API endpoint for triggering pre-generation of mnemonics.
 """
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from app.core.db import get_db
-from app.services.pre_generation import pre_generate_all_combinations
-import asyncio
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
+from datetime import date as date_type
+from typing import Any, Dict, Optional
+from app.core.db import get_async_db
+from app.services import pre_generation_jobs
 
 router = APIRouter(prefix="/pre-generation", tags=["Pre-Generation"])
 
+MAX_DAYS_AHEAD = 14
 
-@router.post("/run")
-async def trigger_pre_generation(
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
-):
+
+class PreGenerationJobRequest(BaseModel):
+    """Request schema for starting a pre-generation job."""
+    date: Optional[date_type] = Field(default=None, description="First day to pre-generate (default: today)")
+    days_ahead: int = Field(default=0, ge=0, le=MAX_DAYS_AHEAD, description="Also warm this many following days")
+
+
+@router.post("/jobs", status_code=202)
+async def create_pre_generation_job(req: Optional[PreGenerationJobRequest] = None) -> Dict[str, Any]:
+    """
+    Start a pre-generation job for all language/level combinations.
+    Returns immediately; poll GET /pre-generation/jobs/{job_id} for progress.
+    """
+    req = req or PreGenerationJobRequest()
+    job = await pre_generation_jobs.create_job(req.date, req.days_ahead)
+    return {"job_id": job.id, "status": job.status}
+
+
+@router.get("/jobs/{job_id}")
+async def get_pre_generation_job(job_id: int) -> Dict[str, Any]:
+    """
+    Get a pre-generation job's status and per-combination progress.
+    """
+    job = await pre_generation_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return pre_generation_jobs.job_to_dict(job)
+
+
+@router.post("/run", status_code=202)
+async def trigger_pre_generation() -> Dict[str, Any]:
     """
     Trigger pre-generation of mnemonics for all language/level combinations.
-    This runs in the background to avoid blocking the request.
+    Kept for existing callers: same as POST /pre-generation/jobs.
     """
-    try:
-        # Run pre-generation in background
-        loop = asyncio.get_event_loop()
-        stats = await pre_generate_all_combinations(db)
-        
-        return {
-            "status": "success",
-            "message": "Pre-generation completed",
-            "stats": stats
-        }
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Pre-generation failed: {str(e)}"
-        )
+    return await create_pre_generation_job()
 
 
 @router.get("/status")
 async def get_pre_generation_status(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get status of pre-generated mnemonics.
     Returns count of cached mnemonics per language/level.
     """
     from app.models.mnemonic_cache import MnemonicCache
-    from sqlalchemy import func
     
     # Count cached mnemonics with images per language
-    stats = (
-        db.query(
+    stats = (await db.execute(
+        select(
             MnemonicCache.language,
             func.count(MnemonicCache.id).label('count')
         )
-        .filter(MnemonicCache.image_base64.isnot(None))
+        .where(MnemonicCache.image_digest.isnot(None))
         .group_by(MnemonicCache.language)
-        .all()
-    )
+    )).all()
     
     return {
         "status": "ok",
@@ -1,77 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Header
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
-from typing import Optional, List
-from app.core.db import get_db
-from app.models.vocabulary import Vocabulary
+from typing import Optional
+from app.core.db import get_async_db
 from app.models.user_word_history import UserWordHistory
 from app.core.security import optional_access_token
 from app.schemas.words import DailyWordsRequest, DailyWordsResponse, WordOut
 from app.services.word_service import get_daily_words_for_user, assign_daily_words
-from sqlalchemy import func
+from app.services.vocabulary_catalog import catalog, sample_words
+from app.services.response_cache import DailyResponseCache
 
 router = APIRouter(prefix="/words", tags=["Words"])
 
+# Encoded guest /words/daily responses, keyed by (level, limit, catalog version) per day
+guest_daily_cache = DailyResponseCache()
 
-def get_random_words(db: Session, limit: int = 10, level: Optional[str] = None) -> List[Vocabulary]:
+
+async def _build_guest_daily_words(db: AsyncSession, level: str, limit: int, today: date) -> bytes:
     """
-    Get random words from database (database-agnostic approach).
-    
-    Args:
-        db: Database session
-        limit: Number of words to return
-        level: Optional difficulty level filter (a1, a2, b1, b2)
+    Select and encode the guest daily words for a level.
+    Called at most once per (day, level, limit) - see guest_daily_cache.
     
     Returns:
-        List of random Vocabulary objects
+        Encoded DailyWordsResponse JSON
     """
-    query = db.query(Vocabulary)
-    
-    # Filter by level if provided
-    if level:
-        query = query.filter(Vocabulary.level == level)
-    
-    # Check total count for debugging
-    total_count = query.count()
-    print(f"🔍 Database query: level={level}, total words matching={total_count}")
-    
-    if total_count == 0:
-        print(f"⚠️ WARNING: No words found with level={level}")
-        # Try without level filter to see if any words exist
-        all_count = db.query(Vocabulary).count()
-        print(f"🔍 Total words in database (all levels): {all_count}")
-        return []
-    
-    # Try PostgreSQL/SQLite random(), fallback to Python random if needed
-    try:
-        words = (
-            query
-            .order_by(func.random())
-            .limit(limit)
-            .all()
-        )
-        print(f"✅ Retrieved {len(words)} words from database")
-        return words
-    except Exception as e:
-        print(f"❌ Error in get_random_words: {e}")
-        # Fallback: get all and shuffle in Python (not ideal for large datasets)
-        import random
-        all_words = query.all()
-        return random.sample(all_words, min(limit, len(all_words)))
+    print(f"👤 Guest mode: building daily words for level={level}, limit={limit}")
+    
+    # Deterministic words are same regardless of language
+    # (the mnemonics are language-specific, but the English words are the same)
+    from app.services.pre_generation import get_deterministic_words
+    
+    # Use deterministic selection (words are same, mnemonics differ by language)
+    # Pre-generate 10 words for better UX (can reduce to 3 later to save costs)
+    deterministic_words = await get_deterministic_words(db, "es", level, limit=10, for_date=today)
+    print(f"📌 Deterministic words for level {level}: {[w.word for w in deterministic_words]}")
+    
+    # Use deterministic words directly (we now pre-generate 10 words)
+    # This ensures all 10 words have pre-generated mnemonics for instant loading
+    words = deterministic_words[:limit] if len(deterministic_words) >= limit else deterministic_words
+    
+    # If we don't have enough deterministic words, fill with random (fallback)
+    if len(words) < limit:
+        print(f"⚠️ Warning: Only got {len(deterministic_words)} deterministic words, filling with random")
+        remaining_needed = limit - len(words)
+        deterministic_ids = {w.id for w in deterministic_words}
+        random_words = await sample_words(db, remaining_needed, level=level, exclude_ids=deterministic_ids)
+        words.extend(random_words)
+        words = words[:limit]
+    
+    print(f"✅ Found {len(words)} words in database ({len(deterministic_words)} deterministic)")
+    
+    response = DailyWordsResponse(
+        date=today.isoformat(),
+        count=len(words),
+        words=[WordOut.model_validate(w) for w in words]
+    )
+    return response.model_dump_json().encode("utf-8")
 
 
 @router.post("/daily", response_model=DailyWordsResponse)
-def get_daily_words(
+async def get_daily_words(
     request: DailyWordsRequest = DailyWordsRequest(),
-    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
     user: Optional[dict] = Depends(optional_access_token)
 ) -> DailyWordsResponse:
     """
     Get daily words for user. Returns cached words if available for today,
     otherwise generates and saves new words.
     
+    Guests get a pre-serialized response with a strong ETag and a Cache-Control
+    max-age that runs out at midnight; a matching If-None-Match returns 304.
+    
     Args:
         request: Optional request body with level and limit
+        if_none_match: Optional If-None-Match header (guest responses only)
         db: Database session
         user: Optional authenticated user dict
     
@@ -86,48 +89,23 @@ def get_daily_words(
     
     today = date.today()
     
-    # Not logged in -> use deterministic words for first 3, random for rest
+    # Not logged in -> serve the pre-serialized response for (today, level, limit)
     if user is None:
-        print(f"👤 Guest mode: fetching {limit} words at level {level}")
-        
-        # Deterministic words are same regardless of language
-        # (the mnemonics are language-specific, but the English words are the same)
-        from app.services.pre_generation import get_deterministic_words
-        
-        # Use deterministic selection (words are same, mnemonics differ by language)
-        # Pre-generate 10 words for better UX (can reduce to 3 later to save costs)
-        deterministic_words = get_deterministic_words(db, "es", level, limit=10)
-        print(f"📌 Deterministic words for level {level}: {[w.word for w in deterministic_words]}")
-        
-        # Use deterministic words directly (we now pre-generate 10 words)
-        # This ensures all 10 words have pre-generated mnemonics for instant loading
-        words = deterministic_words[:limit] if len(deterministic_words) >= limit else deterministic_words
-        
-        # If we don't have enough deterministic words, fill with random (fallback)
-        if len(words) < limit:
-            print(f"⚠️ Warning: Only got {len(deterministic_words)} deterministic words, filling with random")
-            remaining_needed = limit - len(words)
-            random_words = get_random_words(db, limit=remaining_needed + 20, level=level)
-            deterministic_ids = {w.id for w in deterministic_words}
-            random_words = [w for w in random_words if w.id not in deterministic_ids]
-            words.extend(random_words[:remaining_needed])
-            words = words[:limit]
-        
-        print(f"✅ Found {len(words)} words in database ({len(deterministic_words)} deterministic)")
-        print(f"   First 10 words: {[w.word for w in words[:10]]}")
-        
-        return DailyWordsResponse(
-            date=today.isoformat(),
-            count=len(words),
-            words=[WordOut.model_validate(w) for w in words]
+        # Include the catalog version so vocabulary changes invalidate cached responses
+        await catalog.ensure_fresh(db)
+        cached = await guest_daily_cache.get_or_build(
+            (level, limit, catalog.version),
+            lambda: _build_guest_daily_words(db, level, limit, today),
+            today=today
         )
+        return cached.to_response(if_none_match)
 
     user_id = user.get("user_id")
     if not user_id:
         raise HTTPException(status_code=400, detail="Invalid user token")
 
     # Check if user already has today's words
-    existing_words = get_daily_words_for_user(db, user_id)
+    existing_words = await get_daily_words_for_user(db, user_id)
     
     if existing_words:
         # Filter by level if specified
@@ -148,7 +126,7 @@ def get_daily_words(
     from app.services.pre_generation import get_deterministic_words
     
     print(f"👤 Authenticated user: using deterministic words for first 10")
-    deterministic_words = get_deterministic_words(db, "es", level, limit=10)
+    deterministic_words = await get_deterministic_words(db, "es", level, limit=10, for_date=today)
     print(f"📌 Deterministic words for level {level}: {[w.word for w in deterministic_words]}")
     
     # Use deterministic words directly (we now pre-generate 10 words)
@@ -158,10 +136,9 @@ def get_daily_words(
     # Fallback: if we don't have enough, fill with random
     if len(words) < limit:
         remaining_needed = limit - len(words)
-        random_words = get_random_words(db, limit=remaining_needed + 20, level=level)
         deterministic_ids = {w.id for w in deterministic_words}
-        random_words = [w for w in random_words if w.id not in deterministic_ids]
-        words.extend(random_words[:remaining_needed])
+        random_words = await sample_words(db, remaining_needed, level=level, exclude_ids=deterministic_ids)
+        words.extend(random_words)
         words = words[:limit]
     
     # Save these words to user history
@@ -177,7 +154,7 @@ def get_daily_words(
         )
     
     db.add_all(entries)
-    db.commit()
+    await db.commit()
     
     print(f"✅ Found {len(words)} words for authenticated user ({len(deterministic_words)} deterministic)")
 
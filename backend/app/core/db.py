@@ -1,7 +1,10 @@
 # app/core/db.py
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.pool import NullPool
 from sqlalchemy.ext.declarative import DeclarativeMeta
 from dotenv import load_dotenv
 import os
@@ -16,7 +19,7 @@ if DATABASE_URL is None:
 # SQLAlchemy Base
 Base: DeclarativeMeta = declarative_base()
 
-# Engine
+# Sync engine (Alembic, scripts)
 engine = create_engine(
     DATABASE_URL,
     echo=False,  # set True for debugging SQL
@@ -38,3 +41,65 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async drivers for the sync URL schemes we deploy with
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def _async_engine_args(url: str) -> tuple:
+    """
+    Derive the async URL and connect args from DATABASE_URL.
+    asyncpg does not understand libpq's `sslmode` query parameter, so it is passed as `ssl`.
+    
+    Returns:
+        Tuple of (async URL, connect_args dict)
+    """
+    parsed = make_url(url)
+    drivername = _ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    connect_args = {}
+    query = dict(parsed.query)
+    if drivername == "postgresql+asyncpg" and "sslmode" in query:
+        connect_args["ssl"] = query.pop("sslmode")
+    parsed = parsed.set(drivername=drivername, query=query)
+    return parsed.render_as_string(hide_password=False), connect_args
+
+
+ASYNC_DATABASE_URL, _async_connect_args = _async_engine_args(DATABASE_URL)
+
+# Async engine (API routers)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    pool_pre_ping=True,
+    connect_args=_async_connect_args,
+)
+
+# Engine for the long-lived connection holding generation claims (session advisory locks,
+# see single_flight.GenerationClaims). Unpooled, so it never takes a request's connection;
+# autocommit, so it never sits idle in a transaction.
+lock_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    poolclass=NullPool,
+    connect_args=_async_connect_args,
+    isolation_level="AUTOCOMMIT",
+)
+
+# AsyncSessionLocal for DB operations on the event loop.
+# expire_on_commit=False so ORM objects stay readable after commit without a refresh round-trip.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def get_async_db():
+    """Dependency for getting an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import words, crossword, auth, mnemonic, pre_generation
+from app.services import blob_store, crossword_service, image_transcoder, mnemonic_service, pre_generation_jobs, single_flight
 import os
 from dotenv import load_dotenv
 
@@ -37,6 +38,51 @@ app.include_router(mnemonic.router)
 app.include_router(pre_generation.router)
 
 
+@app.on_event("startup")
+async def resume_background_jobs():
+    """Pick up pre-generation jobs interrupted by a restart."""
+    try:
+        await pre_generation_jobs.resume_interrupted_jobs()
+    except Exception as e:
+        # Don't keep the API from starting (e.g. migrations not applied yet)
+        print(f"⚠️ Could not resume pre-generation jobs: {e}")
+
+
+@app.on_event("startup")
+async def check_blob_store():
+    """Warn if BLOB_STORE_DIR doesn't look like persistent storage (images would be lost)."""
+    if not blob_store.BLOB_STORE_DIR_CONFIGURED:
+        print(f"⚠️ BLOB_STORE_DIR is not set: images go to {blob_store.BLOB_STORE_DIR}, "
+              "which most hosts wipe on redeploy")
+    try:
+        missing, checked = await mnemonic_service.check_image_blobs()
+    except Exception as e:
+        print(f"⚠️ Could not check the blob store: {e}")
+        return
+    if missing:
+        print(f"⚠️ {missing}/{checked} recently cached images are missing from {blob_store.BLOB_STORE_DIR}: "
+              "BLOB_STORE_DIR must point at persistent storage (a mounted disk or volume)")
+
+
+@app.on_event("startup")
+def start_crossword_workers():
+    """Start the crossword layout process pool, if multi-candidate generation is on by default."""
+    crossword_service.start_workers()
+
+
+@app.on_event("shutdown")
+def shutdown_workers():
+    """Stop the image transcoding and crossword layout process pools."""
+    image_transcoder.shutdown()
+    crossword_service.shutdown()
+
+
+@app.on_event("shutdown")
+async def release_generation_claims():
+    """Close the generation claim connection, so other workers can take over at once."""
+    await single_flight.claims.close()
+
+
 @app.get("/")
 def root():
     """Root endpoint to verify API is running."""
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class ImageVariant(Base):
+    """Transcoded variant (e.g. WebP, thumbnail) of an image in the blob store."""
+    __tablename__ = "image_variants"
+
+    id = Column(Integer, primary_key=True)
+    
+    # Variant key: original image digest + variant name
+    source_digest = Column(String(64), nullable=False)
+    variant = Column(String(16), nullable=False)  # 'webp' or 'thumb'
+    
+    # The transcoded bytes are a blob of their own
+    digest = Column(String(64), nullable=False)
+    mime = Column(String(64), nullable=False)
+    size = Column(Integer, nullable=False)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('source_digest', 'variant', name='uq_image_variant'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, String, DateTime, Index, UniqueConstraint
+from sqlalchemy import Column, Integer, Text, String, DateTime, Index, LargeBinary
 from sqlalchemy.sql import func
 from .base import Base
 
@@ -7,24 +7,27 @@ class MnemonicCache(Base):
     """Cache for generated mnemonics to avoid regenerating the same content."""
     __tablename__ = "mnemonic_cache"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     
-    # Hash-based cache key: word_hash + language + definition_hash
-    word_hash = Column(String(64), nullable=False, index=True)
+    # SHA-256 over the normalized (word, language, definition, prompt version);
+    # see mnemonic_service.cache_key
+    cache_key = Column(LargeBinary(32), nullable=False)
     language = Column(String(2), nullable=False)  # 'es' or 'fr'
-    definition_hash = Column(String(64), nullable=False, index=True)
     
     # Cached content
     mnemonic_word = Column(Text, nullable=False)
     mnemonic_sentence = Column(Text, nullable=False)
-    image_base64 = Column(Text, nullable=True)  # Can be large, but cached for reuse
+    
+    # Image lives in the content-addressed blob store; the row only references it
+    image_digest = Column(String(64), nullable=True)  # SHA-256 of the image bytes
+    image_mime = Column(String(64), nullable=True)
+    image_size = Column(Integer, nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
-    # Unique constraint to prevent duplicates
+    # The only index besides the primary key
     __table_args__ = (
-        UniqueConstraint('word_hash', 'language', 'definition_hash', name='uq_mnemonic_cache'),
-        Index('idx_word_lang_def', 'word_hash', 'language', 'definition_hash'),
+        Index('uq_mnemonic_cache_key', 'cache_key', unique=True),
     )
 
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from .base import Base
+
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+
+class PreGenerationJob(Base):
+    """A pre-generation run, tracked so it can report progress and resume after a restart."""
+    __tablename__ = "pre_generation_jobs"
+
+    id = Column(Integer, primary_key=True)
+    
+    status = Column(String(16), nullable=False, default="queued")  # queued, running, succeeded, failed
+    
+    # [{"language", "level", "status", "stats"}] - one entry per language/level combination
+    combinations = Column(JSONType, nullable=False)
+    stats = Column(JSONType, nullable=True)  # Totals once finished
+    error = Column(Text, nullable=True)
+    
+    attempts = Column(Integer, nullable=False, default=0)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # Last sign of life from the runner
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        # Only unfinished jobs are ever looked up by status
+        Index('ix_pre_generation_jobs_active', 'status', postgresql_where=text("status IN ('queued', 'running')")),
+    )
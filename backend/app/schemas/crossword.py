@@ -1,5 +1,12 @@
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
+from app.services.crossword_service import (
+    CROSSWORD_MAX_CANDIDATES,
+    CROSSWORD_MAX_GRID_SIZE,
+    CROSSWORD_MAX_TIME_BUDGET_MS,
+    CROSSWORD_MAX_WORDS,
+    CROSSWORD_MIN_GRID_SIZE
+)
 
 
 # ----------------------------------------------------
@@ -7,9 +14,31 @@ from pydantic import BaseModel, Field
 # ----------------------------------------------------
 class CrosswordTodayRequest(BaseModel):
     """Request schema for generating today's crossword."""
-    limit: Optional[int] = Field(default=None, ge=1, le=10, description="Number of words in crossword")
-    words: Optional[List[str]] = Field(default=None, description="Specific words to use for crossword (translated words)")
+    limit: Optional[int] = Field(default=None, ge=1, le=CROSSWORD_MAX_WORDS, description="Number of words in crossword")
+    words: Optional[List[str]] = Field(
+        default=None,
+        max_length=CROSSWORD_MAX_WORDS,
+        description="Specific words to use for crossword (translated words)"
+    )
     clues: Optional[Dict[str, str]] = Field(default=None, description="Mapping of words to clues (word -> clue)")
+    size: Optional[int] = Field(
+        default=None,
+        ge=CROSSWORD_MIN_GRID_SIZE,
+        le=CROSSWORD_MAX_GRID_SIZE,
+        description="Grid size (size x size); by default sized to fit the words (13x13 for 10 typical words)"
+    )
+    time_budget_ms: Optional[int] = Field(
+        default=None,
+        ge=10,
+        le=CROSSWORD_MAX_TIME_BUDGET_MS,
+        description="Layout search time budget in milliseconds; the best layout found by then is returned"
+    )
+    candidates: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=CROSSWORD_MAX_CANDIDATES,
+        description="Candidate layouts searched in parallel (different word orders); the best one is returned"
+    )
 
 
 # ----------------------------------------------------
@@ -1,11 +1,17 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Literal, Optional, List
+
+# Upper bound for DailyWordsRequest.limit (it is also part of the guest response cache key)
+DAILY_WORDS_MAX_LIMIT = 50
+
+# CEFR levels in the vocabulary (level is part of the guest response cache key too)
+Level = Literal["a1", "a2", "b1", "b2"]
 
 
 class DailyWordsRequest(BaseModel):
     user_id: Optional[int] = None
-    level: str = "a1"
-    limit: int = 10
+    level: Level = "a1"
+    limit: int = Field(10, ge=1, le=DAILY_WORDS_MAX_LIMIT)
 
 
 class WordOut(BaseModel):
@@ -1,6 +1,7 @@
 """
 Cleanup script for old mnemonic cache entries.
 Run this periodically to prevent database from growing too large.
+Also removes image blobs that no cache entry references anymore.
 
 Usage:
     python -m app.scripts.cleanup_old_cache [--days 90]
@@ -14,7 +15,12 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from app.core.db import SessionLocal
+from app.models.image_variant import ImageVariant
 from app.models.mnemonic_cache import MnemonicCache
+from app.services.blob_store import get_blob_store
+
+# Blobs younger than this may belong to a generation that hasn't committed its row yet
+ORPHAN_BLOB_MIN_AGE = timedelta(hours=1)
 
 
 def cleanup_old_cache(days: int = 90):
@@ -35,16 +41,17 @@ def cleanup_old_cache(days: int = 90):
         
         if count == 0:
             print(f"No cache entries older than {days} days found.")
-            return
-        
-        # Delete old entries
-        deleted = db.query(MnemonicCache).filter(
-            MnemonicCache.created_at < cutoff
-        ).delete()
+        else:
+            # Delete old entries
+            deleted = db.query(MnemonicCache).filter(
+                MnemonicCache.created_at < cutoff
+            ).delete()
+            
+            db.commit()
+            print(f"✅ Deleted {deleted} cache entries older than {days} days.")
+            print(f"   Cutoff date: {cutoff.strftime('%Y-%m-%d %H:%M:%S')} UTC")
         
-        db.commit()
-        print(f"✅ Deleted {deleted} cache entries older than {days} days.")
-        print(f"   Cutoff date: {cutoff.strftime('%Y-%m-%d %H:%M:%S')} UTC")
+        cleanup_orphan_blobs(db)
         
     except Exception as e:
         db.rollback()
@@ -54,6 +61,45 @@ def cleanup_old_cache(days: int = 90):
         db.close()
 
 
+def cleanup_orphan_blobs(db) -> int:
+    """
+    Delete image blobs that no mnemonic_cache row references, along with the
+    variants of those images.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Number of blobs deleted
+    """
+    referenced = {
+        digest for (digest,) in
+        db.query(MnemonicCache.image_digest).filter(MnemonicCache.image_digest.isnot(None)).distinct()
+    }
+    
+    # Variants live as long as their original does
+    orphan_variants = db.query(ImageVariant).filter(
+        ImageVariant.source_digest.notin_(
+            db.query(MnemonicCache.image_digest).filter(MnemonicCache.image_digest.isnot(None))
+        )
+    ).delete(synchronize_session=False)
+    db.commit()
+    if orphan_variants:
+        print(f"✅ Deleted {orphan_variants} image variants of removed images.")
+    referenced.update(digest for (digest,) in db.query(ImageVariant.digest).distinct())
+    
+    store = get_blob_store()
+    min_mtime = (datetime.utcnow() - ORPHAN_BLOB_MIN_AGE).timestamp()
+    deleted = 0
+    for digest, mtime in store.iter_blobs():
+        if digest not in referenced and mtime < min_mtime:
+            if store.delete(digest):
+                deleted += 1
+    
+    print(f"✅ Deleted {deleted} unreferenced image blobs.")
+    return deleted
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Cleanup old mnemonic cache entries")
     parser.add_argument(
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Stand-in AI server backed by the deterministic fake provider.
+
+Serves the same answers as AI_PROVIDER=fake over HTTP, so backends, load tests and CI
+can share one fake out of process without spending Gemini quota.
+
+Usage:
+    python -m app.scripts.fake_ai_server [--host 127.0.0.1] [--port 8081]
+
+Then run the backend with:
+    AI_PROVIDER=http FAKE_AI_URL=http://127.0.0.1:8081 uvicorn app.main:app
+
+Latency distributions and error rates come from the FAKE_AI_* environment variables
+(see app/services/ai_providers.py).
+"""
+import argparse
+import os
+import sys
+from typing import Literal
+
+# Add backend to path
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../.."))
+sys.path.insert(0, BACKEND_ROOT)
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.services.ai_providers import FakeProvider, ProviderError, QuotaExceededError
+
+app = FastAPI(title="Fake AI server")
+provider = FakeProvider()
+
+
+class GenerateRequest(BaseModel):
+    kind: Literal["text", "image"] = "text"
+    model: str
+    prompt: str
+
+
+@app.post("/generate")
+async def generate(req: GenerateRequest):
+    try:
+        if req.kind == "image":
+            response = await provider.generate_image(req.model, req.prompt)
+        else:
+            response = await provider.generate_text(req.model, req.prompt)
+    except QuotaExceededError as e:
+        return JSONResponse(
+            status_code=429,
+            content={"detail": str(e)},
+            headers={"Retry-After": f"{e.retry_after or 1:g}"}
+        )
+    except ProviderError as e:
+        return JSONResponse(status_code=500, content={"detail": str(e)})
+
+    return {
+        "text": response.text,
+        "images": [{"data": image.to_base64(), "mime_type": image.mime_type} for image in response.images],
+        "total_tokens": response.total_tokens,
+    }
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "calls": provider.calls}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fake AI server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+    print(f"🤖 Fake AI server on http://{args.host}:{args.port}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,9 @@ import os
 import sys
 import csv
 import json
-import time
+import asyncio
 
 from dotenv import load_dotenv
-import google.generativeai as genai
 from sqlalchemy.orm import Session
 
 # -------------------------------------------------------------------
@@ -18,23 +17,15 @@ sys.path.append(BACKEND_ROOT)
 
 from app.core.db import SessionLocal  # type: ignore
 from app.models.vocabulary import Vocabulary  # type: ignore
+from app.services import ai_service  # type: ignore
 
 # -------------------------------------------------------------------
-# ENV & GEMINI SETUP
+# ENV SETUP
 # -------------------------------------------------------------------
 load_dotenv()
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise RuntimeError("GEMINI_API_KEY is not set in .env")
-
 CSV_PATH = os.getenv("VOCAB_CSV_PATH", "backend/app/data/oxford_3000.csv")
 
-genai.configure(api_key=GEMINI_API_KEY)
-
-# Use Gemini 2.5 Flash (text model)
-model = genai.GenerativeModel("gemini-2.5-flash")
-
 
 # -------------------------------------------------------------------
 # HELPERS
@@ -60,7 +51,7 @@ def load_words_from_csv(path: str):
     return words
 
 
-def call_gemini_for_word(word: str, cefr_level: str):
+async def call_gemini_for_word(word: str, cefr_level: str):
     """
     Ask Gemini 2.5 Flash to give us:
     - definition (EN)
@@ -85,7 +76,10 @@ Return ONLY valid JSON. No markdown, no explanations, no backticks.
 """
 
     try:
-        resp = model.generate_content(prompt)
+        # Shared client: paced by the Gemini rate limiter, retries quota errors with backoff
+        resp = await ai_service.generate_content(
+            ai_service.TEXT_MODEL, prompt, timeout=ai_service.TEXT_TIMEOUT_SECONDS
+        )
         text = resp.text.strip()
 
         # Sometimes models try to wrap in ```json ... ```
@@ -110,7 +104,7 @@ Return ONLY valid JSON. No markdown, no explanations, no backticks.
         return None
 
 
-def upsert_word(db: Session, word_row: dict):
+async def upsert_word(db: Session, word_row: dict):
     """
     For a single CSV row, call Gemini, then:
     - If word exists in DB: update definition / translations / pos / level
@@ -123,7 +117,7 @@ def upsert_word(db: Session, word_row: dict):
     print(f"Processing '{word}' (level={cefr})...")
 
     # 1) Call Gemini for definition + translations
-    gemini_data = call_gemini_for_word(word, cefr)
+    gemini_data = await call_gemini_for_word(word, cefr)
     if not gemini_data:
         print(f"Skipping '{word}' due to Gemini failure.")
         return
@@ -159,26 +153,28 @@ def upsert_word(db: Session, word_row: dict):
 
     # Commit after each word to avoid losing progress
     db.commit()
-    # Short delay to be nice to the API (tune as needed)
-    time.sleep(0.3)
 
 
 # -------------------------------------------------------------------
 # MAIN
 # -------------------------------------------------------------------
-def main():
-    print(f"📂 Loading words from CSV: {CSV_PATH}")
-    words = load_words_from_csv(CSV_PATH)
-    print(f"Total words in CSV: {len(words)}")
-
+async def update_words(words: list):
     db = SessionLocal()
     try:
         for idx, row in enumerate(words, start=1):
             print(f"\n[{idx}/{len(words)}]")
-            upsert_word(db, row)
+            await upsert_word(db, row)
     finally:
         db.close()
 
+
+def main():
+    print(f"📂 Loading words from CSV: {CSV_PATH}")
+    words = load_words_from_csv(CSV_PATH)
+    print(f"Total words in CSV: {len(words)}")
+
+    asyncio.run(update_words(words))
+
     print("🎉 Done updating vocabulary with Gemini 2.5 Flash.")
 
 
@@ -5,11 +5,16 @@ Run this script daily (via cron, Railway cron, or scheduled task) to pre-generat
 the first 3 flashcards for each language/level combination.
 
 Usage:
-    python -m app.scripts.pre_generate_daily
+    python -m app.scripts.pre_generate_daily [--date YYYY-MM-DD] [--days-ahead N]
+
+Use --days-ahead off-peak to warm the cache for the coming days' words, so the new
+word set isn't cold at midnight.
 """
+import argparse
 import sys
 import os
 import asyncio
+from datetime import date
 
 # Add backend to path
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -17,20 +22,20 @@ BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, "../.."))
 sys.path.insert(0, BACKEND_ROOT)
 
 from dotenv import load_dotenv
-from app.core.db import SessionLocal
+from app.core.db import async_engine
 from app.services.pre_generation import pre_generate_all_combinations
 
 load_dotenv()
 
 
-async def main():
+async def main(for_date: date = None, days_ahead: int = 0):
     """Main function to run pre-generation."""
-    db = SessionLocal()
     try:
         print("🚀 Starting daily pre-generation...")
-        stats = await pre_generate_all_combinations(db)
+        stats = await pre_generate_all_combinations(for_date=for_date, days_ahead=days_ahead)
         print("\n✅ Pre-generation completed successfully!")
         print(f"📊 Summary:")
+        print(f"   Dates: {', '.join(stats['dates'])}")
         print(f"   Combinations: {stats['total_combinations']}")
         print(f"   Words processed: {stats['total_words_processed']}")
         print(f"   Already cached: {stats['total_cached']}")
@@ -43,10 +48,25 @@ async def main():
         traceback.print_exc()
         return 1
     finally:
-        db.close()
+        await async_engine.dispose()
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Pre-generate mnemonics for the daily words")
+    parser.add_argument(
+        "--date",
+        type=date.fromisoformat,
+        default=None,
+        help="First day to pre-generate, YYYY-MM-DD (default: today)"
+    )
+    parser.add_argument(
+        "--days-ahead",
+        type=int,
+        default=0,
+        help="Also pre-generate this many following days (default: 0)"
+    )
+    
+    args = parser.parse_args()
+    exit_code = asyncio.run(main(args.date, args.days_ahead))
     sys.exit(exit_code)
 
@@ -0,0 +1,434 @@
+"""
+AI providers: where ai_service's text and image generations actually come from.
+
+- GeminiProvider calls Google Gemini (the default; needs GEMINI_API_KEY).
+- FakeProvider answers in-process with deterministic output (same prompt, same answer),
+  configurable latency distributions and error rates. It costs no quota, so the whole
+  mnemonic pipeline can be load-tested and benchmarked offline and in CI.
+- HttpProvider calls a stand-in server (app/scripts/fake_ai_server.py) that serves the
+  fake over HTTP, so it can run out of process and be shared by several workers.
+
+Select one with AI_PROVIDER=gemini|fake|http. Rate limiting, retries and the circuit
+breaker live in ai_service and apply whichever provider is used.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AI_PROVIDER = os.getenv("AI_PROVIDER", "gemini").lower()
+
+# Fake provider: latency specs are "250" (fixed ms), "100-400" (uniform),
+# "normal:300:50" (mean, stddev ms) or "lognormal:300:0.5" (median ms, sigma)
+FAKE_AI_TEXT_LATENCY_MS = os.getenv("FAKE_AI_TEXT_LATENCY_MS", "0")
+FAKE_AI_IMAGE_LATENCY_MS = os.getenv("FAKE_AI_IMAGE_LATENCY_MS", "0")
+FAKE_AI_ERROR_RATE = float(os.getenv("FAKE_AI_ERROR_RATE", "0"))
+FAKE_AI_QUOTA_ERROR_RATE = float(os.getenv("FAKE_AI_QUOTA_ERROR_RATE", "0"))
+FAKE_AI_SEED = os.getenv("FAKE_AI_SEED")
+FAKE_AI_IMAGE_SIZE = int(os.getenv("FAKE_AI_IMAGE_SIZE", "256"))
+FAKE_AI_URL = os.getenv("FAKE_AI_URL", "http://127.0.0.1:8081")
+
+# Image models bill a fixed number of output tokens per image
+IMAGE_TOKENS = 1290
+
+_RETRY_IN_RE = re.compile(r"retry in ([0-9.]+)\s*s", re.IGNORECASE)
+
+
+class ProviderError(Exception):
+    """The provider failed to answer."""
+
+
+class QuotaExceededError(ProviderError):
+    """The provider rejected the call for quota reasons (HTTP 429 / ResourceExhausted)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class GeneratedImage:
+    """Raw image bytes returned by the image model."""
+    data: bytes
+    mime_type: str = "image/png"
+
+    def to_base64(self) -> str:
+        return base64.b64encode(self.data).decode("utf-8")
+
+
+@dataclass(frozen=True)
+class ModelResponse:
+    """Provider-independent model answer."""
+    text: Optional[str] = None
+    images: Tuple[GeneratedImage, ...] = ()
+    total_tokens: Optional[int] = None
+    parts: int = 0  # Raw response parts, for diagnostics
+
+
+def prompt_text(contents: Any) -> str:
+    """The prompt as one string (contents may be a string or a list of strings)."""
+    if isinstance(contents, (list, tuple)):
+        return "\n".join(str(part) for part in contents)
+    return str(contents)
+
+
+class AIProvider(ABC):
+    """Text and image generation backend."""
+
+    name: str
+
+    @abstractmethod
+    async def generate_text(self, model_name: str, contents: Any) -> ModelResponse:
+        """
+        Generate text for a prompt.
+
+        Raises:
+            QuotaExceededError: If the provider is over quota
+            Exception: Any other failure
+        """
+
+    @abstractmethod
+    async def generate_image(self, model_name: str, contents: Any) -> ModelResponse:
+        """
+        Generate an image for a prompt (returned in ModelResponse.images).
+
+        Raises:
+            QuotaExceededError: If the provider is over quota
+            Exception: Any other failure
+        """
+
+
+# ----------------------------------------------------------
+# Gemini
+# ----------------------------------------------------------
+def _retry_after_seconds(e: BaseException) -> Optional[float]:
+    """How long Gemini asked us to wait: Retry-After header, RetryInfo detail or the message."""
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    value = headers.get("Retry-After") if hasattr(headers, "get") else None
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    for detail in getattr(e, "details", None) or []:
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None:
+            seconds = getattr(delay, "seconds", 0) + getattr(delay, "nanos", 0) / 1e9
+            if seconds > 0:
+                return seconds
+    match = _RETRY_IN_RE.search(str(e))
+    return float(match.group(1)) if match else None
+
+
+def _gemini_text(response: Any) -> Optional[str]:
+    try:
+        return response.text if response else None
+    except ValueError:
+        # .text raises when the candidate has no text parts (e.g. safety block)
+        return None
+
+
+def _gemini_image(response: Any) -> Optional[GeneratedImage]:
+    """Pull the first inline image out of a Gemini image-model response."""
+    for part in getattr(response, "parts", None) or []:
+        inline = part.inline_data
+        if inline is None or not inline.data:
+            continue
+        data = inline.data
+        if isinstance(data, str):
+            # Some SDK versions hand back base64 text instead of bytes
+            try:
+                data = base64.b64decode(data, validate=True)
+            except ValueError:
+                data = data.encode()
+        elif not isinstance(data, bytes):
+            data = bytes(data)
+        return GeneratedImage(data=data, mime_type=inline.mime_type or "image/png")
+
+    # Fall back to a data URI embedded in the text, if any
+    try:
+        text = response.text
+    except Exception:
+        text = None
+    if text:
+        match = re.search(r'data:(image/[^;]+);base64,([A-Za-z0-9+/=]+)', text)
+        if match:
+            return GeneratedImage(data=base64.b64decode(match.group(2)), mime_type=match.group(1))
+    return None
+
+
+class GeminiProvider(AIProvider):
+    """Google Gemini through the google-generativeai SDK's async API."""
+
+    name = "gemini"
+
+    def __init__(self):
+        import google.generativeai as genai
+        from google.api_core import exceptions as google_exceptions
+
+        api_key = os.getenv("GEMINI_API_KEY")
+        if api_key is None:
+            raise RuntimeError("GEMINI_API_KEY environment variable is not set")
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self._quota_errors = (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)
+        self._models = {}
+
+    def get_model(self, name: str):
+        """Return the shared GenerativeModel instance for a model name."""
+        model = self._models.get(name)
+        if model is None:
+            model = self._models[name] = self._genai.GenerativeModel(name)
+        return model
+
+    async def _generate(self, model_name: str, contents: Any) -> Any:
+        try:
+            return await self.get_model(model_name).generate_content_async(contents)
+        except self._quota_errors as e:
+            raise QuotaExceededError(str(e), _retry_after_seconds(e)) from e
+
+    @staticmethod
+    def _usage(response: Any) -> Optional[int]:
+        usage = getattr(response, "usage_metadata", None)
+        total = getattr(usage, "total_token_count", None)
+        return total if isinstance(total, int) and total > 0 else None
+
+    async def generate_text(self, model_name: str, contents: Any) -> ModelResponse:
+        response = await self._generate(model_name, contents)
+        return ModelResponse(
+            text=_gemini_text(response),
+            total_tokens=self._usage(response),
+            parts=len(getattr(response, "parts", None) or [])
+        )
+
+    async def generate_image(self, model_name: str, contents: Any) -> ModelResponse:
+        response = await self._generate(model_name, contents)
+        image = _gemini_image(response)
+        return ModelResponse(
+            images=(image,) if image else (),
+            total_tokens=self._usage(response),
+            parts=len(getattr(response, "parts", None) or [])
+        )
+
+
+# ----------------------------------------------------------
+# Fake
+# ----------------------------------------------------------
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """Latency in milliseconds: fixed, uniform, normal or lognormal."""
+    kind: str
+    a: float
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        spec = spec.strip()
+        try:
+            if ":" in spec:
+                kind, a, b = spec.split(":")
+                if kind not in ("normal", "lognormal"):
+                    raise ValueError(kind)
+                return cls(kind, float(a), float(b))
+            if "-" in spec:
+                low, high = spec.split("-")
+                return cls("uniform", float(low), float(high))
+            return cls("fixed", float(spec))
+        except ValueError as e:
+            raise ValueError(f"Invalid latency spec {spec!r}") from e
+
+    def sample_ms(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(self.a, self.b))
+        if self.kind == "lognormal":
+            return self.a * math.exp(rng.gauss(0.0, self.b)) if self.a > 0 else 0.0
+        return self.a
+
+
+_FAKE_SYLLABLES = ["ba", "ko", "mi", "ru", "ze", "ta", "lo", "ni", "pe", "su", "fa", "go"]
+_WORD_LINE_RE = re.compile(r"Word:\s*(.+?)\s*(?:\|\s*Definition:\s*(.*?))?\s*$", re.MULTILINE)
+_DEFINITION_RE = re.compile(r"Definition:\s*(.+?)\s*$", re.MULTILINE)
+
+
+def _digest(*parts: str) -> bytes:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).digest()
+
+
+def fake_mnemonic(word: str, definition: str) -> dict:
+    """Deterministic mnemonic for a word."""
+    digest = _digest(word, definition)
+    sound = "".join(_FAKE_SYLLABLES[b % len(_FAKE_SYLLABLES)] for b in digest[:2])
+    mnemonic_word = f"{word[:3].capitalize()}{sound}"
+    return {
+        "mnemonic_word": mnemonic_word,
+        "mnemonic_sentence": f"Picture a {mnemonic_word} that reminds you of '{word}': {definition}",
+    }
+
+
+def fake_text(prompt: str) -> str:
+    """Deterministic answer in the shape the mnemonic prompts ask for."""
+    if "JSON array" in prompt:
+        items = [
+            {"index": index, **fake_mnemonic(word, definition or "")}
+            for index, (word, definition) in enumerate(_WORD_LINE_RE.findall(prompt))
+        ]
+        return json.dumps(items)
+    word_match = _WORD_LINE_RE.search(prompt)
+    definition_match = _DEFINITION_RE.search(prompt)
+    if word_match:
+        word = word_match.group(1).strip('"')
+        return json.dumps(fake_mnemonic(word, definition_match.group(1) if definition_match else ""))
+    return json.dumps({"text": _digest(prompt).hex()[:16]})
+
+
+def fake_png(prompt: str, size: int = FAKE_AI_IMAGE_SIZE) -> bytes:
+    """Deterministic PNG: a two-colour diagonal split, colours derived from the prompt."""
+    digest = _digest(prompt)
+    first, second = digest[0:3], digest[3:6]
+    rows = b"".join(
+        b"\x00" + first * (size - y) + second * y
+        for y in range(size)
+    )
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+class FakeProvider(AIProvider):
+    """
+    Deterministic local stand-in for Gemini.
+
+    Output depends only on the prompt. Latency and failures are drawn from a seeded RNG
+    (FAKE_AI_SEED), so a run is reproducible when the seed is set.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        text_latency: str = FAKE_AI_TEXT_LATENCY_MS,
+        image_latency: str = FAKE_AI_IMAGE_LATENCY_MS,
+        error_rate: float = FAKE_AI_ERROR_RATE,
+        quota_error_rate: float = FAKE_AI_QUOTA_ERROR_RATE,
+        seed: Optional[str] = FAKE_AI_SEED
+    ):
+        self.text_latency = LatencyDistribution.parse(text_latency)
+        self.image_latency = LatencyDistribution.parse(image_latency)
+        self.error_rate = error_rate
+        self.quota_error_rate = quota_error_rate
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    async def _simulate(self, latency: LatencyDistribution) -> None:
+        self.calls += 1
+        delay_ms = latency.sample_ms(self._rng)
+        roll = self._rng.random()
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+        if roll < self.quota_error_rate:
+            raise QuotaExceededError("Fake provider: quota exceeded", retry_after=1.0)
+        if roll < self.quota_error_rate + self.error_rate:
+            raise ProviderError("Fake provider: simulated failure")
+
+    async def generate_text(self, model_name: str, contents: Any) -> ModelResponse:
+        await self._simulate(self.text_latency)
+        prompt = prompt_text(contents)
+        text = fake_text(prompt)
+        return ModelResponse(text=text, total_tokens=(len(prompt) + len(text)) // 4, parts=1)
+
+    async def generate_image(self, model_name: str, contents: Any) -> ModelResponse:
+        await self._simulate(self.image_latency)
+        prompt = prompt_text(contents)
+        image = GeneratedImage(await asyncio.to_thread(fake_png, prompt))
+        return ModelResponse(images=(image,), total_tokens=len(prompt) // 4 + IMAGE_TOKENS, parts=1)
+
+
+# ----------------------------------------------------------
+# HTTP stand-in
+# ----------------------------------------------------------
+class HttpProvider(AIProvider):
+    """
+    Client for a stand-in AI server (see app/scripts/fake_ai_server.py).
+
+    POST {base_url}/generate with {"kind", "model", "prompt"} answers
+    {"text", "images": [{"data", "mime_type"}], "total_tokens"}; 429 means over quota.
+    """
+
+    name = "http"
+
+    def __init__(self, base_url: str = FAKE_AI_URL):
+        import httpx
+
+        self.base_url = base_url.rstrip("/")
+        self._httpx = httpx
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = self._httpx.AsyncClient(base_url=self.base_url, timeout=None)
+        return self._client
+
+    async def _generate(self, kind: str, model_name: str, contents: Any) -> ModelResponse:
+        response = await self._get_client().post(
+            "/generate", json={"kind": kind, "model": model_name, "prompt": prompt_text(contents)}
+        )
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After")
+            raise QuotaExceededError(response.text, float(retry_after) if retry_after else None)
+        if response.status_code != 200:
+            raise ProviderError(f"AI server returned {response.status_code}: {response.text[:200]}")
+        body = response.json()
+        images: List[GeneratedImage] = [
+            GeneratedImage(base64.b64decode(image["data"]), image.get("mime_type") or "image/png")
+            for image in body.get("images") or []
+        ]
+        return ModelResponse(
+            text=body.get("text"),
+            images=tuple(images),
+            total_tokens=body.get("total_tokens"),
+            parts=len(images) + (1 if body.get("text") else 0)
+        )
+
+    async def generate_text(self, model_name: str, contents: Any) -> ModelResponse:
+        return await self._generate("text", model_name, contents)
+
+    async def generate_image(self, model_name: str, contents: Any) -> ModelResponse:
+        return await self._generate("image", model_name, contents)
+
+
+_PROVIDERS = {
+    "gemini": GeminiProvider,
+    "fake": FakeProvider,
+    "http": HttpProvider,
+}
+
+
+@lru_cache(maxsize=None)
+def get_provider() -> AIProvider:
+    """Return the process-wide provider selected by AI_PROVIDER."""
+    try:
+        provider_class = _PROVIDERS[AI_PROVIDER]
+    except KeyError:
+        raise RuntimeError(f"Unknown AI_PROVIDER {AI_PROVIDER!r} (expected one of {', '.join(_PROVIDERS)})")
+    provider = provider_class()
+    print(f"🤖 AI provider: {provider.name}")
+    return provider
@@ -0,0 +1,463 @@
+"""
+Shared AI client for mnemonic text and image generation.
+
+- Calls go to the provider selected by AI_PROVIDER (Gemini by default, or a local fake;
+  see ai_providers), through async APIs, so a 2-8 second generation never blocks the event loop.
+- Every call has a timeout and is bounded by a process-wide concurrency semaphore.
+- Every call is paced by a per-model RPM/TPM limiter; quota errors (429 / ResourceExhausted)
+  slow the limiter down and are retried with jittered exponential backoff.
+- Request handlers pass a deadline (request_deadline()) that bounds the whole call: limiter
+  waits, attempts and backoff together. Retries stop once the remaining budget can't cover
+  the backoff plus another attempt.
+- Image generation runs behind a circuit breaker, so an image model outage fails fast. Only
+  provider failures (AIProviderError) count towards it; our own throttling and misconfiguration
+  raise their own error types and leave it alone.
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple, Union
+
+from dotenv import load_dotenv
+
+from app.services.ai_providers import GeneratedImage, ModelResponse, QuotaExceededError, get_provider
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.rate_limiter import ModelLimiter
+
+load_dotenv()
+
+TEXT_MODEL = os.getenv("GEMINI_TEXT_MODEL", "gemini-2.5-flash")
+IMAGE_MODEL = os.getenv("GEMINI_IMAGE_MODEL", "gemini-2.5-flash-image")
+
+TEXT_TIMEOUT_SECONDS = float(os.getenv("AI_TEXT_TIMEOUT_SECONDS", "30"))
+IMAGE_TIMEOUT_SECONDS = float(os.getenv("AI_IMAGE_TIMEOUT_SECONDS", "60"))
+MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+
+# Per-model quota budgets (0 disables that budget)
+TEXT_RPM = float(os.getenv("AI_TEXT_RPM", "1000"))
+TEXT_TPM = float(os.getenv("AI_TEXT_TPM", "1000000"))
+IMAGE_RPM = float(os.getenv("AI_IMAGE_RPM", "100"))
+IMAGE_TPM = float(os.getenv("AI_IMAGE_TPM", "200000"))
+
+# Retries on quota errors
+MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", "4"))
+RETRY_BASE_SECONDS = float(os.getenv("AI_RETRY_BASE_SECONDS", "1"))
+RETRY_MAX_SECONDS = float(os.getenv("AI_RETRY_MAX_SECONDS", "30"))
+
+# Overall budget for the AI calls of one API request, and the least time worth starting an attempt with
+REQUEST_DEADLINE_SECONDS = float(os.getenv("AI_REQUEST_DEADLINE_SECONDS", "90"))
+MIN_ATTEMPT_SECONDS = float(os.getenv("AI_MIN_ATTEMPT_SECONDS", "5"))
+
+# Words per batched text generation call
+TEXT_BATCH_SIZE = int(os.getenv("AI_TEXT_BATCH_SIZE", "10"))
+
+# Image model circuit breaker
+IMAGE_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("IMAGE_CIRCUIT_FAILURE_THRESHOLD", "5"))
+IMAGE_CIRCUIT_RESET_SECONDS = float(os.getenv("IMAGE_CIRCUIT_RESET_SECONDS", "30"))
+
+# Expected output tokens per call, used to estimate TPM usage before the call
+TEXT_OUTPUT_TOKENS = 300
+IMAGE_OUTPUT_TOKENS = 1300
+
+
+class AIServiceError(Exception):
+    """The AI service failed, timed out or returned nothing usable."""
+
+
+class AIParseError(AIServiceError):
+    """The AI service answered, but the response could not be parsed."""
+
+
+class AIProviderError(AIServiceError):
+    """The provider or the transport failed: an error response, a timeout, no usable data,
+    or quota still exhausted after the retries."""
+
+
+class AIRateLimitedError(AIServiceError):
+    """Our own rate limiter held the call back for longer than the timeout (the provider was never called)."""
+
+
+class AIConfigurationError(AIServiceError):
+    """The AI provider is misconfigured (missing key, unknown AI_PROVIDER)."""
+
+
+class AIDeadlineExceededError(AIServiceError):
+    """The caller's deadline ran out before the call could finish."""
+
+
+class AIUnavailableError(AIServiceError):
+    """The call was not attempted because it is known to be failing right now."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+_semaphore: Optional[asyncio.Semaphore] = None
+_limiters: Dict[str, ModelLimiter] = {}
+
+image_breaker = CircuitBreaker(
+    "image-generation",
+    failure_threshold=IMAGE_CIRCUIT_FAILURE_THRESHOLD,
+    reset_seconds=IMAGE_CIRCUIT_RESET_SECONDS,
+    failure_types=(AIProviderError,)
+)
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    return _semaphore
+
+
+def get_limiter(model_name: str) -> ModelLimiter:
+    """Return the process-wide rate limiter for a model."""
+    limiter = _limiters.get(model_name)
+    if limiter is None:
+        if model_name == IMAGE_MODEL:
+            limiter = ModelLimiter(model_name, IMAGE_RPM, IMAGE_TPM)
+        else:
+            limiter = ModelLimiter(model_name, TEXT_RPM, TEXT_TPM)
+        _limiters[model_name] = limiter
+    return limiter
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, float]]:
+    return {name: limiter.stats() for name, limiter in _limiters.items()}
+
+
+def estimate_tokens(model_name: str, contents: Any, output_tokens: Optional[int] = None) -> int:
+    """Rough token estimate for a call: ~4 characters per prompt token plus the expected output."""
+    if output_tokens is None:
+        output_tokens = IMAGE_OUTPUT_TOKENS if model_name == IMAGE_MODEL else TEXT_OUTPUT_TOKENS
+    return len(str(contents)) // 4 + output_tokens
+
+
+def request_deadline() -> float:
+    """Deadline (time.monotonic()) for the AI calls of an API request starting now."""
+    return time.monotonic() + REQUEST_DEADLINE_SECONDS
+
+
+def remaining_seconds(deadline: Optional[float]) -> float:
+    """Seconds left until deadline (infinite without one)."""
+    return float("inf") if deadline is None else deadline - time.monotonic()
+
+
+def backoff_seconds(attempt: int, retry_after: Optional[float]) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    delay = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+    return max(delay, retry_after or 0.0)
+
+
+async def generate_content(
+    model_name: str,
+    contents: Any,
+    timeout: float,
+    output_tokens: Optional[int] = None,
+    kind: Literal["text", "image"] = "text",
+    deadline: Optional[float] = None
+) -> ModelResponse:
+    """
+    Call a model through the configured provider without blocking the event loop.
+
+    Args:
+        model_name: Model name
+        contents: Prompt contents
+        timeout: Seconds to wait for the response (queueing for the semaphore included),
+            and at most that long for the rate limiter, per attempt
+        output_tokens: Expected output tokens, for the TPM estimate (default: per model)
+        kind: Whether to generate text or an image
+        deadline: time.monotonic() by which the whole call, retries included, must be done
+            (default: none, each attempt is only bounded by timeout)
+
+    Returns:
+        The provider's ModelResponse
+
+    Raises:
+        AIConfigurationError: If the provider is misconfigured
+        AIRateLimitedError: If the rate limiter holds the call back for longer than the timeout
+        AIProviderError: If the call fails, times out or is still over quota after the retries
+        AIDeadlineExceededError: If the deadline runs out during a limiter wait or an attempt
+    """
+    try:
+        provider = get_provider()
+    except RuntimeError as e:
+        raise AIConfigurationError(str(e)) from e
+    generate = provider.generate_image if kind == "image" else provider.generate_text
+    limiter = get_limiter(model_name)
+    estimated = estimate_tokens(model_name, contents, output_tokens)
+
+    async def _call():
+        async with _get_semaphore():
+            return await generate(model_name, contents)
+
+    def _budget() -> float:
+        remaining = remaining_seconds(deadline)
+        if remaining <= 0:
+            raise AIDeadlineExceededError(f"{model_name}: request deadline exceeded")
+        return min(timeout, remaining)
+
+    for attempt in range(MAX_RETRIES + 1):
+        budget = _budget()
+        try:
+            await asyncio.wait_for(limiter.acquire(estimated), timeout=budget)
+        except asyncio.TimeoutError as e:
+            if budget < timeout:
+                raise AIDeadlineExceededError(f"{model_name}: request deadline exceeded while rate limited") from e
+            raise AIRateLimitedError(f"{model_name} rate limited for more than {timeout:g}s") from e
+
+        budget = _budget()
+        try:
+            response = await asyncio.wait_for(_call(), timeout=budget)
+        except asyncio.TimeoutError as e:
+            if budget < timeout:
+                # Cut short by the caller's deadline: says nothing about the provider
+                raise AIDeadlineExceededError(f"{model_name}: request deadline exceeded after {budget:.1f}s") from e
+            raise AIProviderError(f"{model_name} timed out after {timeout:g}s") from e
+        except QuotaExceededError as e:
+            retry_after = e.retry_after
+            limiter.on_quota_error(retry_after)
+            delay = backoff_seconds(attempt, retry_after)
+            if attempt == MAX_RETRIES or remaining_seconds(deadline) < delay + MIN_ATTEMPT_SECONDS:
+                raise AIProviderError(f"{model_name} quota exhausted after {attempt + 1} attempts: {e}") from e
+            limiter.retries += 1
+            print(f"⏳ {model_name} quota error, retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})")
+            await asyncio.sleep(delay)
+            continue
+        except Exception as e:
+            raise AIProviderError(str(e)) from e
+
+        limiter.on_success()
+        limiter.record_usage(estimated, response.total_tokens)
+        return response
+
+
+# ----------------------------------------------------------
+# Mnemonic prompts
+# ----------------------------------------------------------
+# Part of the mnemonic cache key: bump when the prompts change so old results aren't reused
+PROMPT_VERSION = 1
+
+
+def build_text_prompt(word: str, definition: str) -> str:
+    return f"""
+    Create mnemonic JSON.
+
+    Word: {word}
+    Definition: {definition}
+
+    STRICT OUTPUT:
+    {{
+      "mnemonic_word": "...",
+      "mnemonic_sentence": "..."
+    }}
+    """
+
+
+def build_text_batch_prompt(words: Sequence[Tuple[str, str]]) -> str:
+    listing = "\n".join(
+        f"{index}. Word: {word} | Definition: {definition}"
+        for index, (word, definition) in enumerate(words)
+    )
+    return f"""
+    Create one mnemonic for each word below.
+
+    {listing}
+
+    STRICT OUTPUT: a JSON array with exactly one object per word, in the same order:
+    [
+      {{"index": 0, "mnemonic_word": "...", "mnemonic_sentence": "..."}}
+    ]
+    """
+
+
+def build_image_prompt(word: str, definition: str, mnemonic_sentence: str) -> str:
+    # Image should combine the mnemonic (for the word being learned) with the definition context
+    return (
+        f"Funny colorful cartoon illustration representing the mnemonic: {mnemonic_sentence}. "
+        f"This is a memory aid for the word '{word}' which means: {definition}. "
+        "No text in the image. Highly visual and memorable. "
+        "The illustration should help remember the word through the mnemonic connection."
+    )
+
+
+def parse_mnemonic_text(text: str) -> tuple[str, str]:
+    """
+    Parse the model's mnemonic JSON (tolerating markdown fences).
+
+    Returns:
+        Tuple of (mnemonic_word, mnemonic_sentence)
+
+    Raises:
+        AIParseError: If the JSON is invalid or a field is missing
+    """
+    raw = text.strip()
+    raw = raw.replace("```json", "").replace("```", "")
+    raw = raw.replace("**", "")
+    raw = raw.strip()
+
+    try:
+        parsed = json.loads(raw)
+        mnemonic_word = parsed.get("mnemonic_word")
+        mnemonic_sentence = parsed.get("mnemonic_sentence")
+    except (json.JSONDecodeError, AttributeError) as e:
+        raise AIParseError(f"Invalid JSON: {e}") from e
+
+    if not mnemonic_word or not mnemonic_sentence:
+        raise AIParseError("Missing required fields in response")
+    return mnemonic_word, mnemonic_sentence
+
+
+def parse_mnemonic_batch(text: str, count: int) -> List[Optional[tuple[str, str]]]:
+    """
+    Parse the model's JSON array of mnemonics for a batch of count words.
+
+    Items are matched by their "index" (falling back to array position) and validated
+    one by one, so a single malformed item doesn't discard the rest.
+
+    Returns:
+        (mnemonic_word, mnemonic_sentence) per word, or None where the item is missing or invalid
+
+    Raises:
+        AIParseError: If the response is not a JSON array
+    """
+    raw = text.strip()
+    raw = raw.replace("```json", "").replace("```", "")
+    raw = raw.replace("**", "")
+    raw = raw.strip()
+
+    try:
+        parsed = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise AIParseError(f"Invalid JSON: {e}") from e
+    if not isinstance(parsed, list):
+        raise AIParseError("Expected a JSON array")
+
+    results: List[Optional[tuple[str, str]]] = [None] * count
+    for position, item in enumerate(parsed):
+        if not isinstance(item, dict):
+            continue
+        index = item.get("index", position)
+        if not isinstance(index, int) or not 0 <= index < count or results[index] is not None:
+            continue
+        mnemonic_word = item.get("mnemonic_word")
+        mnemonic_sentence = item.get("mnemonic_sentence")
+        if isinstance(mnemonic_word, str) and isinstance(mnemonic_sentence, str) and mnemonic_word and mnemonic_sentence:
+            results[index] = (mnemonic_word, mnemonic_sentence)
+    return results
+
+
+async def generate_mnemonic_text(word: str, definition: str, deadline: Optional[float] = None) -> tuple[str, str]:
+    """
+    Generate a mnemonic word and sentence.
+
+    Args:
+        deadline: time.monotonic() by which to give up (see generate_content)
+
+    Returns:
+        Tuple of (mnemonic_word, mnemonic_sentence)
+
+    Raises:
+        AIServiceError: If the call fails, times out or returns nothing
+        AIParseError: If the response cannot be parsed
+    """
+    response = await generate_content(
+        TEXT_MODEL, [build_text_prompt(word, definition)], timeout=TEXT_TIMEOUT_SECONDS, deadline=deadline
+    )
+    if not response.text:
+        raise AIProviderError("Empty response from AI service")
+    return parse_mnemonic_text(response.text)
+
+
+BatchTextResult = Union[tuple[str, str], AIServiceError, None]
+
+
+async def generate_mnemonic_text_batch(
+    words: Sequence[Tuple[str, str]],
+    deadline: Optional[float] = None
+) -> List[BatchTextResult]:
+    """
+    Generate mnemonics for several words with one model call per TEXT_BATCH_SIZE words.
+
+    Chunks run concurrently. Items missing from or invalid in the answer (or a whole answer
+    that can't be parsed) come back as None, and callers fall back to generate_mnemonic_text
+    for them. If a chunk's call itself fails, its words get the error: a single-word call
+    would only fail the same way.
+
+    Args:
+        words: (word, definition) pairs
+        deadline: time.monotonic() by which to give up (see generate_content)
+
+    Returns:
+        (mnemonic_word, mnemonic_sentence), None or the call's AIServiceError per word, in input order
+    """
+    size = max(1, TEXT_BATCH_SIZE)
+    chunks = [list(words[start:start + size]) for start in range(0, len(words), size)]
+
+    async def _chunk(chunk: List[Tuple[str, str]]) -> List[BatchTextResult]:
+        try:
+            response = await generate_content(
+                TEXT_MODEL,
+                [build_text_batch_prompt(chunk)],
+                timeout=TEXT_TIMEOUT_SECONDS * 2,
+                output_tokens=TEXT_OUTPUT_TOKENS * len(chunk),
+                deadline=deadline
+            )
+            if not response.text:
+                raise AIProviderError("Empty response from AI service")
+            results = parse_mnemonic_batch(response.text, len(chunk))
+        except AIParseError as e:
+            print(f"⚠️ Batch text response unusable for {len(chunk)} words, falling back: {e}")
+            return [None] * len(chunk)
+        except AIServiceError as e:
+            print(f"⚠️ Batch text generation failed for {len(chunk)} words: {e}")
+            return [e] * len(chunk)
+        invalid = sum(result is None for result in results)
+        if invalid:
+            print(f"⚠️ Batch text generation: {invalid}/{len(chunk)} items missing or invalid")
+        return results
+
+    results: List[BatchTextResult] = []
+    for chunk_results in await asyncio.gather(*(_chunk(chunk) for chunk in chunks)):
+        results.extend(chunk_results)
+    return results
+
+
+async def generate_mnemonic_image(
+    word: str,
+    definition: str,
+    mnemonic_sentence: str,
+    deadline: Optional[float] = None
+) -> GeneratedImage:
+    """
+    Generate a mnemonic illustration.
+
+    Args:
+        deadline: time.monotonic() by which to give up (see generate_content)
+
+    Returns:
+        GeneratedImage with the raw bytes
+
+    Raises:
+        AIUnavailableError: If the image circuit is open (fails without calling the model)
+        AIServiceError: If the call fails, times out or returns no image data (only
+            AIProviderError counts towards the circuit breaker)
+    """
+    prompt = build_image_prompt(word, definition, mnemonic_sentence)
+
+    async def _generate() -> GeneratedImage:
+        # Validated inside the breaker: a model that answers without an image is failing too
+        response = await generate_content(
+            IMAGE_MODEL, prompt, timeout=IMAGE_TIMEOUT_SECONDS, kind="image", deadline=deadline
+        )
+        if not response.images:
+            raise AIProviderError(f"Image generation returned empty data. Response had {response.parts} parts.")
+        return response.images[0]
+
+    try:
+        return await image_breaker.call(_generate)
+    except CircuitOpenError as e:
+        raise AIUnavailableError(f"Image generation is temporarily unavailable: {e}", e.retry_after) from e
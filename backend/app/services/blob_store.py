@@ -0,0 +1,207 @@
+"""
+Content-addressed blob storage for generated images.
+
+Blobs are keyed by the SHA-256 of their bytes, so identical images (e.g. the same
+illustration cached under two languages) are stored once. Database rows keep only the
+digest, mime type and size.
+
+The local filesystem backend shards blobs as <root>/ab/cd/<digest> and writes atomically
+(temp file + fsync + rename), so readers never see a partial blob.
+
+BLOB_STORE_DIR must point at persistent storage (a mounted disk or volume). The default,
+backend/data/blobs, is fine for local development but is wiped on every redeploy on
+hosts like Render or Railway, and rows would then reference images that no longer exist.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", str(BACKEND_ROOT / "data" / "blobs"))
+# False when falling back to the in-repo default (not persistent on most hosts)
+BLOB_STORE_DIR_CONFIGURED = "BLOB_STORE_DIR" in os.environ
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    """Reference to a stored blob."""
+    digest: str
+    size: int
+
+
+def compute_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_valid_digest(digest: str) -> bool:
+    return bool(_DIGEST_RE.match(digest))
+
+
+def sniff_mime_type(data: bytes) -> str:
+    """Guess an image mime type from its magic bytes."""
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return "application/octet-stream"
+
+
+class BlobStore(ABC):
+    """Storage backend interface. Methods are blocking; use the *_async wrappers on the event loop."""
+
+    @abstractmethod
+    def put(self, data: bytes) -> BlobRef:
+        """Store data under its digest (no-op if it already exists)."""
+
+    @abstractmethod
+    def get(self, digest: str) -> Optional[bytes]:
+        """Return the blob's bytes, or None if it doesn't exist."""
+
+    @abstractmethod
+    def exists(self, digest: str) -> bool:
+        """Whether a blob is stored under digest."""
+
+    @abstractmethod
+    def delete(self, digest: str) -> bool:
+        """Delete a blob. Returns False if it didn't exist."""
+
+    @abstractmethod
+    def size(self, digest: str) -> Optional[int]:
+        """Size of a blob in bytes, or None if it doesn't exist."""
+
+    def read_head(self, digest: str, length: int = 16) -> Optional[bytes]:
+        """First bytes of a blob (enough to sniff its type)."""
+        data = self.get(digest)
+        return None if data is None else data[:length]
+
+    def iter_range(self, digest: str, start: int, end: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Yield bytes start..end (inclusive) of a blob in chunks."""
+        data = self.get(digest) or b""
+        for offset in range(start, end + 1, chunk_size):
+            yield data[offset:min(offset + chunk_size, end + 1)]
+
+    @abstractmethod
+    def iter_blobs(self) -> Iterator[Tuple[str, float]]:
+        """Iterate over every stored blob as (digest, modified-at unix timestamp)."""
+
+    async def put_async(self, data: bytes) -> BlobRef:
+        return await asyncio.to_thread(self.put, data)
+
+    async def get_async(self, digest: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self.get, digest)
+
+
+class LocalBlobStore(BlobStore):
+    """Blob store on the local filesystem."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def path_for(self, digest: str) -> Path:
+        if not is_valid_digest(digest):
+            raise ValueError(f"Invalid blob digest: {digest!r}")
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def put(self, data: bytes) -> BlobRef:
+        digest = compute_digest(data)
+        path = self.path_for(digest)
+        if path.exists():
+            # Refresh mtime so orphan cleanup treats the blob as recently written
+            os.utime(path)
+            return BlobRef(digest=digest, size=len(data))
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return BlobRef(digest=digest, size=len(data))
+
+    def get(self, digest: str) -> Optional[bytes]:
+        try:
+            return self.path_for(digest).read_bytes()
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def exists(self, digest: str) -> bool:
+        try:
+            return self.path_for(digest).exists()
+        except ValueError:
+            return False
+
+    def delete(self, digest: str) -> bool:
+        try:
+            self.path_for(digest).unlink()
+            return True
+        except (FileNotFoundError, ValueError):
+            return False
+
+    def size(self, digest: str) -> Optional[int]:
+        try:
+            return self.path_for(digest).stat().st_size
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def read_head(self, digest: str, length: int = 16) -> Optional[bytes]:
+        try:
+            with open(self.path_for(digest), "rb") as f:
+                return f.read(length)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def iter_range(self, digest: str, start: int, end: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        with open(self.path_for(digest), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def iter_blobs(self) -> Iterator[Tuple[str, float]]:
+        if not self.root.exists():
+            return
+        for path in self.root.glob("*/*/*"):
+            if is_valid_digest(path.name):
+                try:
+                    yield path.name, path.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+
+
+_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Return the process-wide blob store (configured by BLOB_STORE_DIR)."""
+    global _store
+    if _store is None:
+        _store = LocalBlobStore(BLOB_STORE_DIR)
+    return _store
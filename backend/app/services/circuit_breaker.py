@@ -0,0 +1,138 @@
+"""
+Circuit breaker for calls to a dependency that can be degraded for minutes at a time.
+
+Closed: calls go through; consecutive failures are counted. At the threshold the circuit
+opens and calls fail immediately (no waiting on a call that is bound to fail). After the
+reset timeout it goes half-open and lets a limited number of probe calls through: a
+successful probe closes the circuit, a failed one opens it again.
+
+All access happens on the event loop, so no locking is needed.
+"""
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """The circuit is open (or its half-open probes are taken); the call was not attempted."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probing state."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_seconds: float,
+        half_open_max_calls: int = 1,
+        failure_types: Tuple[Type[BaseException], ...] = (Exception,)
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.failure_types = failure_types
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.transitions: Counter = Counter()
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() >= self._opened_at + self.reset_seconds:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return
+        self.transitions[f"{self._state}->{state}"] += 1
+        print(f"🔌 Circuit '{self.name}': {self._state} -> {state}")
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state != CLOSED:
+            self._probes = 0
+        if state == CLOSED:
+            self._failures = 0
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a probe through (0 if it already would)."""
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_seconds - time.monotonic())
+
+    def _admit(self) -> bool:
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._probes < self.half_open_max_calls:
+            self._probes += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def _record(self, succeeded: Optional[bool], probe: bool) -> None:
+        if probe:
+            self._probes = max(0, self._probes - 1)
+        if succeeded is None:
+            # Cancelled: says nothing about the dependency's health
+            return
+        if succeeded:
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED)
+            self._failures = 0
+            return
+        self._failures += 1
+        if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+            self._transition(OPEN)
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn() through the breaker.
+
+        Args:
+            fn: Coroutine function making the call
+
+        Returns:
+            fn()'s result
+
+        Raises:
+            CircuitOpenError: If the circuit is open, without calling fn
+        """
+        if not self._admit():
+            raise CircuitOpenError(self.name, self.retry_after() or self.reset_seconds)
+        probe = self._state == HALF_OPEN
+        succeeded: Optional[bool] = None
+        try:
+            result = await fn()
+            succeeded = True
+            return result
+        except self.failure_types:
+            succeeded = False
+            raise
+        finally:
+            self._record(succeeded, probe)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "retry_after_seconds": round(self.retry_after(), 3),
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions),
+        }
@@ -1,151 +1,396 @@
-from typing import List, Dict, Any
+import asyncio
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional, Tuple
 
 
-# Grid size constant (can be made configurable)
-CROSSWORD_GRID_SIZE = 10
+# Grid size range (and word count) a request may ask for
+CROSSWORD_MIN_GRID_SIZE = 10
+CROSSWORD_MAX_GRID_SIZE = 25
+CROSSWORD_MAX_WORDS = 40
+# Default grid size: grid cells per letter to place. Below ~2.5 the layout search starts
+# leaving words out (10 words of 6-8 letters on 10x10 place ~63%, on 13x13 all of them)
+CROSSWORD_CELLS_PER_LETTER = 2.5
 
+# Wall-clock budget for one layout search; the best layout found by then is returned
+CROSSWORD_TIME_BUDGET_MS = int(os.getenv("CROSSWORD_TIME_BUDGET_MS", "200"))
+CROSSWORD_MAX_TIME_BUDGET_MS = int(os.getenv("CROSSWORD_MAX_TIME_BUDGET_MS", "2000"))
 
-def generate_crossword(words: List[Dict[str, str]]) -> Dict[str, Any]:
+# Backtracking search bounds: nodes visited per puzzle, and how many of a word's best
+# placements (by intersections) are tried at each step
+CROSSWORD_SEARCH_NODES = int(os.getenv("CROSSWORD_SEARCH_NODES", "150"))
+CROSSWORD_SEARCH_BRANCHING = 3
+
+# Multi-candidate mode: layouts searched in parallel per puzzle (1 = single search in a
+# thread), and the process pool they run in (0 = one worker per CPU core)
+CROSSWORD_CANDIDATES = int(os.getenv("CROSSWORD_CANDIDATES", "1"))
+CROSSWORD_MAX_CANDIDATES = 16
+CROSSWORD_WORKERS = int(os.getenv("CROSSWORD_WORKERS", "0")) or os.cpu_count() or 1
+# Candidate word orders shuffle words whose lengths differ by less than this
+CROSSWORD_ORDER_JITTER = 3
+# Candidates stop this long before the deadline, to hand their layout back in time
+CROSSWORD_RESULT_MARGIN_MS = 10
+# Search budget for the in-thread fallback when no candidate finished in time
+CROSSWORD_FALLBACK_BUDGET_MS = 20
+
+# (word, row, col, across)
+Placement = Tuple[str, int, int, bool]
+
+
+class _Board:
     """
-    Generate a crossword puzzle from a list of words with clues.
-    
-    Args:
-        words: List of dicts with "word" and "clue" keys
-              Example: [{"word": "ABOVE", "clue": "Higher than"}, ...]
-    
+    Crossword grid with bitmask occupancy and a letter-position index.
+
+    row_bits[r] has bit c set when cell (r, c) holds a letter, col_bits[c] has bit r
+    set; across_bits / down_bits track which cells are covered by an ACROSS / DOWN
+    word, so a word never overlaps another one running the same way. The letter index
+    maps each letter to the cells holding it, which gives intersection candidates
+    without scanning earlier placements.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.cells: List[str] = [""] * (size * size)
+        self.row_bits = [0] * size
+        self.col_bits = [0] * size
+        self.across_bits = [0] * size
+        self.down_bits = [0] * size
+        self.letter_index: Dict[str, set] = {}
+
+    def fits(self, word: str, row: int, col: int, across: bool) -> int:
+        """
+        Check a placement against bounds, same-direction overlap, letters and adjacency.
+
+        Args:
+            word: Word to place
+            row: Row of the first letter
+            col: Column of the first letter
+            across: True for ACROSS, False for DOWN
+
+        Returns:
+            Number of intersections with placed words, or -1 if the word doesn't fit
+        """
+        size = self.size
+        # Work along a "line" (row for ACROSS, column for DOWN) at offset "start"
+        line, start = (row, col) if across else (col, row)
+        end = start + len(word)
+        if start < 0 or end > size or not 0 <= line < size:
+            return -1
+        lines = self.row_bits if across else self.col_bits
+        mask = ((1 << len(word)) - 1) << start
+        if (self.across_bits if across else self.down_bits)[line] & mask:
+            return -1
+
+        occupied = lines[line]
+        # Nothing directly before or after the word
+        if start > 0 and occupied >> (start - 1) & 1:
+            return -1
+        if end < size and occupied >> end & 1:
+            return -1
+        # New letters must not touch the neighbouring lines (only crossings may)
+        new = mask & ~occupied
+        if line > 0 and lines[line - 1] & new:
+            return -1
+        if line < size - 1 and lines[line + 1] & new:
+            return -1
+
+        crossings = 0
+        shared = occupied & mask
+        while shared:
+            low = shared & -shared
+            pos = low.bit_length() - 1
+            cell = line * size + pos if across else pos * size + line
+            if self.cells[cell] != word[pos - start]:
+                return -1
+            crossings += 1
+            shared ^= low
+        return crossings
+
+    def place(self, word: str, row: int, col: int, across: bool) -> List[int]:
+        """Write a word on the board, returning the cells it newly filled (for remove)."""
+        size = self.size
+        filled = []
+        for i, ch in enumerate(word):
+            r, c = (row, col + i) if across else (row + i, col)
+            cell = r * size + c
+            if not self.cells[cell]:
+                self.cells[cell] = ch
+                self.row_bits[r] |= 1 << c
+                self.col_bits[c] |= 1 << r
+                self.letter_index.setdefault(ch, set()).add(cell)
+                filled.append(cell)
+            if across:
+                self.across_bits[r] |= 1 << c
+            else:
+                self.down_bits[c] |= 1 << r
+        return filled
+
+    def remove(self, word: str, row: int, col: int, across: bool, filled: List[int]) -> None:
+        """Undo place()."""
+        size = self.size
+        for i in range(len(word)):
+            if across:
+                self.across_bits[row] &= ~(1 << (col + i))
+            else:
+                self.down_bits[col] &= ~(1 << (row + i))
+        for cell in filled:
+            r, c = divmod(cell, size)
+            self.letter_index[self.cells[cell]].discard(cell)
+            self.cells[cell] = ""
+            self.row_bits[r] &= ~(1 << c)
+            self.col_bits[c] &= ~(1 << r)
+
+    def candidates(self, word: str, within: Optional[List[int]] = None) -> List[Tuple[int, int, int, bool]]:
+        """
+        Placements crossing the words already on the board, best first.
+
+        Args:
+            word: Word to place
+            within: Only consider crossings at these cells (default: any cell)
+
+        Returns:
+            List of (intersections, row, col, across), most intersections first
+        """
+        size = self.size
+        if within is None:
+            crossings_at = ((i, cell) for i, ch in enumerate(word) for cell in self.letter_index.get(ch, ()))
+        else:
+            crossings_at = ((i, cell) for cell in within for i, ch in enumerate(word) if ch == self.cells[cell])
+        seen = set()
+        found = []
+        for i, cell in crossings_at:
+            r, c = divmod(cell, size)
+            # A letter of a DOWN word can be crossed ACROSS, and vice versa
+            if self.across_bits[r] >> c & 1:
+                spot = (r - i, c, False)
+            else:
+                spot = (r, c - i, True)
+            if spot in seen:
+                continue
+            seen.add(spot)
+            crossings = self.fits(word, *spot)
+            if crossings > 0:
+                found.append((crossings, *spot))
+        found.sort(key=lambda candidate: -candidate[0])
+        return found
+
+    def free_spot(self, word: str) -> Optional[Tuple[int, int, int, bool]]:
+        """First spot (scanning from the centre) where a word fits without touching anything."""
+        size = self.size
+        center = size // 2
+        mask = (1 << len(word)) - 1
+        # The word's cells plus the cells right before and after it (shifted up by one)
+        capped = (1 << (len(word) + 2)) - 1
+        for line in sorted(range(size), key=lambda n: abs(n - center)):
+            for across, lines in ((True, self.row_bits), (False, self.col_bits)):
+                neighbours = (lines[line - 1] if line > 0 else 0) | (lines[line + 1] if line < size - 1 else 0)
+                for pos in range(size - len(word) + 1):
+                    if (lines[line] << 1) & (capped << pos) or neighbours & (mask << pos):
+                        continue
+                    return (0, line, pos, True) if across else (0, pos, line, False)
+        return None
+
+
+def _search(
+    words: List[str],
+    size: int,
+    max_nodes: int,
+    branching: int,
+    deadline: float
+) -> List[Placement]:
+    """
+    Bounded backtracking search for the layout placing the most words (then the most
+    intersections), anytime: the best layout so far is returned when it stops.
+
+    The first word goes across the middle of the grid. At each step the first pending
+    word that can cross the board tries its best few crossings; words that can't are
+    deferred until more letters are down, and only when nothing crosses does a word
+    start a separate island on a free spot. Depth-first with the best candidates first,
+    so the first leaf is the greedy layout; the search stops once every word is placed,
+    max_nodes is used up or time.perf_counter() passes deadline.
+    """
+    board = _Board(size)
+    first = words[0]
+    row, col = size // 2, (size - len(first)) // 2
+    placements: List[Placement] = [(first, row, col, True)]
+    # Cells each placement newly filled, parallel to placements
+    filled_cells: List[List[int]] = [board.place(first, row, col, True)]
+
+    best = {"score": (1, 0), "placements": list(placements)}
+    nodes = 0
+
+    def visit(pending: List[str], stuck: Dict[str, int], no_room: frozenset, intersections: int) -> bool:
+        """
+        Place pending words; returns True to stop the search.
+
+        stuck maps pending words that couldn't cross the board to the depth (number of
+        placements) at which that was checked. The board only fills up, so they can only
+        have gained crossings at cells filled since then, which keeps rescanning them
+        cheap. For the same reason words in no_room (no free spot at an ancestor) never
+        get one back.
+        """
+        nonlocal nodes
+        nodes += 1
+        depth = len(placements)
+        score = (depth, intersections)
+        if score > best["score"]:
+            best["score"], best["placements"] = score, list(placements)
+        if not pending or nodes >= max_nodes or time.perf_counter() >= deadline:
+            return True
+        if depth + len(pending) < best["score"][0]:
+            return False  # can't place more words than the best layout down here
+
+        options = []
+        newly_stuck = {}
+        for index, word in enumerate(pending):
+            if word in stuck:
+                since = [cell for cells in filled_cells[stuck[word]:] for cell in cells]
+                options = board.candidates(word, since)[:branching]
+            else:
+                options = board.candidates(word)[:branching]
+            if options:
+                break
+            newly_stuck[word] = depth
+        else:
+            for index, word in enumerate(pending):
+                spot = None if word in no_room else board.free_spot(word)
+                if spot:
+                    options = [spot]
+                    break
+                no_room |= {word}
+            else:
+                return False  # nothing left fits anywhere
+
+        # Words passed over go to the back, so they aren't rescanned first at every node
+        rest = pending[index + 1:] + pending[:index]
+        stuck = {**stuck, **newly_stuck}
+        stuck.pop(word, None)
+        for crossings, r, c, across in options:
+            filled_cells.append(board.place(word, r, c, across))
+            placements.append((word, r, c, across))
+            stop = visit(rest, stuck, no_room, intersections + crossings)
+            placements.pop()
+            board.remove(word, r, c, across, filled_cells.pop())
+            if stop:
+                return True
+        return False
+
+    visit(words[1:], {}, frozenset(), 0)
+    return best["placements"]
+
+
+def _prepare_words(
+    words: List[Dict[str, str]],
+    size: Optional[int],
+    time_budget_ms: Optional[int]
+) -> Tuple[List[str], int, int]:
+    """
+    Validate a generation request.
+
     Returns:
-        Dict with "grid" (2D array) and "placements" (list of placement info)
-    
+        Tuple of (distinct words that fit the grid, grid size, time budget in ms)
+
     Raises:
-        ValueError: If words list is empty
+        ValueError: If words list is empty or too long, or size / time budget are out of range
     """
     if not words:
         raise ValueError("Words list cannot be empty")
+    if len(words) > CROSSWORD_MAX_WORDS:
+        raise ValueError(f"At most {CROSSWORD_MAX_WORDS} words per crossword")
 
-    SIZE = CROSSWORD_GRID_SIZE
-    grid = [["" for _ in range(SIZE)] for _ in range(SIZE)]
-    placements: List[Dict[str, Any]] = []
+    size = size or default_grid_size([w["word"] for w in words])
+    if not CROSSWORD_MIN_GRID_SIZE <= size <= CROSSWORD_MAX_GRID_SIZE:
+        raise ValueError(
+            f"Grid size must be between {CROSSWORD_MIN_GRID_SIZE} and {CROSSWORD_MAX_GRID_SIZE}"
+        )
+    budget_ms = time_budget_ms or CROSSWORD_TIME_BUDGET_MS
+    if not 0 < budget_ms <= CROSSWORD_MAX_TIME_BUDGET_MS:
+        raise ValueError(f"Time budget must be between 1 and {CROSSWORD_MAX_TIME_BUDGET_MS} ms")
 
-    def can_place_horizontal(word: str, row: int, col: int) -> bool:
-        """Check if word can be placed horizontally at position."""
-        if col + len(word) > SIZE:
-            return False
-        for i, ch in enumerate(word):
-            if grid[row][col + i] not in ("", ch):
-                return False
-        return True
-
-    def can_place_vertical(word: str, row: int, col: int) -> bool:
-        """Check if word can be placed vertically at position."""
-        if row + len(word) > SIZE:
-            return False
-        for i, ch in enumerate(word):
-            if grid[row + i][col] not in ("", ch):
-                return False
-        return True
+    # Duplicates and words too long for the grid are dropped
+    unique = list(dict.fromkeys(w["word"] for w in words if 0 < len(w["word"]) <= size))
+    return unique, size, budget_ms
+
+
+def default_grid_size(words: List[str]) -> int:
+    """
+    Grid size for words when the request doesn't set one: CROSSWORD_CELLS_PER_LETTER
+    cells per letter, at least the longest word, within the allowed range. Words longer
+    than CROSSWORD_MAX_GRID_SIZE are ignored (they are left out anyway).
+    """
+    lengths = [len(w) for w in dict.fromkeys(words) if len(w) <= CROSSWORD_MAX_GRID_SIZE]
+    if not lengths:
+        return CROSSWORD_MIN_GRID_SIZE
+    size = max(math.ceil(math.sqrt(sum(lengths) * CROSSWORD_CELLS_PER_LETTER)), max(lengths))
+    return min(max(size, CROSSWORD_MIN_GRID_SIZE), CROSSWORD_MAX_GRID_SIZE)
+
+
+def _word_order(words: List[str], seed: int) -> List[str]:
+    """
+    Order in which the search places words.
+
+    Seed 0 is longest first (stable, so ties keep their order). Other seeds shuffle words
+    of similar length, giving each candidate layout a different start.
+    """
+    if not seed:
+        return sorted(words, key=len, reverse=True)
+    rng = random.Random(seed)
+    return sorted(words, key=lambda w: len(w) + rng.uniform(0, CROSSWORD_ORDER_JITTER), reverse=True)
 
-    def place_horizontal(word: str, row: int, col: int) -> None:
-        """Place word horizontally on grid."""
-        for i, ch in enumerate(word):
-            grid[row][col + i] = ch
-        placements.append({
-            "word": word,
-            "row": row,
-            "col": col,
-            "direction": "ACROSS"
-        })
 
-    def place_vertical(word: str, row: int, col: int) -> None:
-        """Place word vertically on grid."""
+def _layout(words: List[str], size: int, seed: int, deadline: float) -> List[Placement]:
+    """One layout search over words (in the order for seed), until deadline (perf_counter)."""
+    if not words:
+        return []
+    return _search(_word_order(words, seed), size, CROSSWORD_SEARCH_NODES, CROSSWORD_SEARCH_BRANCHING, deadline)
+
+
+def layout_score(placements: List[Placement]) -> Tuple[int, int, int]:
+    """
+    Rank a layout: most words placed, then most intersections, then most compact
+    (smallest bounding box). Higher is better.
+    """
+    if not placements:
+        return (0, 0, 0)
+    cells = {}
+    for word, row, col, across in placements:
+        for i in range(len(word)):
+            cell = (row, col + i) if across else (row + i, col)
+            cells[cell] = cells.get(cell, 0) + 1
+    intersections = sum(1 for count in cells.values() if count > 1)
+    rows = [r for r, _ in cells]
+    cols = [c for _, c in cells]
+    area = (max(rows) - min(rows) + 1) * (max(cols) - min(cols) + 1)
+    return (len(placements), intersections, -area)
+
+
+def _build_result(placed: List[Placement], size: int) -> Dict[str, Any]:
+    """Turn placements into the {"grid", "placements"} response structure."""
+    grid = [["" for _ in range(size)] for _ in range(size)]
+    placements: List[Dict[str, Any]] = []
+    for word, row, col, across in placed:
         for i, ch in enumerate(word):
-            grid[row + i][col] = ch
+            if across:
+                grid[row][col + i] = ch
+            else:
+                grid[row + i][col] = ch
         placements.append({
             "word": word,
             "row": row,
             "col": col,
-            "direction": "DOWN"
+            "direction": "ACROSS" if across else "DOWN"
         })
 
-    # Place first word in the center horizontally
-    first = words[0]["word"]
-    start_col = (SIZE - len(first)) // 2
-    start_row = SIZE // 2
-    place_horizontal(first, start_row, start_col)
-
-    # Place remaining words
-    for w in words[1:]:
-        word = w["word"]
-        
-        # Skip words that are too long for the grid
-        if len(word) > SIZE:
-            continue  # Skip this word, it's too long
-        
-        placed = False
-
-        # Try intersections first
-        for p in placements:
-            pw = p["word"]
-
-            for i, ch1 in enumerate(word):
-                for j, ch2 in enumerate(pw):
-                    if ch1 != ch2:
-                        continue  # Skip if characters don't match
-
-                    # Calculate intersection location
-                    if p["direction"] == "ACROSS":
-                        # Place new word vertically intersecting horizontal word
-                        row = p["row"] - i
-                        col = p["col"] + j
-
-                        if 0 <= row < SIZE and 0 <= col < SIZE:
-                            if can_place_vertical(word, row, col):
-                                place_vertical(word, row, col)
-                                placed = True
-                                break
-
-                    else:  # DOWN direction
-                        # Place new word horizontally intersecting vertical word
-                        row = p["row"] + j
-                        col = p["col"] - i
-
-                        if 0 <= row < SIZE and 0 <= col < SIZE:
-                            if can_place_horizontal(word, row, col):
-                                place_horizontal(word, row, col)
-                                placed = True
-                                break
-
-                if placed:
-                    break
-            if placed:
-                break
-
-        # Fallback: place vertically anywhere if no intersection found
-        if not placed:
-            for r in range(SIZE):
-                for c in range(SIZE):
-                    if can_place_vertical(word, r, c):
-                        place_vertical(word, r, c)
-                        placed = True
-                        break
-                if placed:
-                    break
-        
-        # If still not placed, try horizontal placement as last resort
-        if not placed:
-            for r in range(SIZE):
-                for c in range(SIZE):
-                    if can_place_horizontal(word, r, c):
-                        place_horizontal(word, r, c)
-                        placed = True
-                        break
-                if placed:
-                    break
-
     # Final processing – return structured grid
     output_grid: List[List[Dict[str, Any]]] = []
-    for r in range(SIZE):
+    for r in range(size):
         row: List[Dict[str, Any]] = []
-        for c in range(SIZE):
+        for c in range(size):
             cell = grid[r][c]
             if cell == "":
                 row.append({
@@ -164,3 +409,170 @@ def generate_crossword(words: List[Dict[str, str]]) -> Dict[str, Any]:
         "grid": output_grid,
         "placements": placements
     }
+
+
+def generate_crossword(
+    words: List[Dict[str, str]],
+    size: Optional[int] = None,
+    time_budget_ms: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Generate a crossword puzzle from a list of words with clues.
+
+    Words are laid out longest first with a bounded backtracking search (see _search).
+    Words don't touch except where they cross; words longer than the grid, and words
+    that can't be fitted, are left out.
+
+    Args:
+        words: List of dicts with "word" and "clue" keys
+              Example: [{"word": "ABOVE", "clue": "Higher than"}, ...]
+        size: Grid size (size x size), sized to the words by default (see default_grid_size)
+        time_budget_ms: Search time budget, CROSSWORD_TIME_BUDGET_MS by default
+
+    Returns:
+        Dict with "grid" (2D array) and "placements" (list of placement info)
+
+    Raises:
+        ValueError: If words list is empty or too long, or size / time budget are out of range
+    """
+    unique, size, budget_ms = _prepare_words(words, size, time_budget_ms)
+    deadline = time.perf_counter() + budget_ms / 1000
+    return _build_result(_layout(unique, size, 0, deadline), size)
+
+
+# ----------------------------------------------------------
+# Multi-candidate generation (process pool)
+# ----------------------------------------------------------
+_executor: Optional[ProcessPoolExecutor] = None
+# One no-op task per worker, submitted with the pool: all done once every worker is up
+_warmup: List[Future] = []
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the shared layout process pool (created, and its workers started, on first use)."""
+    global _executor, _warmup
+    if _executor is None:
+        # spawn: forking a process that runs an event loop and DB pools isn't safe
+        _executor = ProcessPoolExecutor(
+            max_workers=CROSSWORD_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        _warmup = [_executor.submit(os.getpid) for _ in range(CROSSWORD_WORKERS)]
+    return _executor
+
+
+def is_ready() -> bool:
+    """Whether the pool exists and its workers have started (spawned workers take a while)."""
+    return _executor is not None and all(future.done() for future in _warmup)
+
+
+def start_workers() -> None:
+    """
+    Start the pool now if multi-candidate generation is on by default (CROSSWORD_CANDIDATES
+    > 1), so the first puzzles don't wait for it. Otherwise it starts on first use.
+    """
+    if CROSSWORD_CANDIDATES <= 1:
+        return
+    get_executor()
+    print(f"🧩 Crossword layout pool: {CROSSWORD_WORKERS} workers")
+
+
+def shutdown() -> None:
+    global _executor, _warmup
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _warmup = []
+
+
+def _layout_candidate(
+    words: List[str],
+    size: int,
+    seed: int,
+    deadline_epoch: float
+) -> Optional[Tuple[Tuple[int, int, int], List[Placement]]]:
+    """
+    Search one candidate layout (runs in a worker process).
+
+    The deadline is wall-clock time (time.time()), the clock shared with the parent
+    process; a candidate that starts after it returns None.
+    """
+    remaining = deadline_epoch - time.time()
+    if remaining <= 0:
+        return None
+    placed = _layout(words, size, seed, time.perf_counter() + remaining)
+    return layout_score(placed), placed
+
+
+async def generate_best_crossword(
+    words: List[Dict[str, str]],
+    size: Optional[int] = None,
+    time_budget_ms: Optional[int] = None,
+    candidates: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Generate a crossword from the best of several candidate layouts searched in parallel.
+
+    Candidate k places the words in the order for seed k (seed 0 is the plain longest-first
+    search of generate_crossword), in the process pool. Candidates still running or queued
+    when the time budget is up are cancelled; the best finished one (see layout_score)
+    wins. With a single candidate, or while the pool is starting up or unusable, this is
+    generate_crossword in a worker thread.
+
+    Args:
+        words: List of dicts with "word" and "clue" keys
+        size: Grid size (size x size), sized to the words by default (see default_grid_size)
+        time_budget_ms: Time budget for the whole puzzle, CROSSWORD_TIME_BUDGET_MS by default
+        candidates: Layouts to search, CROSSWORD_CANDIDATES by default
+
+    Returns:
+        Dict with "grid" (2D array) and "placements" (list of placement info)
+
+    Raises:
+        ValueError: If words list is empty or too long, or size / time budget are out of range
+    """
+    candidates = min(candidates or CROSSWORD_CANDIDATES, CROSSWORD_MAX_CANDIDATES)
+    if candidates <= 1:
+        return await asyncio.to_thread(generate_crossword, words, size, time_budget_ms)
+
+    unique, size, budget_ms = _prepare_words(words, size, time_budget_ms)
+    margin_ms = min(CROSSWORD_RESULT_MARGIN_MS, budget_ms / 2)
+    deadline_epoch = time.time() + (budget_ms - margin_ms) / 1000
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    if not is_ready():
+        # Queued behind workers that are still starting, every candidate would miss the budget
+        return await asyncio.to_thread(generate_crossword, words, size, time_budget_ms)
+    try:
+        futures = [
+            loop.run_in_executor(executor, _layout_candidate, unique, size, seed, deadline_epoch)
+            for seed in range(candidates)
+        ]
+    except RuntimeError as e:  # pool shut down or broken
+        print(f"⚠️ Crossword layout pool unavailable ({e}), searching in a thread")
+        return await asyncio.to_thread(generate_crossword, words, size, time_budget_ms)
+
+    # Workers stop margin_ms before the budget is up, which leaves time to return results
+    done, pending = await asyncio.wait(futures, timeout=budget_ms / 1000)
+    for future in pending:
+        future.cancel()
+
+    best: Optional[Tuple[Tuple[int, int, int], List[Placement]]] = None
+    for future in done:
+        error = future.exception()
+        if error is not None:
+            print(f"⚠️ Crossword candidate failed: {error!r}")
+            if isinstance(error, BrokenProcessPool):
+                shutdown()  # a worker died: start a fresh pool next time
+            continue
+        result = future.result()
+        if result is not None and (best is None or result[0] > best[0]):
+            best = result
+
+    if best is None:
+        # Nothing finished in time (e.g. every worker busy): fall back to one quick search
+        print(f"⚠️ No crossword candidate finished within {budget_ms}ms, searching in a thread")
+        return await asyncio.to_thread(
+            generate_crossword, words, size, min(budget_ms, CROSSWORD_FALLBACK_BUDGET_MS)
+        )
+    return _build_result(best[1], size)
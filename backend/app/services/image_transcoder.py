@@ -0,0 +1,153 @@
+"""
+Transcode generated images into smaller WebP variants.
+
+Decoding and encoding are CPU-bound, so they run in a process pool and never on the event
+loop. At most one transcode per pool worker is submitted at a time; the rest wait their
+turn here, so the timeout only covers the work itself, never time spent queued. Pillow is optional: without it `is_available()` is False and callers keep serving
+the original image.
+"""
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+THUMB_QUALITY = int(os.getenv("IMAGE_THUMB_QUALITY", "70"))
+THUMB_MAX_SIDE = int(os.getenv("IMAGE_THUMB_MAX_SIDE", "256"))
+TRANSCODE_WORKERS = int(os.getenv("IMAGE_TRANSCODE_WORKERS", "2"))
+TRANSCODE_TIMEOUT_SECONDS = float(os.getenv("IMAGE_TRANSCODE_TIMEOUT_SECONDS", "30"))
+
+VARIANT_MIME = "image/webp"
+
+
+@dataclass(frozen=True)
+class VariantSpec:
+    """How to produce a variant: optional bounding box and WebP quality."""
+    max_side: Optional[int]
+    quality: int
+
+
+# 'original' is the image as generated; everything else is derived from it
+VARIANTS: Dict[str, VariantSpec] = {
+    "webp": VariantSpec(max_side=None, quality=WEBP_QUALITY),
+    "thumb": VariantSpec(max_side=THUMB_MAX_SIDE, quality=THUMB_QUALITY),
+}
+
+
+class TranscodeError(Exception):
+    """An image could not be transcoded (or Pillow isn't installed)."""
+
+
+@dataclass(frozen=True)
+class TranscodedImage:
+    data: bytes
+    width: int
+    height: int
+    mime_type: str = VARIANT_MIME
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+# One slot per pool worker, held until the worker is done (even past a timeout)
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def is_available() -> bool:
+    return Image is not None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the shared transcoding process pool (created on first use)."""
+    global _executor
+    if _executor is None:
+        # spawn: forking a process that runs an event loop and DB pools isn't safe
+        _executor = ProcessPoolExecutor(
+            max_workers=TRANSCODE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown() -> None:
+    global _executor, _slots
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    _slots = None
+
+
+def _transcode_all(data: bytes, specs: Dict[str, VariantSpec]) -> Dict[str, Tuple[bytes, int, int]]:
+    """Decode once and encode every variant (runs in a worker process)."""
+    with Image.open(io.BytesIO(data)) as source:
+        source.load()
+        has_alpha = source.mode in ("RGBA", "LA", "PA") or "transparency" in source.info
+        image = source.convert("RGBA" if has_alpha else "RGB")
+
+    results = {}
+    for name, spec in specs.items():
+        variant = image
+        if spec.max_side and max(image.size) > spec.max_side:
+            variant = image.copy()
+            variant.thumbnail((spec.max_side, spec.max_side), Image.LANCZOS)
+        out = io.BytesIO()
+        variant.save(out, format="WEBP", quality=spec.quality, method=4)
+        results[name] = (out.getvalue(), variant.width, variant.height)
+    return results
+
+
+def _release_from_worker(loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore) -> None:
+    """Done-callback of a pool future (runs on the pool's thread): free its slot on the loop."""
+    try:
+        loop.call_soon_threadsafe(slots.release)
+    except RuntimeError:  # loop already closed
+        pass
+
+
+async def transcode(data: bytes, variants: Optional[Dict[str, VariantSpec]] = None) -> Dict[str, TranscodedImage]:
+    """
+    Produce WebP variants of an image in the process pool.
+    
+    Args:
+        data: Original image bytes
+        variants: Variants to produce (default: all of VARIANTS)
+    
+    Returns:
+        Dict of variant name -> TranscodedImage
+    
+    Raises:
+        TranscodeError: If Pillow is missing, the image can't be decoded, or it times out
+    """
+    if not is_available():
+        raise TranscodeError("Pillow is not installed")
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(TRANSCODE_WORKERS)
+    slots = _slots
+    loop = asyncio.get_running_loop()
+
+    await slots.acquire()
+    try:
+        future = get_executor().submit(_transcode_all, data, variants or VARIANTS)
+    except Exception as e:  # pool shut down or broken
+        slots.release()
+        raise TranscodeError(str(e)) from e
+    # A worker that's still busy after the timeout keeps its slot until it finishes
+    future.add_done_callback(lambda _: _release_from_worker(loop, slots))
+
+    try:
+        results = await asyncio.wait_for(asyncio.wrap_future(future), timeout=TRANSCODE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError as e:
+        raise TranscodeError(f"Transcoding timed out after {TRANSCODE_TIMEOUT_SECONDS:g}s") from e
+    except Exception as e:
+        raise TranscodeError(str(e)) from e
+    return {
+        name: TranscodedImage(data=blob, width=width, height=height)
+        for name, (blob, width, height) in results.items()
+    }
@@ -0,0 +1,217 @@
+"""
+Transcoded image variants, each cached under its own (source_digest, variant) key.
+
+Variants are created in the background right after an image is generated, or on first
+request for images generated before variants existed (or still being transcoded). Each variant's bytes are a blob of their own, and the
+image_variants table maps the original digest to it. The mapping never changes once written,
+so it is also kept in a long-lived in-process LRU. Sources that fail to transcode are
+remembered for a short TTL, so they are served as the original without retrying each time.
+"""
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, Literal, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import AsyncSessionLocal
+from app.models.image_variant import ImageVariant
+from app.services import image_transcoder
+from app.services.blob_store import get_blob_store
+from app.services.image_transcoder import TranscodeError
+from app.services.memory_cache import LRUCache
+from app.services.single_flight import SingleFlight
+
+Variant = Literal["original", "webp", "thumb"]
+
+VARIANT_CACHE_MAX_ENTRIES = int(os.getenv("IMAGE_VARIANT_CACHE_MAX_ENTRIES", "8192"))
+VARIANT_FAILURE_TTL_SECONDS = float(os.getenv("IMAGE_VARIANT_FAILURE_TTL_SECONDS", "300"))
+
+_flight = SingleFlight()
+# Background variant creation started by schedule_variants
+_tasks: Set[asyncio.Task] = set()
+
+
+@dataclass(frozen=True)
+class VariantRef:
+    """Blob holding a variant of an image."""
+    digest: str
+    mime: str
+    size: int
+
+
+_variant_cache: LRUCache[VariantRef] = LRUCache(
+    max_entries=VARIANT_CACHE_MAX_ENTRIES,
+    max_bytes=VARIANT_CACHE_MAX_ENTRIES * 256,
+    ttl_seconds=24 * 60 * 60,
+    sizeof=lambda ref: 256,
+)
+
+# Source digests whose variants couldn't be produced (missing or undecodable source)
+_failed_sources: LRUCache[bool] = LRUCache(
+    max_entries=VARIANT_CACHE_MAX_ENTRIES,
+    max_bytes=VARIANT_CACHE_MAX_ENTRIES * 128,
+    ttl_seconds=VARIANT_FAILURE_TTL_SECONDS,
+    sizeof=lambda failed: 128,
+)
+
+
+async def find_variant(db: AsyncSession, source_digest: str, variant: str) -> Optional[VariantRef]:
+    """Look up an existing variant (memory, then image_variants)."""
+    key = (source_digest, variant)
+    ref = _variant_cache.get(key)
+    if ref is not None:
+        return ref
+    row = await db.scalar(select(ImageVariant).where(
+        ImageVariant.source_digest == source_digest,
+        ImageVariant.variant == variant
+    ).limit(1))
+    if row is None:
+        return None
+    ref = VariantRef(row.digest, row.mime, row.size)
+    _variant_cache.put(key, ref)
+    return ref
+
+
+async def get_or_create_variant(db: AsyncSession, source_digest: str, variant: str) -> Optional[VariantRef]:
+    """
+    Return a variant of an image, transcoding it now if it doesn't exist yet.
+    
+    Returns:
+        VariantRef, or None if the variant can't be produced (no Pillow, missing or
+        undecodable source); callers should fall back to the original
+    """
+    ref = await find_variant(db, source_digest, variant)
+    if ref is not None:
+        return ref
+    created = await _create_on_demand(source_digest)
+    return created.get(variant)
+
+
+async def get_or_create_variants(
+    db: AsyncSession,
+    source_digests: Iterable[str],
+    variant: str
+) -> Dict[str, VariantRef]:
+    """
+    Bulk get_or_create_variant: one query for the variants that exist, then the missing
+    ones transcoded concurrently (the transcoding itself runs in a process pool).
+    
+    Returns:
+        Dict of source digest -> VariantRef for every variant that exists or could be produced
+    """
+    found: Dict[str, VariantRef] = {}
+    missing = []
+    for source_digest in dict.fromkeys(source_digests):
+        ref = _variant_cache.get((source_digest, variant))
+        if ref is not None:
+            found[source_digest] = ref
+        else:
+            missing.append(source_digest)
+    if not missing:
+        return found
+
+    rows = await db.scalars(select(ImageVariant).where(
+        ImageVariant.source_digest.in_(missing),
+        ImageVariant.variant == variant
+    ))
+    for row in rows:
+        ref = VariantRef(row.digest, row.mime, row.size)
+        _variant_cache.put((row.source_digest, variant), ref)
+        found[row.source_digest] = ref
+
+    to_create = [source_digest for source_digest in missing if source_digest not in found]
+    for source_digest, created in zip(to_create, await asyncio.gather(*map(_create_on_demand, to_create))):
+        if variant in created:
+            found[source_digest] = created[variant]
+    return found
+
+
+def schedule_variants(source_digest: str, data: bytes) -> None:
+    """
+    create_variants in a background task of this process, so a freshly generated image is
+    returned without waiting for transcoding. Requests for its variants meanwhile share
+    the same work (see _create_on_demand).
+    """
+    if not image_transcoder.is_available():
+        return
+    task = asyncio.create_task(_flight.do(source_digest, lambda: create_variants(source_digest, data)))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def _create_on_demand(source_digest: str) -> Dict[str, VariantRef]:
+    """create_variants for a request path: coalesced per source, skipped after a recent failure."""
+    if not image_transcoder.is_available() or _failed_sources.get(source_digest):
+        return {}
+    created = await _flight.do(source_digest, lambda: create_variants(source_digest))
+    if not created:
+        _failed_sources.put(source_digest, True)
+    return created
+
+
+async def create_variants(source_digest: str, data: Optional[bytes] = None) -> Dict[str, VariantRef]:
+    """
+    Transcode an image into every variant and record them.
+    Failures are logged, not raised: variants are an optimization.
+    
+    Args:
+        source_digest: Digest of the original image
+        data: Original bytes, if the caller already has them (otherwise read from the blob store)
+    
+    Returns:
+        Dict of variant name -> VariantRef (empty if transcoding isn't possible)
+    """
+    if not image_transcoder.is_available():
+        return {}
+    store = get_blob_store()
+    if data is None:
+        data = await store.get_async(source_digest)
+        if data is None:
+            logging.warning(f"Can't create variants: image blob {source_digest} is missing")
+            return {}
+
+    try:
+        transcoded = await image_transcoder.transcode(data)
+    except TranscodeError as e:
+        logging.warning(f"Failed to transcode image {source_digest}: {str(e)}")
+        return {}
+
+    refs: Dict[str, VariantRef] = {}
+    rows = []
+    for name, image in transcoded.items():
+        blob = await store.put_async(image.data)
+        refs[name] = VariantRef(blob.digest, image.mime_type, blob.size)
+        rows.append(ImageVariant(
+            source_digest=source_digest,
+            variant=name,
+            digest=blob.digest,
+            mime=image.mime_type,
+            size=blob.size,
+            width=image.width,
+            height=image.height
+        ))
+
+    async with AsyncSessionLocal() as db:
+        try:
+            existing = set((await db.scalars(
+                select(ImageVariant.variant).where(ImageVariant.source_digest == source_digest)
+            )).all())
+            db.add_all(row for row in rows if row.variant not in existing)
+            await db.commit()
+        except IntegrityError:
+            # Another worker recorded the same variants first; theirs are byte-identical
+            await db.rollback()
+        except Exception as e:
+            await db.rollback()
+            logging.warning(f"Failed to save image variants for {source_digest}: {str(e)}")
+
+    for name, ref in refs.items():
+        _variant_cache.put((source_digest, name), ref)
+    original_kb = len(data) / 1024
+    sizes = ", ".join(f"{name} {ref.size / 1024:.0f}KB" for name, ref in refs.items())
+    print(f"🗜️ Transcoded image {source_digest[:12]} ({original_kb:.0f}KB): {sizes}")
+    return refs
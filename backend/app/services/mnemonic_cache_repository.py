@@ -0,0 +1,112 @@
+"""
+Write path for mnemonic_cache: single-statement upserts.
+
+Every write is one INSERT ... ON CONFLICT (cache_key) DO UPDATE,
+so there is no select-then-write round-trip and no unique-key race between concurrent
+writers. Text and image columns are merged: values that are already set are never
+overwritten, so a text write and an image write for the same key can land in either order.
+"""
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.mnemonic_cache import MnemonicCache
+
+CacheKey = bytes  # 32-byte SHA-256, see mnemonic_service.cache_key
+
+# Dialects with INSERT ... ON CONFLICT support (Postgres in production, SQLite for local dev)
+_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+_CONFLICT_COLUMNS = ["cache_key"]
+# NOT NULL columns written as "" until their value is known
+_TEXT_COLUMNS = ("mnemonic_word", "mnemonic_sentence")
+_IMAGE_COLUMNS = ("image_digest", "image_mime", "image_size")
+
+
+@dataclass
+class CacheEntry:
+    """Values to merge into one mnemonic_cache row (None = leave as is)."""
+    key: CacheKey
+    language: str
+    mnemonic_word: Optional[str] = None
+    mnemonic_sentence: Optional[str] = None
+    image_digest: Optional[str] = None
+    image_mime: Optional[str] = None
+    image_size: Optional[int] = None
+
+    def merge(self, other: "CacheEntry") -> None:
+        """Fill this entry's unset values from another entry for the same key."""
+        for f in fields(self):
+            if f.name not in ("key", "language") and not getattr(self, f.name):
+                setattr(self, f.name, getattr(other, f.name))
+
+    def to_values(self) -> Dict[str, object]:
+        values: Dict[str, object] = {"cache_key": self.key, "language": self.language}
+        for column in _TEXT_COLUMNS:
+            values[column] = getattr(self, column) or ""
+        for column in _IMAGE_COLUMNS:
+            values[column] = getattr(self, column)
+        return values
+
+
+def _upsert_statement(dialect: str, rows: List[Dict[str, object]]):
+    insert = _INSERTS.get(dialect)
+    if insert is None:
+        raise ValueError(f"mnemonic_cache upserts are not supported on the {dialect!r} dialect")
+
+    stmt = insert(MnemonicCache).values(rows)
+    table = MnemonicCache.__table__
+    # Word and sentence belong together: take both from the new row only while the
+    # existing one has no mnemonic word yet ("" is the "not generated yet" placeholder)
+    text_missing = func.coalesce(table.c.mnemonic_word, "") == ""
+    merged = {
+        **{c: case((text_missing, stmt.excluded[c]), else_=table.c[c]) for c in _TEXT_COLUMNS},
+        **{c: func.coalesce(table.c[c], stmt.excluded[c]) for c in _IMAGE_COLUMNS},
+        "updated_at": func.now(),
+    }
+    return stmt.on_conflict_do_update(index_elements=_CONFLICT_COLUMNS, set_=merged)
+
+
+async def upsert(db: AsyncSession, entry: CacheEntry) -> None:
+    """
+    Insert or merge one mnemonic_cache row (caller commits).
+    
+    Args:
+        db: Database session
+        entry: Key and the values to merge
+    """
+    await upsert_many(db, [entry])
+
+
+async def upsert_many(db: AsyncSession, entries: Iterable[CacheEntry]) -> int:
+    """
+    Insert or merge many mnemonic_cache rows in one statement (caller commits).
+    Entries for the same key are merged first, since one ON CONFLICT statement
+    can't touch a row twice.
+    
+    Args:
+        db: Database session
+        entries: Keys and the values to merge
+    
+    Returns:
+        Number of distinct keys written
+    """
+    by_key: Dict[CacheKey, CacheEntry] = {}
+    for entry in entries:
+        if entry.key in by_key:
+            by_key[entry.key].merge(entry)
+        else:
+            by_key[entry.key] = CacheEntry(**{f.name: getattr(entry, f.name) for f in fields(entry)})
+    if not by_key:
+        return 0
+
+    dialect = db.get_bind().dialect.name
+    rows = [entry.to_values() for entry in by_key.values()]
+    await db.execute(_upsert_statement(dialect, rows))
+    return len(rows)
@@ -0,0 +1,691 @@
+"""
+Get-or-generate for cached mnemonics.
+
+A cache miss runs one generation per key: concurrent requests in this process share it
+through SingleFlight, and across workers the generating worker holds a claim on the key
+(single_flight.claims) until the result is stored; the other workers poll mnemonic_cache
+for it instead of calling the model. Generation uses short-lived sessions of its own, so
+no pooled connection is held during the AI call and the work isn't tied to whichever
+request started it.
+
+Reads go through a bounded in-process LRU tier (`memory_tier`) in front of mnemonic_cache.
+Writes are single-statement upserts (see mnemonic_cache_repository). Writes from this
+process invalidate the tier entry; writes from other workers show up once the entry's
+TTL runs out.
+
+Image generation failures are remembered per key for a short TTL (`negative_cache`), so
+clients retrying a word that just failed get an immediate error instead of another wait.
+"""
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import AsyncSessionLocal
+from app.models.mnemonic_cache import MnemonicCache
+from app.services import ai_service, image_variants, mnemonic_cache_repository
+from app.services.ai_service import PROMPT_VERSION
+from app.services.blob_store import get_blob_store
+from app.services.memory_cache import LRUCache
+from app.services.mnemonic_cache_repository import CacheEntry, CacheKey
+from app.services.single_flight import CLAIM_WAIT_SECONDS, Claim, SingleFlight, claims
+
+MEMORY_CACHE_MAX_ENTRIES = int(os.getenv("MNEMONIC_MEMORY_CACHE_MAX_ENTRIES", "2048"))
+MEMORY_CACHE_MAX_BYTES = int(os.getenv("MNEMONIC_MEMORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+MEMORY_CACHE_TTL_SECONDS = float(os.getenv("MNEMONIC_MEMORY_CACHE_TTL_SECONDS", "600"))
+STREAM_BATCH_SIZE = int(os.getenv("MNEMONIC_STREAM_BATCH_SIZE", "20"))
+NEGATIVE_CACHE_TTL_SECONDS = float(os.getenv("IMAGE_NEGATIVE_CACHE_TTL_SECONDS", "60"))
+NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv("IMAGE_NEGATIVE_CACHE_MAX_ENTRIES", "10000"))
+
+_flight = SingleFlight()
+
+# Cache entries whose write failed. Generation still succeeds (the caller gets its result),
+# so failed writes are logged and counted here rather than raised.
+write_errors = 0
+
+
+@dataclass(frozen=True)
+class CachedMnemonic:
+    """Detached snapshot of a mnemonic_cache row (safe to share across requests)."""
+    mnemonic_word: Optional[str]
+    mnemonic_sentence: Optional[str]
+    image_digest: Optional[str]
+    image_mime: Optional[str] = None
+    image_size: Optional[int] = None
+
+    @classmethod
+    def from_row(cls, row: MnemonicCache) -> "CachedMnemonic":
+        return cls(
+            mnemonic_word=row.mnemonic_word or None,
+            mnemonic_sentence=row.mnemonic_sentence or None,
+            image_digest=row.image_digest or None,
+            image_mime=row.image_mime,
+            image_size=row.image_size,
+        )
+
+    @classmethod
+    def from_entry(cls, entry: CacheEntry) -> "CachedMnemonic":
+        return cls(
+            mnemonic_word=entry.mnemonic_word or None,
+            mnemonic_sentence=entry.mnemonic_sentence or None,
+            image_digest=entry.image_digest,
+            image_mime=entry.image_mime,
+            image_size=entry.image_size,
+        )
+
+    @property
+    def has_text(self) -> bool:
+        return bool(self.mnemonic_word and self.mnemonic_sentence)
+
+    @property
+    def has_image(self) -> bool:
+        return bool(self.image_digest)
+
+    def size_bytes(self) -> int:
+        # Fixed overhead for the key, tuple and dataclass, plus the (mostly ASCII) payloads
+        fields = (self.mnemonic_word, self.mnemonic_sentence, self.image_digest, self.image_mime)
+        return 256 + sum(len(f) for f in fields if f)
+
+
+memory_tier: LRUCache[CachedMnemonic] = LRUCache(
+    max_entries=MEMORY_CACHE_MAX_ENTRIES,
+    max_bytes=MEMORY_CACHE_MAX_BYTES,
+    ttl_seconds=MEMORY_CACHE_TTL_SECONDS,
+    sizeof=CachedMnemonic.size_bytes,
+)
+
+# cache key -> (error message, monotonic time the entry expires)
+negative_cache: LRUCache[Tuple[str, float]] = LRUCache(
+    max_entries=NEGATIVE_CACHE_MAX_ENTRIES,
+    max_bytes=NEGATIVE_CACHE_MAX_ENTRIES * 512,
+    ttl_seconds=NEGATIVE_CACHE_TTL_SECONDS,
+    sizeof=lambda failure: 64 + len(failure[0]),
+)
+
+
+@dataclass(frozen=True)
+class MnemonicTextResult:
+    mnemonic_word: str
+    mnemonic_sentence: str
+    cached: bool
+
+
+@dataclass(frozen=True)
+class MnemonicImageResult:
+    image_digest: str
+    image_mime: str
+    image_size: int
+    cached: bool
+
+
+def _hash_string(s: str) -> str:
+    """Generate SHA256 hash of a string for cache keys."""
+    return hashlib.sha256(s.lower().strip().encode()).hexdigest()
+
+
+def cache_key(word: str, definition: str, language: str, prompt_version: int = PROMPT_VERSION) -> CacheKey:
+    """
+    Build the 32-byte mnemonic_cache key for a word/definition/language.
+
+    The digest is taken over the per-field hashes rather than the raw text, which is what
+    let the migration backfill keys from the old word_hash/definition_hash columns.
+    """
+    parts = (_hash_string(word), _normalize_language(language), _hash_string(definition), str(prompt_version))
+    return hashlib.sha256(":".join(parts).encode()).digest()
+
+
+def _normalize_language(language: str) -> str:
+    return language.lower().strip()
+
+
+async def lookup(db: AsyncSession, key: CacheKey) -> Optional[CachedMnemonic]:
+    """
+    Look up a cached mnemonic: in-process tier first, then mnemonic_cache.
+
+    Returns:
+        CachedMnemonic snapshot, or None if nothing is cached for key
+    """
+    hit = memory_tier.get(key)
+    if hit is not None:
+        return hit
+    row = await find_cached(db, key)
+    if row is None:
+        return None
+    snapshot = CachedMnemonic.from_row(row)
+    memory_tier.put(key, snapshot)
+    return snapshot
+
+
+async def lookup_many(db: AsyncSession, keys: Iterable[CacheKey]) -> Dict[CacheKey, CachedMnemonic]:
+    """
+    Look up many cached mnemonics: the in-process tier first, then one query for the rest.
+
+    Returns:
+        Dict of key -> CachedMnemonic for every key that is cached (missing keys are absent)
+    """
+    found: Dict[CacheKey, CachedMnemonic] = {}
+    missing = []
+    for key in dict.fromkeys(keys):
+        hit = memory_tier.get(key)
+        if hit is not None:
+            found[key] = hit
+        else:
+            missing.append(key)
+    if not missing:
+        return found
+
+    rows = await db.scalars(select(MnemonicCache).where(MnemonicCache.cache_key.in_(missing)))
+    for row in rows:
+        key = row.cache_key
+        snapshot = CachedMnemonic.from_row(row)
+        memory_tier.put(key, snapshot)
+        found[key] = snapshot
+    return found
+
+
+async def stream_cached(
+    db: AsyncSession,
+    keys: Iterable[CacheKey],
+    batch_size: int = STREAM_BATCH_SIZE
+) -> AsyncIterator[Tuple[CacheKey, CachedMnemonic]]:
+    """
+    Like lookup_many, but yield each hit as soon as it is available.
+    Tier hits come first; the rest are read through a server-side cursor in batches,
+    so memory stays flat however many keys are requested.
+
+    Yields:
+        (key, CachedMnemonic) for every cached key, in no particular order
+    """
+    missing = []
+    for key in dict.fromkeys(keys):
+        hit = memory_tier.get(key)
+        if hit is not None:
+            yield key, hit
+        else:
+            missing.append(key)
+    if not missing:
+        return
+
+    result = await db.stream_scalars(
+        select(MnemonicCache).where(
+            MnemonicCache.cache_key.in_(missing)
+        ).execution_options(yield_per=batch_size)
+    )
+    async for row in result:
+        key = row.cache_key
+        snapshot = CachedMnemonic.from_row(row)
+        memory_tier.put(key, snapshot)
+        yield key, snapshot
+
+
+async def find_cached(db: AsyncSession, key: CacheKey) -> Optional[MnemonicCache]:
+    """Look up a mnemonic_cache row by key (database only, bypasses the memory tier)."""
+    return await db.scalar(select(MnemonicCache).where(MnemonicCache.cache_key == key))
+
+
+def _lock_name(kind: str, key: CacheKey) -> str:
+    return f"mnemonic-{kind}:{key.hex()}"
+
+
+async def _claim(
+    kind: str,
+    key: CacheKey,
+    deadline: Optional[float] = None
+) -> Tuple[Optional[MnemonicCache], Optional[Claim]]:
+    """
+    Claim generating kind for key, or wait until the worker holding the claim stored it
+    (waiting no longer than the deadline allows).
+
+    Returns:
+        (row, None) if the result is cached, else (None, claim) to generate and store under
+    """
+    async def stored() -> Optional[MnemonicCache]:
+        async with AsyncSessionLocal() as db:
+            row = await find_cached(db, key)
+        if row is None or not _has_result(row, kind):
+            return None
+        memory_tier.put(key, CachedMnemonic.from_row(row))
+        return row
+
+    timeout = max(0.0, min(CLAIM_WAIT_SECONDS, ai_service.remaining_seconds(deadline)))
+    return await claims.claim_or_wait(_lock_name(kind, key), stored, timeout)
+
+
+async def get_or_generate_text(
+    word: str,
+    definition: str,
+    language: str,
+    writer: Optional["CacheWriteBatcher"] = None,
+    deadline: Optional[float] = None
+) -> MnemonicTextResult:
+    """
+    Return the cached mnemonic text, generating (once) on a miss.
+
+    Args:
+        writer: Batch the cache write through this batcher instead of writing immediately
+        deadline: time.monotonic() by which to give up on the AI call (coalesced callers
+            share the first caller's)
+
+    Raises:
+        AIServiceError: If generation fails (every coalesced caller gets the error)
+    """
+    key = cache_key(word, definition, language)
+    return await _flight.do(
+        ("text", key), lambda: _generate_text(word, definition, language, key, writer, deadline=deadline)
+    )
+
+
+class _TextBatch:
+    """One batched text generation shared by its words; the first word that needs it starts it."""
+
+    def __init__(self, words: Sequence[Tuple[CacheKey, str, str]], deadline: Optional[float] = None):
+        self._positions = {key: position for position, (key, _, _) in enumerate(words)}
+        self._words = [(word, definition) for _, word, definition in words]
+        self._deadline = deadline
+        self._task: Optional[asyncio.Future] = None
+
+    async def result_for(self, key: CacheKey) -> ai_service.BatchTextResult:
+        if self._task is None:
+            self._task = asyncio.ensure_future(ai_service.generate_mnemonic_text_batch(self._words, self._deadline))
+        results = await asyncio.shield(self._task)
+        return results[self._positions[key]]
+
+
+async def get_or_generate_text_batch(
+    words: Sequence[Tuple[str, str, str]],
+    writer: Optional["CacheWriteBatcher"] = None,
+    deadline: Optional[float] = None
+) -> List[Union[MnemonicTextResult, Exception]]:
+    """
+    Return cached mnemonic text for several words, generating the misses in batched calls.
+
+    Missing words are registered with single-flight for the duration of the batch, so a
+    concurrent request for one of them waits for the batch instead of calling the model
+    again. Words the batch response leaves out or gets wrong fall back to the single-word
+    path; if the batch call itself fails, its words fail with it. Results are stored like
+    single-word ones, so a word another worker cached meanwhile returns that worker's text.
+
+    Args:
+        words: (word, definition, language) triples
+        writer: Batch the cache writes through this batcher (default: one upsert for the call)
+        deadline: time.monotonic() by which to give up on the AI calls
+
+    Returns:
+        MnemonicTextResult, or the exception that generation raised, per word in input order
+    """
+    if writer is None:
+        async with CacheWriteBatcher(max_batch=max(1, len(words))) as own_writer:
+            return await get_or_generate_text_batch(words, own_writer, deadline)
+
+    keys = [cache_key(word, definition, language) for word, definition, language in words]
+    async with AsyncSessionLocal() as db:
+        found = await lookup_many(db, keys)
+
+    missing: Dict[CacheKey, Tuple[str, str]] = {}
+    for key, (word, definition, _) in zip(keys, words):
+        cached = found.get(key)
+        if (cached and cached.has_text) or key in missing or _flight.is_inflight(("text", key)):
+            continue
+        missing[key] = (word, definition)
+
+    # Words another worker is generating go the single-word way (which waits for it)
+    won = await asyncio.gather(*(claims.try_claim(_lock_name("text", key)) for key in missing))
+    held: Dict[CacheKey, Claim] = {key: claim for key, claim in zip(missing, won) if claim is not None}
+    if held:
+        # ...and words it finished between the lookup and the claim are cached now
+        async with AsyncSessionLocal() as db:
+            rows = await db.scalars(select(MnemonicCache).where(MnemonicCache.cache_key.in_(list(held))))
+            for row in rows:
+                if _has_result(row, "text"):
+                    found[row.cache_key] = CachedMnemonic.from_row(row)
+                    await held.pop(row.cache_key).release()
+    missing = {key: missing[key] for key in held}
+    batch = _TextBatch([(key, word, definition) for key, (word, definition) in missing.items()], deadline)
+
+    async def _one(key: CacheKey, word: str, definition: str, language: str) -> MnemonicTextResult:
+        cached = found.get(key)
+        if cached and cached.has_text:
+            return MnemonicTextResult(cached.mnemonic_word, cached.mnemonic_sentence, cached=True)
+        if key in missing:
+            return await _flight.do(
+                ("text", key),
+                lambda: _generate_text_in_batch(word, definition, language, key, batch, held[key], writer, deadline)
+            )
+        return await _flight.do(
+            ("text", key), lambda: _generate_text(word, definition, language, key, writer, deadline=deadline)
+        )
+
+    return await asyncio.gather(
+        *(_one(key, *triple) for key, triple in zip(keys, words)),
+        return_exceptions=True
+    )
+
+
+async def _generate_text_in_batch(
+    word: str,
+    definition: str,
+    language: str,
+    key: CacheKey,
+    batch: _TextBatch,
+    claim: Claim,
+    writer: "CacheWriteBatcher",
+    deadline: Optional[float] = None
+) -> MnemonicTextResult:
+    try:
+        generated = await batch.result_for(key)
+        if isinstance(generated, ai_service.AIServiceError):
+            raise ai_service.AIServiceError(str(generated)) from generated
+    except BaseException:
+        await claim.release()
+        raise
+    if generated is None:
+        # Missing or invalid in the batch response: one call for this word alone
+        return await _generate_text(word, definition, language, key, writer, claim, deadline)
+
+    mnemonic_word, mnemonic_sentence = generated
+    return await _store_text(key, language, mnemonic_word, mnemonic_sentence, claim, writer)
+
+
+async def _generate_text(
+    word: str,
+    definition: str,
+    language: str,
+    key: CacheKey,
+    writer: Optional["CacheWriteBatcher"],
+    claim: Optional[Claim] = None,
+    deadline: Optional[float] = None
+) -> MnemonicTextResult:
+    if claim is None:
+        # Another worker may have generated it since the caller looked, or be generating it
+        cached, claim = await _claim("text", key, deadline)
+        if cached is not None:
+            return MnemonicTextResult(cached.mnemonic_word, cached.mnemonic_sentence, cached=True)
+
+    try:
+        mnemonic_word, mnemonic_sentence = await ai_service.generate_mnemonic_text(word, definition, deadline)
+    except BaseException:
+        await claim.release()
+        raise
+    return await _store_text(key, language, mnemonic_word, mnemonic_sentence, claim, writer)
+
+
+async def _store_text(
+    key: CacheKey,
+    language: str,
+    mnemonic_word: str,
+    mnemonic_sentence: str,
+    claim: Claim,
+    writer: Optional["CacheWriteBatcher"]
+) -> MnemonicTextResult:
+    entry = CacheEntry(
+        key,
+        _normalize_language(language),
+        mnemonic_word=mnemonic_word,
+        mnemonic_sentence=mnemonic_sentence
+    )
+    await _save(entry, claim, "Failed to cache mnemonic", writer)
+    return MnemonicTextResult(mnemonic_word, mnemonic_sentence, cached=False)
+
+
+async def get_or_generate_image(
+    word: str,
+    definition: str,
+    language: str,
+    mnemonic_sentence: str,
+    writer: Optional["CacheWriteBatcher"] = None,
+    deadline: Optional[float] = None
+) -> MnemonicImageResult:
+    """
+    Return the cached mnemonic image, generating (once) on a miss.
+
+    Args:
+        writer: Batch the cache write through this batcher instead of writing immediately
+        deadline: time.monotonic() by which to give up on the AI call (coalesced callers
+            share the first caller's)
+
+    Raises:
+        AIUnavailableError: If generation failed for this key within the negative-cache TTL,
+            or the image circuit is open
+        AIServiceError: If generation fails (every coalesced caller gets the error)
+    """
+    key = cache_key(word, definition, language)
+    failure = negative_cache.get(key)
+    if failure is not None:
+        message, expires_at = failure
+        raise ai_service.AIUnavailableError(
+            f"Image generation failed recently for this word: {message}",
+            max(0.0, expires_at - time.monotonic())
+        )
+
+    try:
+        return await _flight.do(
+            ("image", key),
+            lambda: _generate_image(word, definition, language, mnemonic_sentence, key, writer, deadline)
+        )
+    except (
+        ai_service.AIUnavailableError,
+        ai_service.AIRateLimitedError,
+        ai_service.AIConfigurationError,
+        ai_service.AIDeadlineExceededError
+    ):
+        # Circuit open, throttled locally, misconfigured or out of time: nothing was learned about this key
+        raise
+    except ai_service.AIServiceError as e:
+        negative_cache.put(key, (str(e), time.monotonic() + NEGATIVE_CACHE_TTL_SECONDS))
+        raise
+
+
+async def _generate_image(
+    word: str,
+    definition: str,
+    language: str,
+    mnemonic_sentence: str,
+    key: CacheKey,
+    writer: Optional["CacheWriteBatcher"],
+    deadline: Optional[float] = None
+) -> MnemonicImageResult:
+    # Another worker may have generated it since the caller looked, or be generating it
+    cached, claim = await _claim("image", key, deadline)
+    if cached is not None:
+        return MnemonicImageResult(
+            cached.image_digest, cached.image_mime, cached.image_size, cached=True
+        )
+
+    try:
+        image = await ai_service.generate_mnemonic_image(word, definition, mnemonic_sentence, deadline)
+        # Written before the row that references it
+        ref = await get_blob_store().put_async(image.data)
+    except BaseException:
+        await claim.release()
+        raise
+
+    # If text wasn't generated first, the row is created with an empty mnemonic word
+    entry = CacheEntry(
+        key,
+        _normalize_language(language),
+        mnemonic_sentence=mnemonic_sentence,
+        image_digest=ref.digest,
+        image_mime=image.mime_type,
+        image_size=ref.size
+    )
+    await _save(entry, claim, "Failed to update cache with image", writer)
+
+    # WebP and thumbnail variants, transcoded in the background off the event loop
+    image_variants.schedule_variants(ref.digest, image.data)
+    return MnemonicImageResult(ref.digest, image.mime_type, ref.size, cached=False)
+
+
+async def _save(
+    entry: CacheEntry,
+    claim: Claim,
+    failure_message: str,
+    writer: Optional["CacheWriteBatcher"] = None
+) -> None:
+    """
+    Upsert entry, then release the claim it was generated under.
+
+    A failed write is logged and counted in write_errors instead of raised: the result was
+    generated and is still returned, it's just not cached. With a writer the claim goes along with the entry and is released once its batch is
+    written, so other workers never see the claim gone before the result is stored.
+    """
+    if writer is not None:
+        await writer.add(entry, claim)
+        return
+
+    try:
+        async with AsyncSessionLocal() as db:
+            try:
+                await mnemonic_cache_repository.upsert(db, entry)
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                _record_write_errors(1)
+                logging.warning(f"{failure_message}: {str(e)}")
+        memory_tier.invalidate(entry.key)
+    finally:
+        await claim.release()
+
+
+def _record_write_errors(count: int) -> None:
+    global write_errors
+    write_errors += count
+
+
+def write_stats() -> Dict[str, int]:
+    """Cache write counters for this worker."""
+    return {"write_errors": write_errors}
+
+
+def _has_result(row: MnemonicCache, kind: str) -> bool:
+    if kind == "image":
+        return bool(row.image_digest)
+    return bool(row.mnemonic_word and row.mnemonic_sentence)
+
+
+class CacheWriteBatcher:
+    """
+    Collect mnemonic_cache writes and upsert them in batches (for bulk jobs like pre-generation).
+
+    Entries are flushed once max_batch are pending, or max_delay seconds after the first
+    pending one, in a single statement. Until then they're visible in this process through
+    the memory tier, but not to other workers.
+
+    Use as an async context manager so the last batch is flushed. A batch that fails to
+    write is logged and counted (failed_batches, failed_rows and the module's write_errors),
+    not raised.
+    """
+
+    def __init__(self, max_batch: int = 25, max_delay: float = 2.0):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.failed_batches = 0
+        self.failed_rows = 0
+        self._pending: Dict[CacheKey, CacheEntry] = {}
+        self._claims: List[Claim] = []
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "CacheWriteBatcher":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        await self.flush()
+
+    async def add(self, entry: CacheEntry, claim: Optional[Claim] = None) -> None:
+        """Queue entry; claim (if any) is released once the entry has been written."""
+        if claim is not None:
+            self._claims.append(claim)
+        pending = self._pending.get(entry.key)
+        if pending is None:
+            self._pending[entry.key] = entry
+        else:
+            pending.merge(entry)
+        memory_tier.put(entry.key, CachedMnemonic.from_entry(self._pending[entry.key]))
+
+        if len(self._pending) >= self.max_batch:
+            await self.flush()
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.max_delay)
+        await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._pending:
+                return
+            entries = list(self._pending.values())
+            held, self._claims = self._claims, []
+            self._pending.clear()
+            started = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                try:
+                    await mnemonic_cache_repository.upsert_many(db, entries)
+                    await db.commit()
+                    self.batches += 1
+                    self.rows += len(entries)
+                except Exception as e:
+                    await db.rollback()
+                    self.failed_batches += 1
+                    self.failed_rows += len(entries)
+                    _record_write_errors(len(entries))
+                    logging.warning(f"Failed to cache {len(entries)} mnemonics: {str(e)}")
+                finally:
+                    # The database may have merged in values from other writers
+                    for entry in entries:
+                        memory_tier.invalidate(entry.key)
+                    for claim in held:
+                        await claim.release()
+            self.seconds += time.perf_counter() - started
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "failed_batches": self.failed_batches,
+            "failed_rows": self.failed_rows,
+            "seconds": round(self.seconds, 3)
+        }
+
+
+async def load_image_base64(digest: str) -> Optional[str]:
+    """Read an image from the blob store as base64 (for clients that want it inline)."""
+    data = await get_blob_store().get_async(digest)
+    if data is None:
+        logging.warning(f"Image blob {digest} referenced in mnemonic_cache is missing")
+        return None
+    return base64.b64encode(data).decode("utf-8")
+
+
+async def check_image_blobs(sample: int = 20) -> Tuple[int, int]:
+    """
+    Check that the most recently cached images are still in the blob store.
+    Missing blobs mean BLOB_STORE_DIR was wiped (e.g. by a redeploy): it isn't on
+    persistent storage.
+
+    Returns:
+        (missing, checked)
+    """
+    async with AsyncSessionLocal() as db:
+        digests = (await db.scalars(
+            select(MnemonicCache.image_digest)
+            .where(MnemonicCache.image_digest.isnot(None))
+            .order_by(MnemonicCache.id.desc())
+            .limit(sample)
+        )).all()
+    store = get_blob_store()
+    found = await asyncio.gather(*(asyncio.to_thread(store.exists, digest) for digest in digests))
+    return found.count(False), len(digests)
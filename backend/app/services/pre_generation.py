@@ -2,293 +2,408 @@
 Service for pre-generating mnemonics for the first 10 words of each language/level combination.
 This ensures fast loading for visitors.
 
+Words flow through a staged pipeline (select -> text -> image) with per-stage concurrency
+and request pacing; see run_pipeline.
+
 Note: Currently set to 10 words for better initial UX. After first week, consider reducing to 3
 words to save on API costs while still providing good experience.
 """
+import asyncio
 import hashlib
-from datetime import date
-from typing import List
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-
-from app.models.vocabulary import Vocabulary
-from app.models.mnemonic_cache import MnemonicCache
-import google.generativeai as genai
-import base64
-import json
 import os
-from google.api_core import exceptions as google_exceptions
-
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 
-def _hash_string(s: str) -> str:
-    """Generate SHA256 hash of a string for cache keys."""
-    return hashlib.sha256(s.lower().strip().encode()).hexdigest()
+from app.core.db import AsyncSessionLocal
+from app.models.vocabulary import Vocabulary
+from app.services import ai_service, mnemonic_service
+from app.services.vocabulary_catalog import sample_words
 
 
-def get_deterministic_words(
-    db: Session,
+async def get_deterministic_words(
+    db: AsyncSession,
     language: str,  # Not used for selection, only for documentation
     level: str,
-    limit: int = 3
+    limit: int = 3,
+    for_date: Optional[date] = None
 ) -> List[Vocabulary]:
     """
     Get deterministic words for a level.
     Uses date + level as seed to ensure same English words for everyone.
     Language doesn't affect word selection - only affects which translation/mnemonic to use.
+    Any future date's words can be computed ahead of time, as long as the vocabulary
+    for the level doesn't change in between.
     
     Args:
         db: Database session
         language: Language code ('es' or 'fr') - not used for selection, kept for API compatibility
         level: Difficulty level ('a1', 'a2', 'b1', 'b2')
         limit: Number of words to return (default 3)
+        for_date: Day to select words for (default: today)
     
     Returns:
         List of Vocabulary objects (same English words regardless of language)
     """
-    today = date.today()
+    day = for_date or date.today()
     
     # Create a deterministic seed from date + level only
     # Language doesn't affect which English words are selected
-    seed_string = f"{today.isoformat()}-{level}"
+    seed_string = f"{day.isoformat()}-{level}"
     seed_hash = int(hashlib.md5(seed_string.encode()).hexdigest(), 16)
     
-    # Get all words for this level
-    query = db.query(Vocabulary).filter(Vocabulary.level == level)
-    all_words = query.order_by(Vocabulary.id).all()
+    # Sample ids from the in-memory catalog (seeded, O(limit)) and fetch only those rows
+    selected_words = await sample_words(db, limit, level=level, seed=seed_hash)
     
-    if not all_words:
+    if not selected_words:
         return []
     
-    # Use seed to deterministically select words
-    import random
-    random.seed(seed_hash)
-    selected_words = random.sample(all_words, min(limit, len(all_words)))
-    
     # Sort by ID to ensure consistent order
     selected_words.sort(key=lambda w: w.id)
     
     return selected_words[:limit]
 
 
-async def pre_generate_mnemonic_text(
-    word: Vocabulary,
-    language: str
-) -> tuple[str, str]:
-    """
-    Generate mnemonic text for a word.
-    
-    Returns:
-        Tuple of (mnemonic_word, mnemonic_sentence)
-    """
-    # Get translation based on language
-    translation = word.translation_es if language == "es" else word.translation_fr
-    if not translation:
-        translation = word.word  # Fallback to word itself
-    
-    prompt_text = f"""
-    Create mnemonic JSON.
+PREGEN_TEXT_CONCURRENCY = int(os.getenv("PREGEN_TEXT_CONCURRENCY", "4"))
+PREGEN_IMAGE_CONCURRENCY = int(os.getenv("PREGEN_IMAGE_CONCURRENCY", "4"))
+# Requests per minute each stage may send to Gemini (0 = unlimited)
+PREGEN_TEXT_RPM = float(os.getenv("PREGEN_TEXT_RPM", "300"))
+PREGEN_IMAGE_RPM = float(os.getenv("PREGEN_IMAGE_RPM", "120"))
+PREGEN_WRITE_BATCH_SIZE = int(os.getenv("PREGEN_WRITE_BATCH_SIZE", "25"))
 
-    Word: {translation}
-    Definition: {word.definition}
+LANGUAGES = ["es", "fr"]
+LEVELS = ["a1", "a2", "b1", "b2"]
+WORDS_PER_COMBINATION = 10
+
+Combination = tuple[str, str, date]  # (language, level, day)
+
+
+class RequestPacer:
+    """Spaces out calls to at most rpm per minute (shared by all workers of a stage)."""
+
+    def __init__(self, rpm: float):
+        self.interval = 60.0 / rpm if rpm > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
 
-    STRICT OUTPUT:
-    {{
-      "mnemonic_word": "...",
-      "mnemonic_sentence": "..."
-    }}
-    """
-    
-    try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        text_res = model.generate_content(contents=[prompt_text])
-        
-        if not text_res or not text_res.text:
-            raise ValueError("Empty response from AI service")
-        
-        # Clean markdown
-        raw = text_res.text.strip()
-        raw = raw.replace("```json", "").replace("```", "")
-        raw = raw.replace("**", "")
-        raw = raw.strip()
-        
-        parsed = json.loads(raw)
-        mnemonic_word = parsed.get("mnemonic_word")
-        mnemonic_sentence = parsed.get("mnemonic_sentence")
-        
-        if not mnemonic_word or not mnemonic_sentence:
-            raise ValueError("Missing required fields in response")
-        
-        return mnemonic_word, mnemonic_sentence
-    except Exception as e:
-        print(f"❌ Error generating mnemonic text for {word.word}: {e}")
-        raise
 
+@dataclass
+class StageTimer:
+    """Per-stage timing: calls, time spent in calls, and stage wall-clock time."""
+    calls: int = 0
+    busy_seconds: float = 0.0
+    max_seconds: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
 
-async def pre_generate_mnemonic_image(
-    word: Vocabulary,
-    mnemonic_sentence: str,
+    @asynccontextmanager
+    async def measure(self):
+        started = time.perf_counter()
+        if self.started_at is None:
+            self.started_at = started
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.calls += 1
+            self.busy_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+            self.finished_at = time.perf_counter()
+
+    def as_dict(self) -> dict:
+        wall = (self.finished_at - self.started_at) if self.started_at is not None else 0.0
+        return {
+            "calls": self.calls,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "avg_seconds": round(self.busy_seconds / self.calls, 3) if self.calls else 0.0,
+            "max_seconds": round(self.max_seconds, 3),
+            "wall_seconds": round(wall, 3),
+        }
+
+
+@dataclass
+class _WorkItem:
+    """One word flowing through the pipeline."""
+    stats: dict  # The word's combination stats (updated in place)
+    label: str  # English word, for logs
+    translation: str
+    definition: str
     language: str
-) -> str | None:
-    """
-    Generate mnemonic image for a word.
-    
-    Returns:
-        Base64 encoded image string, or None if generation fails
-    """
+    mnemonic_sentence: Optional[str] = None  # Set once text exists
+    outcome: Optional[str] = None  # "generated" or "errors" once the word is done
+    # Stats of later combinations with the same word, which wait for this item's outcome
+    followers: List[dict] = field(default_factory=list)
+
+
+def _translation_for(word: Vocabulary, language: str) -> str:
     translation = word.translation_es if language == "es" else word.translation_fr
-    if not translation:
-        translation = word.word
-    
-    prompt_image = (
-        f"Funny colorful cartoon illustration representing the mnemonic: {mnemonic_sentence}. "
-        f"This is a memory aid for the word '{translation}' which means: {word.definition}. "
-        "No text in the image. Highly visual and memorable. "
-        "The illustration should help remember the word through the mnemonic connection."
-    )
-    
-    try:
-        img_model = genai.GenerativeModel("gemini-2.5-flash-image")
-        img_res = img_model.generate_content(prompt_image)
-        
-        if img_res and img_res.parts:
-            for part in img_res.parts:
-                if part.inline_data is not None and part.inline_data.data:
-                    if isinstance(part.inline_data.data, bytes):
-                        raw_bytes = part.inline_data.data
-                        image_base64 = base64.b64encode(raw_bytes).decode("utf-8")
-                        return image_base64
-        
-        return None
-    except Exception as e:
-        print(f"⚠️ Error generating image for {word.word}: {e}")
-        return None
+    return translation or word.word  # Fallback to word itself
 
 
-async def pre_generate_for_combination(
-    db: Session,
-    language: str,
-    level: str
-) -> dict:
+async def _plan_combination(
+    db: AsyncSession,
+    combination: Combination,
+    planned: Dict[bytes, _WorkItem]
+) -> tuple[dict, List[_WorkItem], List[_WorkItem]]:
     """
-    Pre-generate mnemonics for the first 10 words of a language/level combination.
-    (Increased from 3 for better initial UX - can reduce back to 3 after first week to save costs)
+    Select a combination's words and work out what each still needs.
+    
+    Args:
+        planned: Work items already queued by this run, by cache key (updated in place),
+            so a word that comes up on several days is only generated once
     
     Returns:
-        Dict with stats about what was generated
+        (stats dict, work items for words that aren't fully cached, earlier work items
+        for words this combination shares with them)
     """
-    print(f"🔄 Pre-generating for {language}/{level}...")
+    language, level, day = combination
+    print(f"🔄 Pre-generating for {language}/{level} ({day.isoformat()})...")
     
     # Get deterministic words
     # Pre-generate first 10 words (increased from 3 for better initial UX)
-    words = get_deterministic_words(db, language, level, limit=10)
-    
-    if not words:
-        print(f"⚠️ No words found for {language}/{level}")
-        return {"language": language, "level": level, "words_processed": 0, "cached": 0, "generated": 0, "errors": 0}
+    words = await get_deterministic_words(db, language, level, limit=WORDS_PER_COMBINATION, for_date=day)
     
     stats = {
         "language": language,
         "level": level,
+        "date": day.isoformat(),
         "words_processed": len(words),
         "cached": 0,
         "generated": 0,
         "errors": 0
     }
+    if not words:
+        print(f"⚠️ No words found for {language}/{level}")
+        return stats, [], []
+    
+    items = [
+        _WorkItem(stats, word.word, _translation_for(word, language), word.definition, language)
+        for word in words
+    ]
+    keys = [mnemonic_service.cache_key(item.translation, item.definition, language) for item in items]
+    found = await mnemonic_service.lookup_many(db, keys)
+    
+    pending, shared = [], []
+    for item, key in zip(items, keys):
+        cached = found.get(key)
+        if cached and cached.has_text and cached.has_image:
+            print(f"  ✅ {item.label}: Already cached")
+            stats["cached"] += 1
+        elif key in planned:
+            # Counted once the earlier combination's item is done, with its outcome
+            shared.append(planned[key])
+        else:
+            planned[key] = item
+            if cached and cached.has_text:
+                item.mnemonic_sentence = cached.mnemonic_sentence
+            pending.append(item)
+    return stats, pending, shared
+
+
+async def run_pipeline(
+    combinations: List[Combination],
+    on_combination_done: Optional[Callable[[dict], Awaitable[None]]] = None
+) -> tuple[List[dict], dict]:
+    """
+    Pre-generate mnemonics for language/level/date combinations as a staged pipeline.
+    
+    select -> text workers -> image workers, connected by queues. Each stage has its
+    own concurrency and request pacing; text is generated several words per AI call
+    and cache writes are batched. Generation goes
+    through mnemonic_service's single-flight path, so a visitor opening the same word
+    at the same moment waits for this generation instead of starting another.
+    Each combination is planned in a short session of its own: no connection is held
+    (or left idle in a transaction) while the stages run.
+    
+    Args:
+        combinations: (language, level, date) triples
+        on_combination_done: Awaited with a combination's stats once all its words are done
+    
+    Returns:
+        (per-combination stats, per-stage timing)
+    """
+    timers = {"select": StageTimer(), "text": StageTimer(), "image": StageTimer()}
+    text_pacer = RequestPacer(PREGEN_TEXT_RPM)
+    image_pacer = RequestPacer(PREGEN_IMAGE_RPM)
+    text_queue: asyncio.Queue = asyncio.Queue()
+    image_queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, PREGEN_IMAGE_CONCURRENCY) * 2)
+    started = time.perf_counter()
+    
+    all_stats = []
+    planned: Dict[bytes, _WorkItem] = {}
+    remaining: Dict[int, int] = {}  # id(stats) -> words of that combination still in flight
+    
+    async def finish(stats: dict) -> None:
+        remaining[id(stats)] -= 1
+        if remaining[id(stats)] == 0 and on_combination_done is not None:
+            # Make sure the combination's results are in the database before reporting it
+            await writer.flush()
+            await on_combination_done(stats)
+    
+    async def finish_shared(stats: dict, outcome: str) -> None:
+        # Generated by an earlier combination of this run: cached as far as this one goes
+        stats["cached" if outcome == "generated" else outcome] += 1
+        await finish(stats)
     
-    for word in words:
+    async def complete(item: _WorkItem, outcome: str) -> None:
+        """Count a word's outcome once it is done (for its followers too)."""
+        item.outcome = outcome
+        item.stats[outcome] += 1
+        await finish(item.stats)
+        for stats in item.followers:
+            await finish_shared(stats, outcome)
+    
+    async with mnemonic_service.CacheWriteBatcher(max_batch=PREGEN_WRITE_BATCH_SIZE) as writer:
+        
+        async def text_worker():
+            while (item := await text_queue.get()) is not None:
+                # Take whatever else is queued, up to one batch, and generate it in one call
+                batch = [item]
+                while len(batch) < max(1, ai_service.TEXT_BATCH_SIZE) and not text_queue.empty():
+                    next_item = text_queue.get_nowait()
+                    if next_item is None:
+                        text_queue.put_nowait(None)  # Leave the stop signal for this worker's next loop
+                        break
+                    batch.append(next_item)
+                
+                await text_pacer.wait()
+                print(f"  📝 Generating text for {', '.join(i.label for i in batch)}...")
+                async with timers["text"].measure():
+                    results = await mnemonic_service.get_or_generate_text_batch(
+                        [(i.translation, i.definition, i.language) for i in batch], writer
+                    )
+                for batch_item, result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        print(f"  ❌ Error processing {batch_item.label}: {result}")
+                        await complete(batch_item, "errors")
+                        continue
+                    batch_item.mnemonic_sentence = result.mnemonic_sentence
+                    await image_queue.put(batch_item)
+        
+        async def image_worker():
+            while (item := await image_queue.get()) is not None:
+                try:
+                    await image_pacer.wait()
+                    print(f"  🖼️ Generating image for {item.label}...")
+                    async with timers["image"].measure():
+                        await mnemonic_service.get_or_generate_image(
+                            item.translation, item.definition, item.language, item.mnemonic_sentence, writer
+                        )
+                except Exception as e:
+                    # Text is still cached; the image can be generated on demand later
+                    print(f"  ⚠️ Error generating image for {item.label}: {e}")
+                    await complete(item, "errors")
+                    continue
+                print(f"  ✅ {item.label}: Generated and cached")
+                await complete(item, "generated")
+        
+        text_workers = [asyncio.create_task(text_worker()) for _ in range(max(1, PREGEN_TEXT_CONCURRENCY))]
+        image_workers = [asyncio.create_task(image_worker()) for _ in range(max(1, PREGEN_IMAGE_CONCURRENCY))]
         try:
-            # Get translation
-            translation = word.translation_es if language == "es" else word.translation_fr
-            if not translation:
-                translation = word.word
-            
-            # Generate cache keys
-            word_hash = _hash_string(translation)
-            definition_hash = _hash_string(word.definition)
-            
-            # Check if already cached
-            cached = db.query(MnemonicCache).filter(
-                MnemonicCache.word_hash == word_hash,
-                MnemonicCache.language == language,
-                MnemonicCache.definition_hash == definition_hash
-            ).first()
+            # Stage 1 feeds the others as soon as each combination is planned
+            for combination in combinations:
+                async with timers["select"].measure(), AsyncSessionLocal() as db:
+                    stats, pending, shared = await _plan_combination(db, combination, planned)
+                all_stats.append(stats)
+                remaining[id(stats)] = len(pending) + len(shared) + 1
+                for leader in shared:
+                    if leader.outcome is None:
+                        leader.followers.append(stats)
+                    else:
+                        await finish_shared(stats, leader.outcome)
+                for item in pending:
+                    if item.mnemonic_sentence:
+                        await image_queue.put(item)
+                    else:
+                        text_queue.put_nowait(item)
+                await finish(stats)  # Planning itself; completes combinations with nothing to do
             
-            if cached and cached.mnemonic_word and cached.mnemonic_sentence and cached.image_base64:
-                print(f"  ✅ {word.word}: Already cached")
-                stats["cached"] += 1
-                continue
-            
-            # Generate mnemonic text
-            print(f"  📝 Generating text for {word.word}...")
-            mnemonic_word, mnemonic_sentence = await pre_generate_mnemonic_text(word, language)
-            
-            # Generate mnemonic image
-            print(f"  🖼️ Generating image for {word.word}...")
-            image_base64 = await pre_generate_mnemonic_image(word, mnemonic_sentence, language)
-            
-            # Save to cache
-            if cached:
-                # Update existing
-                cached.mnemonic_word = mnemonic_word
-                cached.mnemonic_sentence = mnemonic_sentence
-                if image_base64:
-                    cached.image_base64 = image_base64
-            else:
-                # Create new
-                cache_entry = MnemonicCache(
-                    word_hash=word_hash,
-                    language=language,
-                    definition_hash=definition_hash,
-                    mnemonic_word=mnemonic_word,
-                    mnemonic_sentence=mnemonic_sentence,
-                    image_base64=image_base64
-                )
-                db.add(cache_entry)
-            
-            db.commit()
-            print(f"  ✅ {word.word}: Generated and cached")
-            stats["generated"] += 1
-            
-        except Exception as e:
-            print(f"  ❌ Error processing {word.word}: {e}")
-            stats["errors"] += 1
-            db.rollback()
+            for _ in text_workers:
+                text_queue.put_nowait(None)
+            await asyncio.gather(*text_workers)
+            for _ in image_workers:
+                await image_queue.put(None)
+            await asyncio.gather(*image_workers)
+        finally:
+            for task in text_workers + image_workers:
+                task.cancel()
     
-    return stats
+    timing = {name: timer.as_dict() for name, timer in timers.items()}
+    timing["write"] = writer.stats()
+    timing["total_seconds"] = round(time.perf_counter() - started, 3)
+    return all_stats, timing
 
 
-async def pre_generate_all_combinations(db: Session) -> dict:
+def build_combinations(start: Optional[date] = None, days_ahead: int = 0) -> List[Combination]:
+    """
+    Every language/level combination for start and the days_ahead days after it.
+    
+    Args:
+        start: First day (default: today)
+        days_ahead: Extra days to look ahead (0 = start only)
+    """
+    start = start or date.today()
+    days = [start + timedelta(days=offset) for offset in range(days_ahead + 1)]
+    return [(language, level, day) for day in days for language in LANGUAGES for level in LEVELS]
+
+
+async def pre_generate_all_combinations(
+    for_date: Optional[date] = None,
+    days_ahead: int = 0
+) -> dict:
     """
     Pre-generate mnemonics for all language/level combinations.
+    With days_ahead, also warms the cache for the following days' deterministic words
+    (run it off-peak so the new word set isn't cold at midnight).
+    
+    Args:
+        for_date: First day to pre-generate (default: today)
+        days_ahead: Extra days to look ahead
     
     Returns:
         Dict with overall stats
     """
-    languages = ["es", "fr"]
-    levels = ["a1", "a2", "b1", "b2"]
+    combinations = build_combinations(for_date, days_ahead)
     
-    print(f"🚀 Starting pre-generation for {len(languages) * len(levels)} combinations...")
+    print(f"🚀 Starting pre-generation for {len(combinations)} combinations...")
     
-    all_stats = []
-    for language in languages:
-        for level in levels:
-            stats = await pre_generate_for_combination(db, language, level)
-            all_stats.append(stats)
+    all_stats, timing = await run_pipeline(combinations)
     
-    total_stats = {
-        "total_combinations": len(all_stats),
-        "total_words_processed": sum(s["words_processed"] for s in all_stats),
-        "total_cached": sum(s["cached"] for s in all_stats),
-        "total_generated": sum(s["generated"] for s in all_stats),
-        "total_errors": sum(s["errors"] for s in all_stats),
-        "combinations": all_stats
-    }
+    total_stats = summarize(all_stats, timing)
     
     print(f"✅ Pre-generation complete!")
     print(f"   Processed: {total_stats['total_words_processed']} words")
     print(f"   Cached: {total_stats['total_cached']}")
     print(f"   Generated: {total_stats['total_generated']}")
     print(f"   Errors: {total_stats['total_errors']}")
+    print(f"   Took: {timing['total_seconds']:.1f}s "
+          f"(text {timing['text']['busy_seconds']:.1f}s busy, image {timing['image']['busy_seconds']:.1f}s busy)")
     
     return total_stats
 
+
+def summarize(all_stats: List[dict], timing: dict) -> dict:
+    """Overall stats for a run from its per-combination stats."""
+    return {
+        "total_combinations": len(all_stats),
+        "dates": sorted({s["date"] for s in all_stats}),
+        "total_words_processed": sum(s["words_processed"] for s in all_stats),
+        "total_cached": sum(s["cached"] for s in all_stats),
+        "total_generated": sum(s["generated"] for s in all_stats),
+        "total_errors": sum(s["errors"] for s in all_stats),
+        "timing": timing,
+        "combinations": all_stats
+    }
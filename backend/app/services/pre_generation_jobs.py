@@ -0,0 +1,228 @@
+"""
+Background runner for pre-generation jobs.
+
+A job is a row in pre_generation_jobs listing its language/level combinations. The runner
+marks each combination done (with its stats) as soon as it finishes, and refreshes a
+heartbeat while it works. A job whose heartbeat goes stale - the process died or was
+redeployed - is picked up again at the next startup and skips the combinations that are
+already done; within a combination, words that are already cached are skipped anyway.
+
+Jobs use their own sessions, never a request's.
+"""
+import asyncio
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Set
+
+from sqlalchemy import or_, select, update
+
+from app.core.db import AsyncSessionLocal
+from app.models.pre_generation_job import PreGenerationJob
+from app.services.pre_generation import build_combinations, run_pipeline, summarize
+
+JOB_HEARTBEAT_SECONDS = float(os.getenv("PREGEN_JOB_HEARTBEAT_SECONDS", "15"))
+# A running job without a heartbeat for this long is considered interrupted
+JOB_STALE_SECONDS = float(os.getenv("PREGEN_JOB_STALE_SECONDS", "120"))
+JOB_MAX_ATTEMPTS = int(os.getenv("PREGEN_JOB_MAX_ATTEMPTS", "3"))
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Strong references to running job tasks (the event loop only keeps weak ones)
+_tasks: Set[asyncio.Task] = set()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def create_job(for_date: Optional[date] = None, days_ahead: int = 0) -> PreGenerationJob:
+    """
+    Create a queued job for every language/level combination and start it in the background.
+    
+    Args:
+        for_date: First day to pre-generate (default: today)
+        days_ahead: Extra days to look ahead
+    
+    Returns:
+        The new job (detached)
+    """
+    async with AsyncSessionLocal() as db:
+        job = PreGenerationJob(
+            status="queued",
+            attempts=0,
+            # Dates are fixed at creation, so a job resumed after midnight finishes the same days
+            combinations=[
+                {"language": language, "level": level, "date": day.isoformat(), "status": "pending", "stats": None}
+                for language, level, day in build_combinations(for_date, days_ahead)
+            ]
+        )
+        db.add(job)
+        await db.commit()
+    start_job(job.id)
+    return job
+
+
+async def get_job(job_id: int) -> Optional[PreGenerationJob]:
+    async with AsyncSessionLocal() as db:
+        return await db.get(PreGenerationJob, job_id)
+
+
+def start_job(job_id: int, delay: float = 0.0) -> None:
+    """Run a job in a background task of this process (after delay seconds)."""
+    task = asyncio.create_task(run_job(job_id, delay))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def resume_interrupted_jobs() -> List[int]:
+    """
+    Pick up unfinished jobs. Called at startup.
+    
+    Queued jobs and running jobs whose heartbeat is already stale start right away. A job
+    that still looks alive (e.g. this process was restarted moments ago) is retried once
+    its heartbeat would be stale; if another worker really is running it, the claim fails.
+    
+    Returns:
+        Ids of the jobs scheduled
+    """
+    async with AsyncSessionLocal() as db:
+        jobs = (await db.execute(
+            select(PreGenerationJob.id, PreGenerationJob.status, PreGenerationJob.heartbeat_at)
+            .where(PreGenerationJob.status.in_(ACTIVE_STATUSES))
+            .order_by(PreGenerationJob.id)
+        )).all()
+    now = _now()
+    for job_id, status, heartbeat_at in jobs:
+        delay = 0.0
+        if status == "running" and heartbeat_at is not None:
+            if heartbeat_at.tzinfo is None:
+                heartbeat_at = heartbeat_at.replace(tzinfo=timezone.utc)
+            delay = max(0.0, (heartbeat_at - now).total_seconds() + JOB_STALE_SECONDS + 1)
+        print(f"🔁 Resuming pre-generation job {job_id}" + (f" in {delay:.0f}s" if delay else ""))
+        start_job(job_id, delay)
+    return [job_id for job_id, _, _ in jobs]
+
+
+async def _claim(job_id: int) -> bool:
+    """
+    Atomically take ownership of a job, so two workers (or two restarts) never run it at once.
+    """
+    stale_before = _now() - timedelta(seconds=JOB_STALE_SECONDS)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(PreGenerationJob)
+            .where(
+                PreGenerationJob.id == job_id,
+                or_(
+                    PreGenerationJob.status == "queued",
+                    (PreGenerationJob.status == "running") & or_(
+                        PreGenerationJob.heartbeat_at.is_(None),
+                        PreGenerationJob.heartbeat_at < stale_before
+                    )
+                )
+            )
+            .values(
+                status="running",
+                attempts=PreGenerationJob.attempts + 1,
+                heartbeat_at=_now(),
+                started_at=_now()
+            )
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+
+async def _heartbeat(job_id: int) -> None:
+    while True:
+        await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(PreGenerationJob).where(PreGenerationJob.id == job_id).values(heartbeat_at=_now())
+            )
+            await db.commit()
+
+
+async def _finish(job_id: int, status: str, stats: Optional[dict] = None, error: Optional[str] = None) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(PreGenerationJob).where(PreGenerationJob.id == job_id).values(
+                status=status, stats=stats, error=error, finished_at=_now(), heartbeat_at=_now()
+            )
+        )
+        await db.commit()
+
+
+async def run_job(job_id: int, delay: float = 0.0) -> None:
+    """Claim a job and run its remaining combinations through the pre-generation pipeline."""
+    if delay:
+        await asyncio.sleep(delay)
+    if not await _claim(job_id):
+        return  # Finished, or another runner has it
+
+    async with AsyncSessionLocal() as db:
+        job = await db.get(PreGenerationJob, job_id)
+        attempts = job.attempts
+        combinations = [dict(c) for c in job.combinations]
+
+    if attempts > JOB_MAX_ATTEMPTS:
+        await _finish(job_id, "failed", error=f"Gave up after {JOB_MAX_ATTEMPTS} attempts")
+        return
+
+    todo = [
+        (c["language"], c["level"], date.fromisoformat(c["date"]))
+        for c in combinations if c["status"] != "done"
+    ]
+    if attempts > 1:
+        print(f"🔁 Job {job_id}: attempt {attempts}, {len(todo)}/{len(combinations)} combinations left")
+
+    lock = asyncio.Lock()
+
+    async def combination_done(stats: dict) -> None:
+        # Record progress right away, so a restart skips this combination
+        try:
+            async with lock:
+                for c in combinations:
+                    if (c["language"], c["level"], c["date"]) == (stats["language"], stats["level"], stats["date"]):
+                        c["status"] = "done"
+                        c["stats"] = stats
+                async with AsyncSessionLocal() as progress_db:
+                    await progress_db.execute(
+                        update(PreGenerationJob).where(PreGenerationJob.id == job_id).values(
+                            combinations=[dict(c) for c in combinations], heartbeat_at=_now()
+                        )
+                    )
+                    await progress_db.commit()
+        except Exception as e:
+            print(f"⚠️ Job {job_id}: failed to record progress: {e}")
+
+    heartbeat = asyncio.create_task(_heartbeat(job_id))
+    try:
+        _, timing = await run_pipeline(todo, on_combination_done=combination_done)
+        all_stats = [c["stats"] for c in combinations if c["stats"] is not None]
+        await _finish(job_id, "succeeded", stats=summarize(all_stats, timing))
+        print(f"✅ Pre-generation job {job_id} finished")
+    except asyncio.CancelledError:
+        # Shutting down: leave the job 'running' so the next startup resumes it
+        raise
+    except Exception as e:
+        print(f"❌ Pre-generation job {job_id} failed: {e}")
+        await _finish(job_id, "failed", error=str(e))
+    finally:
+        heartbeat.cancel()
+
+
+def job_to_dict(job: PreGenerationJob) -> dict:
+    """API representation of a job, with overall progress."""
+    done = sum(1 for c in job.combinations if c["status"] == "done")
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "progress": {"done": done, "total": len(job.combinations)},
+        "combinations": job.combinations,
+        "stats": job.stats,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
@@ -0,0 +1,134 @@
+"""
+Process-wide rate limiting for AI model calls.
+
+Each model gets a ModelLimiter with two token buckets: requests per minute and tokens per
+minute. Callers wait for both before calling the model. Refill rates adapt AIMD-style:
+every quota error (429 / ResourceExhausted) halves them and honours the server's
+Retry-After, and every success adds a little back, until the configured budget is reached
+again. A burst that exceeds the quota therefore turns into slightly slower responses
+instead of a storm of failures.
+"""
+import asyncio
+import time
+from typing import Dict, Optional
+
+# Multiplicative decrease on quota errors, additive increase per success
+AIMD_DECREASE = 0.5
+AIMD_INCREASE = 0.05
+AIMD_MIN_FACTOR = 0.05
+
+# Bucket size in seconds of budget: how much burst is allowed before pacing kicks in
+BURST_SECONDS = 10.0
+
+
+class TokenBucket:
+    """Token bucket refilled at per_minute / 60 tokens per second (scaled by a factor)."""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = max(1.0, per_minute * BURST_SECONDS / 60)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def refill(self, now: float, factor: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.per_minute / 60 * factor)
+
+    def wait_time(self, amount: float, factor: float) -> float:
+        """Seconds until amount tokens are available (amount above capacity only needs a full bucket)."""
+        needed = min(amount, self.capacity) - self.tokens
+        if needed <= 0:
+            return 0.0
+        return needed / (self.per_minute / 60 * factor)
+
+    def take(self, amount: float) -> None:
+        # May go negative (oversized requests, or usage above the estimate): that is debt
+        self.tokens -= amount
+
+    def drain(self, now: float) -> None:
+        """Empty the bucket (keeping any debt) and restart refilling from now."""
+        self.tokens = min(self.tokens, 0.0)
+        self._updated = now
+
+
+class ModelLimiter:
+    """RPM + TPM limiter for one model, with AIMD backoff on quota errors."""
+
+    def __init__(self, name: str, rpm: float, tpm: float):
+        self.name = name
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.factor = 1.0
+        self.blocked_until = 0.0
+        self.quota_errors = 0
+        self.retries = 0
+        self.throttled_seconds = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _buckets(self):
+        return [b for b in (self.requests, self.tokens) if b is not None]
+
+    async def acquire(self, estimated_tokens: int) -> float:
+        """
+        Wait until a request of estimated_tokens fits both budgets, then take it.
+        Waiters are served in arrival order.
+
+        Returns:
+            Seconds spent waiting
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    for bucket in self._buckets():
+                        bucket.refill(now, self.factor)
+                    wait = max(
+                        [0.0]
+                        + ([self.requests.wait_time(1, self.factor)] if self.requests else [])
+                        + ([self.tokens.wait_time(estimated_tokens, self.factor)] if self.tokens else [])
+                    )
+                if wait <= 0:
+                    if self.requests:
+                        self.requests.take(1)
+                    if self.tokens:
+                        self.tokens.take(estimated_tokens)
+                    self.throttled_seconds += waited
+                    return waited
+                await asyncio.sleep(wait)
+                waited += wait
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Correct the token bucket once the real usage is known."""
+        if self.tokens is not None and actual_tokens is not None:
+            self.tokens.take(actual_tokens - estimated_tokens)
+
+    def on_success(self) -> None:
+        self.factor = min(1.0, self.factor + AIMD_INCREASE)
+
+    def on_quota_error(self, retry_after: Optional[float]) -> None:
+        self.quota_errors += 1
+        self.factor = max(AIMD_MIN_FACTOR, self.factor * AIMD_DECREASE)
+        now = time.monotonic()
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+        # Start refilling from empty once any block is over, so the next requests are paced
+        # at the reduced rate (otherwise the time since the last refill, or the blocked time,
+        # is credited back as a burst)
+        for bucket in self._buckets():
+            bucket.drain(max(now, self.blocked_until))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "rpm": self.requests.per_minute if self.requests else 0,
+            "tpm": self.tokens.per_minute if self.tokens else 0,
+            "rate_factor": round(self.factor, 3),
+            "blocked_for_seconds": round(max(0.0, self.blocked_until - time.monotonic()), 3),
+            "quota_errors": self.quota_errors,
+            "retries": self.retries,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+        }
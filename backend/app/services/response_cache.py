@@ -0,0 +1,119 @@
+"""
+Pre-serialized response cache for responses that are identical for everyone within a day
+(e.g. guest `/words/daily`).
+
+Each entry holds the already-encoded JSON bytes plus a strong ETag, so serving a hit is a
+dict lookup: no database queries, no pydantic validation and no JSON encoding.
+Entries expire at local midnight, which is also when the deterministic word set changes.
+"""
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import Response
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Encoded response body with its validators."""
+    body: bytes
+    etag: str
+    day: date
+
+    def seconds_until_expiry(self, now: Optional[datetime] = None) -> int:
+        """Seconds left until local midnight at the end of this entry's day."""
+        now = now or datetime.now()
+        midnight = datetime.combine(self.day + timedelta(days=1), time.min)
+        return max(0, int((midnight - now).total_seconds()))
+
+    def headers(self) -> Dict[str, str]:
+        max_age = self.seconds_until_expiry()
+        return {
+            "ETag": self.etag,
+            "Cache-Control": f"public, max-age={max_age}, must-revalidate",
+        }
+
+    def to_response(self, if_none_match: Optional[str] = None) -> Response:
+        """Build a 200 response, or a bodiless 304 if the client already has this version."""
+        if etag_matches(if_none_match, self.etag):
+            return Response(status_code=304, headers=self.headers())
+        return Response(content=self.body, media_type="application/json", headers=self.headers())
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the encoded body."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against an ETag (weak comparison, per RFC 9110).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class DailyResponseCache:
+    """
+    Cache of encoded responses, keyed per day. Concurrent misses for the same key build
+    only once; misses for different keys build concurrently.
+    """
+
+    def __init__(self):
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+        # Callers holding or waiting for each lock; it's dropped when the last one leaves
+        self._lock_users: Dict[Hashable, int] = {}
+        self._entries: Dict[Hashable, CachedResponse] = {}
+
+    async def get_or_build(
+        self,
+        key: Hashable,
+        build: Callable[[], Awaitable[bytes]],
+        today: Optional[date] = None
+    ) -> CachedResponse:
+        """
+        Return the cached response for key, building and encoding it at most once per day.
+
+        Args:
+            key: Cache key (the day is added automatically)
+            build: Coroutine function returning the encoded response body
+            today: Day the entry belongs to (defaults to date.today())
+
+        Returns:
+            CachedResponse for (today, key)
+        """
+        today = today or date.today()
+        full_key = (today, key)
+
+        entry = self._entries.get(full_key)
+        if entry is not None:
+            return entry
+
+        lock = self._locks.setdefault(full_key, asyncio.Lock())
+        self._lock_users[full_key] = self._lock_users.get(full_key, 0) + 1
+        try:
+            async with lock:
+                entry = self._entries.get(full_key)
+                if entry is not None:
+                    return entry
+                body = await build()
+                entry = CachedResponse(body=body, etag=make_etag(body), day=today)
+                # Drop previous days' entries
+                self._entries = {k: v for k, v in self._entries.items() if k[0] == today}
+                self._entries[full_key] = entry
+                return entry
+        finally:
+            # Keep the lock while anyone still waits on it, so no second build can start
+            self._lock_users[full_key] -= 1
+            if not self._lock_users[full_key]:
+                del self._lock_users[full_key]
+                del self._locks[full_key]
+
+    def clear(self) -> None:
+        self._entries.clear()
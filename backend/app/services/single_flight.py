@@ -0,0 +1,185 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same key share one in-flight coroutine instead of each
+doing the work (and each paying for a Gemini call). Within a process this is an
+asyncio task per key. Across uvicorn workers, a worker claims the work first
+(`GenerationClaims`: a session-level Postgres advisory lock, held until the result is
+stored); workers that lose the claim poll for the winner's result instead of generating
+their own.
+"""
+import asyncio
+import hashlib
+import os
+import time
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.db import lock_engine
+
+T = TypeVar("T")
+
+# How long a worker waits for another worker's claimed generation before doing it itself
+CLAIM_WAIT_SECONDS = float(os.getenv("GENERATION_CLAIM_WAIT_SECONDS", "120"))
+CLAIM_POLL_SECONDS = 0.5
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls per key within this process."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def is_inflight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn() once for all concurrent callers with the same key.
+
+        The work runs in its own task, so a caller that goes away (cancelled request)
+        doesn't cancel it for everyone else still waiting.
+
+        Args:
+            key: Coalescing key
+            fn: Coroutine function doing the work
+
+        Returns:
+            fn()'s result (or raises its exception) for every caller
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+
+def advisory_lock_id(name: str) -> int:
+    """Map a lock name onto Postgres' signed 64-bit advisory lock key space."""
+    return int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big", signed=True)
+
+
+class Claim:
+    """
+    A won claim: release it once the result is stored (releasing twice is harmless).
+    Without an owner it holds no lock (no Postgres, or waiting for the holder timed out).
+    """
+
+    def __init__(self, owner: Optional["GenerationClaims"], lock_id: int):
+        self._owner = owner
+        self._lock_id = lock_id
+
+    async def release(self) -> None:
+        owner, self._owner = self._owner, None
+        if owner is not None:
+            await owner._unlock(self._lock_id)
+
+
+class GenerationClaims:
+    """
+    Cross-worker claims on a piece of work, as session-level Postgres advisory locks.
+
+    All of a process's claims are held on one dedicated autocommit connection (lock_engine),
+    so a claim costs no pooled connection however long the work takes. If the process dies
+    or the connection drops, Postgres releases its locks and waiting workers take over.
+    On databases other than Postgres every claim is granted (there's nothing to share).
+    """
+
+    def __init__(self):
+        self._conn: Optional[AsyncConnection] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def _execute(self, sql: str, lock_id: int) -> Optional[bool]:
+        """Run one advisory lock function; None if the lock connection failed."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:  # one statement at a time on the shared connection
+            try:
+                if self._conn is None or self._conn.closed:
+                    self._conn = await lock_engine.connect()
+                return bool(await self._conn.scalar(text(sql), {"id": lock_id}))
+            except Exception as e:
+                print(f"⚠️ Generation claim connection failed: {e!r}")
+                await self._drop_connection()
+                return None
+
+    async def _drop_connection(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                await conn.close()
+            except Exception:
+                pass
+
+    async def try_claim(self, name: str) -> Optional[Claim]:
+        """
+        Claim name without waiting.
+
+        Returns:
+            Claim, or None if another worker holds it. If the lock connection is down the
+            claim is granted unheld: at worst the work is duplicated.
+        """
+        if lock_engine.dialect.name != "postgresql":
+            return Claim(None, 0)
+        lock_id = advisory_lock_id(name)
+        acquired = await self._execute("SELECT pg_try_advisory_lock(:id)", lock_id)
+        if acquired is None:
+            return Claim(None, lock_id)
+        return Claim(self, lock_id) if acquired else None
+
+    async def claim_or_wait(
+        self,
+        name: str,
+        done: Callable[[], Awaitable[Optional[T]]],
+        timeout: float = CLAIM_WAIT_SECONDS
+    ) -> Tuple[Optional[T], Optional[Claim]]:
+        """
+        Claim name, or wait for the worker holding the claim to finish.
+
+        done() looks up the finished result. It is checked after every claim attempt, since
+        a holder stores its result before releasing: a granted claim can still find the
+        work done. After timeout the caller gets an unheld claim and does the work itself.
+
+        Returns:
+            (result, None) once done() has a result, otherwise (None, claim): do the work,
+            store it, then release the claim
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            claim = await self.try_claim(name)
+            result = await done()
+            if result is not None:
+                if claim is not None:
+                    await claim.release()
+                return result, None
+            if claim is not None:
+                return None, claim
+            if time.monotonic() >= deadline:
+                print(f"⚠️ Claim '{name}' still held after {timeout:g}s, generating without it")
+                return None, Claim(None, advisory_lock_id(name))
+            await asyncio.sleep(CLAIM_POLL_SECONDS)
+
+    async def _unlock(self, lock_id: int) -> None:
+        # If the connection was lost meanwhile, the lock went with it
+        if self._conn is not None:
+            await self._execute("SELECT pg_advisory_unlock(:id)", lock_id)
+
+    async def close(self) -> None:
+        """Drop the lock connection (releasing every claim of this process)."""
+        await self._drop_connection()
+
+
+claims = GenerationClaims()
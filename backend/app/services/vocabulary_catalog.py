@@ -0,0 +1,183 @@
+"""
+Process-wide, in-memory catalog of vocabulary ids partitioned by level.
+
+The vocabulary table is small (~3,000 Oxford words) and changes rarely, so instead of
+scanning it on every request we keep compact per-level id arrays in memory and only
+fetch the rows that were actually picked (a single primary-key lookup).
+
+The catalog reloads itself when:
+- a Vocabulary row is inserted/updated/deleted through a session in this process, or
+- the per-level (count, max id) fingerprint changes (checked at most every
+  VOCAB_CATALOG_CHECK_SECONDS, which catches writes from scripts in other processes).
+"""
+import asyncio
+import os
+import random
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.vocabulary import Vocabulary
+
+CHECK_INTERVAL_SECONDS = float(os.getenv("VOCAB_CATALOG_CHECK_SECONDS", "60"))
+
+Fingerprint = Tuple[Tuple[str, int, int], ...]
+
+
+class VocabularyCatalog:
+    """Compact per-level id arrays with seeded O(k) sampling."""
+
+    def __init__(self, check_interval: float = CHECK_INTERVAL_SECONDS):
+        self.check_interval = check_interval
+        self.version = 0
+        self._lock = asyncio.Lock()
+        self._ids_by_level: Dict[str, array] = {}
+        self._all_ids: array = array("l")
+        self._fingerprint: Optional[Fingerprint] = None
+        self._checked_at = 0.0
+        self._stale = True
+
+    def mark_stale(self) -> None:
+        """Force a reload on the next access."""
+        self._stale = True
+
+    @staticmethod
+    async def _load_fingerprint(db: AsyncSession) -> Fingerprint:
+        result = await db.execute(
+            select(Vocabulary.level, func.count(Vocabulary.id), func.max(Vocabulary.id))
+            .group_by(Vocabulary.level)
+            .order_by(Vocabulary.level)
+        )
+        return tuple((level, count, max_id) for level, count, max_id in result)
+
+    async def _reload(self, db: AsyncSession, fingerprint: Fingerprint) -> None:
+        ids_by_level: Dict[str, array] = {}
+        all_ids = array("l")
+        # Ordered by id so seeded selections match the previous full-table behaviour
+        result = await db.execute(select(Vocabulary.id, Vocabulary.level).order_by(Vocabulary.id))
+        for word_id, level in result:
+            ids_by_level.setdefault(level, array("l")).append(word_id)
+            all_ids.append(word_id)
+
+        self._ids_by_level = ids_by_level
+        self._all_ids = all_ids
+        self._fingerprint = fingerprint
+        self._stale = False
+        self.version += 1
+        print(f"📚 Vocabulary catalog loaded: {len(all_ids)} words, "
+              f"levels={ {lvl: len(ids) for lvl, ids in ids_by_level.items()} }")
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """Reload the catalog if it is stale or the table fingerprint changed."""
+        now = time.monotonic()
+        if not self._stale and now - self._checked_at < self.check_interval:
+            return
+
+        async with self._lock:
+            if not self._stale and now - self._checked_at < self.check_interval:
+                return
+            fingerprint = await self._load_fingerprint(db)
+            if self._stale or fingerprint != self._fingerprint:
+                await self._reload(db, fingerprint)
+            self._checked_at = time.monotonic()
+
+    def ids_for_level(self, level: Optional[str] = None) -> array:
+        """Return the id array for a level (or every id if level is None)."""
+        if level is None:
+            return self._all_ids
+        return self._ids_by_level.get(level, array("l"))
+
+    async def sample_ids(
+        self,
+        db: AsyncSession,
+        k: int,
+        level: Optional[str] = None,
+        seed: Optional[int] = None
+    ) -> List[int]:
+        """
+        Pick up to k ids for a level.
+
+        Uses a per-call random.Random so seeded selections never touch (or depend on)
+        the global RNG. Sampling from a range is O(k) for k much smaller than the level.
+
+        Args:
+            db: Database session (only used if the catalog needs to reload)
+            k: Number of ids to pick
+            level: Optional difficulty level filter (a1, a2, b1, b2)
+            seed: Optional seed for a deterministic selection
+
+        Returns:
+            List of vocabulary ids in selection order
+        """
+        await self.ensure_fresh(db)
+        ids = self.ids_for_level(level)
+        if not ids or k <= 0:
+            return []
+        rng = random.Random(seed)
+        picked = rng.sample(range(len(ids)), min(k, len(ids)))
+        return [ids[i] for i in picked]
+
+
+async def fetch_words_by_ids(db: AsyncSession, ids: List[int]) -> List[Vocabulary]:
+    """Fetch Vocabulary rows by primary key, preserving the order of ids."""
+    if not ids:
+        return []
+    rows = (await db.scalars(select(Vocabulary).where(Vocabulary.id.in_(ids)))).all()
+    by_id = {w.id: w for w in rows}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+async def sample_words(
+    db: AsyncSession,
+    k: int,
+    level: Optional[str] = None,
+    seed: Optional[int] = None,
+    exclude_ids: Optional[set] = None
+) -> List[Vocabulary]:
+    """
+    Sample up to k Vocabulary rows from the process-wide catalog.
+
+    Args:
+        db: Database session
+        k: Number of words to return
+        level: Optional difficulty level filter (a1, a2, b1, b2)
+        seed: Optional seed for a deterministic selection
+        exclude_ids: Optional ids that must not be returned
+
+    Returns:
+        List of Vocabulary objects in selection order
+    """
+    extra = len(exclude_ids) if exclude_ids else 0
+    ids = await catalog.sample_ids(db, k + extra, level=level, seed=seed)
+    if exclude_ids:
+        ids = [i for i in ids if i not in exclude_ids]
+    return await fetch_words_by_ids(db, ids[:k])
+
+
+# Single catalog per process
+catalog = VocabularyCatalog()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_vocabulary_writes(session: Session, flush_context) -> None:
+    """Remember that this session wrote to the vocabulary table."""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Vocabulary):
+            session.info["vocabulary_changed"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_vocabulary_commit(session: Session) -> None:
+    """Mark the catalog stale once vocabulary writes from this process are committed."""
+    if session.info.pop("vocabulary_changed", False):
+        catalog.mark_stale()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_vocabulary_writes(session: Session) -> None:
+    session.info.pop("vocabulary_changed", None)
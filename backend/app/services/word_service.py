@@ -1,14 +1,15 @@
 import datetime
 from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.vocabulary import Vocabulary
 from app.models.user_word_history import UserWordHistory
+from app.services.vocabulary_catalog import sample_words
 
 
-def get_daily_words_for_user(
-    db: Session,
+async def get_daily_words_for_user(
+    db: AsyncSession,
     user_id: int
 ) -> Optional[List[Vocabulary]]:
     """
@@ -27,14 +28,13 @@ def get_daily_words_for_user(
     today = datetime.date.today()
 
     # Query with join to avoid N+1
-    words = (
-        db.query(Vocabulary)
+    words = (await db.scalars(
+        select(Vocabulary)
         .join(UserWordHistory, Vocabulary.id == UserWordHistory.word_id)
-        .filter(UserWordHistory.user_id == user_id)
-        .filter(UserWordHistory.served_date == today)
+        .where(UserWordHistory.user_id == user_id)
+        .where(UserWordHistory.served_date == today)
         .limit(10)  # Limit to 10 words
-        .all()
-    )
+    )).all()
 
     if not words:
         return None
@@ -43,8 +43,8 @@ def get_daily_words_for_user(
     return words[:10]
 
 
-def assign_daily_words(
-    db: Session,
+async def assign_daily_words(
+    db: AsyncSession,
     user_id: int,
     level: str,
     limit: int
@@ -63,14 +63,8 @@ def assign_daily_words(
     """
     today = datetime.date.today()
 
-    # Select random words based on level (database-agnostic)
-    words = (
-        db.query(Vocabulary)
-        .filter(Vocabulary.level == level)
-        .order_by(func.random())
-        .limit(limit)
-        .all()
-    )
+    # Select random words based on level from the in-memory catalog
+    words = await sample_words(db, limit, level=level)
 
     if not words:
         return []
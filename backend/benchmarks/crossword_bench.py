@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark and scaling suite for crossword_service.generate_crossword.
+
+Sweeps alphabets (English words, accented Spanish/French translations from
+vocabulary_export.sql), word counts, word lengths and grid sizes. For each case it
+generates a set of seeded puzzles and records time per puzzle, placement rate (words
+placed / words given) and intersections (cells shared by two words). Grid size "auto"
+is the size the service picks when a request doesn't set one.
+
+--engine greedy runs the reference engine instead: one greedy pass of the layout search
+(first leaf, no backtracking, same no-touching rules), which is what the search has to
+beat. Its results live in crossword_baseline_greedy.json; `compare` prints the gains of
+the search over it.
+
+Usage (from backend/):
+    python -m benchmarks.crossword_bench run [--quick] [--runs N] [--output FILE]
+    python -m benchmarks.crossword_bench check [--quick] [--baseline FILE] [--time-threshold 0.25]
+    python -m benchmarks.crossword_bench save-baseline [--quick] [--engine greedy] [--baseline FILE]
+    python -m benchmarks.crossword_bench compare [--quick] [--baseline FILE]
+
+Timings are normalized by a fixed pure-Python calibration workload measured around
+each case, so a baseline recorded on one machine stays meaningful on another.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Add backend to path
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+sys.path.insert(0, BACKEND_ROOT)
+
+from app.services import crossword_service
+
+VOCABULARY_SQL = os.path.join(BACKEND_ROOT, "vocabulary_export.sql")
+DEFAULT_BASELINE = os.path.join(CURRENT_DIR, "crossword_baseline.json")
+GREEDY_BASELINE = os.path.join(CURRENT_DIR, "crossword_baseline_greedy.json")
+ENGINES = ("search", "greedy")
+
+ALPHABETS = ("en", "es", "fr")
+WORD_COUNTS = (5, 10, 20, 40)
+LENGTH_BUCKETS = {"short": (3, 5), "medium": (6, 8), "long": (9, 12)}
+# 0 = auto (crossword_service.default_grid_size)
+GRID_SIZES = (10, 15, 25, 0)
+PUZZLES_PER_CASE = 20
+REPEATS = 5
+# Puzzles slower than this are timed once: repeats matter for noise on short runs only
+SINGLE_RUN_US = 5000
+
+QUICK_SWEEP = {
+    "alphabets": ALPHABETS,
+    "word_counts": (10,),
+    "lengths": ("short", "medium"),
+    "grid_sizes": (10, 0),
+}
+
+# check: a single case's slowdown counts past this multiple of --time-threshold
+CASE_TIME_FACTOR = 4
+# save-baseline: sweeps merged (per-case median) into the baseline
+BASELINE_RUNS = 3
+# check: absolute drops in placement quality that count as regressions
+PLACEMENT_RATE_THRESHOLD = 0.02
+INTERSECTIONS_THRESHOLD = 0.10  # relative
+
+_VALUES_RE = re.compile(r"VALUES \((.*)\) ON CONFLICT")
+_FIELD_RE = re.compile(r"'((?:[^']|'')*)'|NULL")
+
+
+@dataclass(frozen=True)
+class Case:
+    alphabet: str
+    word_count: int
+    length: str
+    grid_size: int
+
+    @property
+    def name(self) -> str:
+        grid = f"{self.grid_size}x{self.grid_size}" if self.grid_size else "auto"
+        return f"{self.alphabet}/{self.word_count}w/{self.length}/{grid}"
+
+
+def load_word_pools() -> Dict[str, List[str]]:
+    """Uppercase single-word entries per alphabet from the vocabulary export."""
+    pools: Dict[str, set] = {alphabet: set() for alphabet in ALPHABETS}
+    with open(VOCABULARY_SQL, encoding="utf-8") as f:
+        for line in f:
+            match = _VALUES_RE.search(line)
+            if not match:
+                continue
+            fields = [
+                m.group(1).replace("''", "'") if m.group(1) is not None else None
+                for m in _FIELD_RE.finditer(match.group(1))
+            ]
+            word, _, _, translation_es, translation_fr = fields[:5]
+            for alphabet, value in (("en", word), ("es", translation_es), ("fr", translation_fr)):
+                if value and value.isalpha():
+                    pools[alphabet].add(value.upper())
+    return {alphabet: sorted(words) for alphabet, words in pools.items()}
+
+
+def _generate(words: List[Dict[str, str]], grid_size: int, engine: str = "search") -> Dict:
+    """
+    Lay out a puzzle, with a time budget large enough that only the node budget bounds the
+    search. The greedy engine stops at the search's first leaf (one node per word, one
+    option per step).
+    """
+    if engine == "greedy":
+        unique, size, _ = crossword_service._prepare_words(words, grid_size or None, None)
+        ordered = crossword_service._word_order(unique, 0)
+        placed = crossword_service._search(ordered, size, len(ordered) + 1, 1, float("inf"))
+        return crossword_service._build_result(placed, size)
+    return crossword_service.generate_crossword(
+        words, size=grid_size or None, time_budget_ms=crossword_service.CROSSWORD_MAX_TIME_BUDGET_MS
+    )
+
+
+def count_intersections(placements: List[Dict]) -> int:
+    """Cells covered by more than one placed word."""
+    cells = Counter()
+    for p in placements:
+        for i in range(len(p["word"])):
+            if p["direction"] == "ACROSS":
+                cells[(p["row"], p["col"] + i)] += 1
+            else:
+                cells[(p["row"] + i, p["col"])] += 1
+    return sum(1 for count in cells.values() if count > 1)
+
+
+def calibrate() -> float:
+    """Microseconds for a fixed pure-Python workload (best of 3): the machine speed unit."""
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        grid = [["" for _ in range(20)] for _ in range(20)]
+        total = 0
+        for n in range(20000):
+            row, col = n % 20, (n * 7) % 20
+            if grid[row][col] in ("", "A"):
+                total += 1
+            grid[row][col] = "A" if n % 3 else ""
+        best = min(best, time.perf_counter() - started)
+    return best * 1e6
+
+
+def run_case(case: Case, pool: List[str], seed: int, engine: str = "search") -> Optional[dict]:
+    low, high = LENGTH_BUCKETS[case.length]
+    max_length = case.grid_size or crossword_service.CROSSWORD_MAX_GRID_SIZE
+    candidates = [w for w in pool if low <= len(w) <= min(high, max_length)]
+    if len(candidates) < case.word_count:
+        return None
+    rng = random.Random(f"{seed}:{case.name}")
+
+    times_us, placement_rates, intersections = [], [], []
+    for _ in range(PUZZLES_PER_CASE):
+        words = [{"word": w, "clue": ""} for w in rng.sample(candidates, case.word_count)]
+        best = float("inf")
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            result = _generate(words, case.grid_size, engine)
+            best = min(best, time.perf_counter() - started)
+            if best * 1e6 > SINGLE_RUN_US:
+                break
+        times_us.append(best * 1e6)
+        placement_rates.append(len(result["placements"]) / len(words))
+        intersections.append(count_intersections(result["placements"]))
+
+    times_us.sort()
+    return {
+        "median_us": round(statistics.median(times_us), 2),
+        "p95_us": round(times_us[min(len(times_us) - 1, int(0.95 * len(times_us)))], 2),
+        "placement_rate": round(statistics.mean(placement_rates), 4),
+        "intersections": round(statistics.mean(intersections), 3),
+    }
+
+
+def run(quick: bool = False, seed: int = 42, engine: str = "search") -> dict:
+    sweep = QUICK_SWEEP if quick else {
+        "alphabets": ALPHABETS,
+        "word_counts": WORD_COUNTS,
+        "lengths": tuple(LENGTH_BUCKETS),
+        "grid_sizes": GRID_SIZES,
+    }
+    pools = load_word_pools()
+
+    # Normalize each case by calibrations taken right before and after it: machine speed
+    # drifts during a run (frequency scaling, neighbours on shared CI runners)
+    calibrations = [calibrate()]
+    cases = {}
+    for alphabet, word_count, length, grid_size in itertools.product(
+        sweep["alphabets"], sweep["word_counts"], sweep["lengths"], sweep["grid_sizes"]
+    ):
+        case = Case(alphabet, word_count, length, grid_size)
+        result = run_case(case, pools[alphabet], seed, engine)
+        if result is None:
+            print(f"   {case.name:<28} skipped (not enough words)")
+            continue
+        calibrations.append(calibrate())
+        result["normalized_time"] = round(result["median_us"] / statistics.mean(calibrations[-2:]), 5)
+        cases[case.name] = result
+        print(f"   {case.name:<28} {result['median_us']:>9.1f}µs  placed {result['placement_rate']:.0%}  "
+              f"intersections {result['intersections']:.1f}")
+
+    calibration_us = statistics.median(calibrations)
+    print(f"⏱️ Calibration: {calibration_us:.0f}µs")
+
+    return {
+        "meta": {
+            "seed": seed,
+            "quick": quick,
+            "engine": engine,
+            "puzzles_per_case": PUZZLES_PER_CASE,
+            "repeats": REPEATS,
+            "calibration_us": round(calibration_us, 2),
+            "python": platform.python_version(),
+        },
+        "cases": cases,
+    }
+
+
+def merge_runs(runs: List[dict]) -> dict:
+    """Per-case median of several sweeps, so one noisy sweep doesn't end up in the baseline."""
+    calibration_us = statistics.median(run["meta"]["calibration_us"] for run in runs)
+    merged = {"meta": dict(runs[0]["meta"], calibration_us=calibration_us, runs=len(runs)), "cases": {}}
+    for name in runs[0]["cases"]:
+        merged["cases"][name] = {
+            metric: round(statistics.median(run["cases"][name][metric] for run in runs), 5)
+            for metric in runs[0]["cases"][name]
+        }
+    return merged
+
+
+def check(baseline: dict, current: dict, time_threshold: float) -> List[str]:
+    """
+    Regressions of current against baseline, for cases present in both.
+
+    Time uses the calibration-normalized median: the geometric mean over all cases may
+    not grow by more than time_threshold, a single case by more than CASE_TIME_FACTOR
+    times that (single cases are noisier). Placement rate and intersections are compared
+    directly, they don't depend on the machine.
+    """
+    regressions = []
+    ratios = []
+    for name, base in baseline["cases"].items():
+        cur = current["cases"].get(name)
+        if cur is None:
+            continue
+        ratio = cur["normalized_time"] / base["normalized_time"] if base["normalized_time"] else 1.0
+        ratios.append(ratio)
+        if ratio - 1 > time_threshold * CASE_TIME_FACTOR:
+            regressions.append(f"{name}: time {ratio - 1:+.0%} ({base['median_us']}µs -> {cur['median_us']}µs)")
+        if base["placement_rate"] - cur["placement_rate"] > PLACEMENT_RATE_THRESHOLD:
+            regressions.append(f"{name}: placement rate {base['placement_rate']:.0%} -> {cur['placement_rate']:.0%}")
+        if base["intersections"] and (base["intersections"] - cur["intersections"]) / base["intersections"] > INTERSECTIONS_THRESHOLD:
+            regressions.append(f"{name}: intersections {base['intersections']} -> {cur['intersections']}")
+
+    if ratios:
+        overall = statistics.geometric_mean(ratios) - 1
+        print(f"⏱️ Normalized time vs baseline: {overall:+.1%} (geometric mean of {len(ratios)} cases)")
+        if overall > time_threshold:
+            regressions.append(f"overall: time {overall:+.0%}")
+    return regressions
+
+
+def compare(reference: dict, current: dict) -> None:
+    """Print current's gains over reference (the greedy engine) for cases present in both."""
+    gains = []
+    for name, ref in reference["cases"].items():
+        cur = current["cases"].get(name)
+        if cur is None:
+            continue
+        ratio = cur["normalized_time"] / ref["normalized_time"] if ref["normalized_time"] else 1.0
+        placed = cur["placement_rate"] - ref["placement_rate"]
+        crossed = cur["intersections"] / ref["intersections"] - 1 if ref["intersections"] else 0.0
+        gains.append((placed, crossed, ratio))
+        print(f"   {name:<28} placed {ref['placement_rate']:.0%} -> {cur['placement_rate']:.0%}  "
+              f"intersections {crossed:+.0%}  time x{ratio:.1f}")
+    if gains:
+        print(f"📊 Mean over {len(gains)} cases: placed {statistics.mean(g[0] for g in gains):+.1%} points, "
+              f"intersections {statistics.mean(g[1] for g in gains):+.0%}, "
+              f"time x{statistics.geometric_mean(g[2] for g in gains):.1f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark generate_crossword.")
+    parser.add_argument("command", choices=["run", "check", "save-baseline", "compare"])
+    parser.add_argument("--quick", action="store_true", help="Small sweep (CI)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--engine", choices=ENGINES, default="search",
+                        help="greedy: reference engine, for save-baseline (compare always runs the search)")
+    parser.add_argument("--baseline", help="Default crossword_baseline.json, or crossword_baseline_greedy.json "
+                                           "for compare and the greedy engine")
+    parser.add_argument("--output", help="Also write this run's results as JSON")
+    parser.add_argument("--time-threshold", type=float, default=0.25, help="Relative overall slowdown that counts")
+    parser.add_argument("--runs", type=int, help=f"Sweeps to merge (default 1, save-baseline {BASELINE_RUNS})")
+    args = parser.parse_args()
+
+    engine = "search" if args.command == "compare" else args.engine
+    baseline_path = args.baseline or (
+        GREEDY_BASELINE if args.command == "compare" or engine == "greedy" else DEFAULT_BASELINE
+    )
+    runs = args.runs or (BASELINE_RUNS if args.command == "save-baseline" else 1)
+    results = merge_runs([run(quick=args.quick, seed=args.seed, engine=engine) for _ in range(runs)])
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.command == "save-baseline":
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"💾 Baseline written to {baseline_path}")
+    elif args.command == "compare":
+        with open(baseline_path) as f:
+            compare(json.load(f), results)
+    elif args.command == "check":
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = check(baseline, results, args.time_threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s):")
+            for regression in regressions:
+                print(f"   {regression}")
+            return 1
+        print(f"✅ No regressions against {os.path.relpath(baseline_path)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for the API hot paths (asyncio + httpx).
+
+Usage (from backend/):
+    python -m benchmarks.load_test list
+    python -m benchmarks.load_test run [--base-url URL] [--scenarios a,b] [--concurrency 10]
+        [--duration 20] [--warmup 3] [--seed 42] [--output FILE]
+    python -m benchmarks.load_test compare BASELINE.json CURRENT.json [--threshold 0.10]
+
+Each scenario runs closed-loop: --concurrency workers send requests back to back for
+--duration seconds after --warmup seconds that are not recorded. A run reports
+p50/p95/p99 latency, throughput and error rate per scenario as JSON; compare flags
+regressions between two runs and exits 1 if there are any.
+
+See benchmarks/README.md for the environment (local Postgres + fake AI provider).
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+# Add backend to path (for the authenticated scenarios' user setup)
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+sys.path.insert(0, BACKEND_ROOT)
+
+from benchmarks.scenarios import SCENARIOS, BenchContext, Scenario
+
+DEFAULT_BASE_URL = os.getenv("BENCH_BASE_URL", "http://127.0.0.1:8000")
+RESULTS_DIR = os.path.join(CURRENT_DIR, "results")
+BENCH_USERS = 20
+
+# compare: latency must also grow by this many ms to count (sub-millisecond noise)
+MIN_LATENCY_DELTA_MS = 1.0
+# compare: error rate increase (absolute) that counts as a regression
+ERROR_RATE_THRESHOLD = 0.01
+
+
+@dataclass
+class ScenarioRecorder:
+    """Latencies and outcomes of one scenario's recorded requests."""
+    latencies_ms: List[float] = field(default_factory=list)
+    status_codes: Counter = field(default_factory=Counter)
+    errors: int = 0
+    elapsed_seconds: float = 0.0
+
+    def record(self, latency_ms: float, status: str, ok: bool) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.status_codes[status] += 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, description: str) -> dict:
+        latencies = sorted(self.latencies_ms)
+        requests = len(latencies)
+        return {
+            "description": description,
+            "requests": requests,
+            "errors": self.errors,
+            "error_rate": round(self.errors / requests, 4) if requests else 0.0,
+            "throughput_rps": round(requests / self.elapsed_seconds, 2) if self.elapsed_seconds else 0.0,
+            "latency_ms": {
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "mean": round(sum(latencies) / requests, 3) if requests else 0.0,
+                "min": round(latencies[0], 3) if requests else 0.0,
+                "max": round(latencies[-1], 3) if requests else 0.0,
+            },
+            "status_codes": dict(self.status_codes),
+        }
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return round(sorted_values[rank - 1], 3)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def create_bench_tokens(count: int = BENCH_USERS) -> List[str]:
+    """
+    Make sure benchmark users exist in the database and mint access tokens for them.
+    Needs the server's DATABASE_URL and JWT_SECRET in the environment.
+    """
+    from app.core.db import SessionLocal
+    from app.core.security import create_access_token
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        tokens = []
+        for n in range(count):
+            google_id = f"bench-user-{n}"
+            user = db.query(User).filter_by(google_id=google_id).first()
+            if user is None:
+                user = User(google_id=google_id, email=f"{google_id}@bench.local", name=f"Bench User {n}")
+                db.add(user)
+                db.commit()
+            tokens.append(create_access_token({"user_id": user.id}))
+        return tokens
+    finally:
+        db.close()
+
+
+async def run_scenario(
+    ctx: BenchContext,
+    scenario: Scenario,
+    concurrency: int,
+    duration: float,
+    warmup: float
+) -> dict:
+    """Run one scenario closed-loop and summarize the recorded (post-warmup) requests."""
+    if scenario.setup is not None:
+        await scenario.setup(ctx)
+
+    recorder = ScenarioRecorder()
+    iterations = itertools.count()
+    started = time.perf_counter()
+    record_from = started + warmup
+    stop_at = record_from + duration
+
+    async def worker():
+        while (now := time.perf_counter()) < stop_at:
+            i = next(iterations)
+            try:
+                response = await scenario.request(ctx, i)
+                status, ok = str(response.status_code), response.status_code in scenario.expected_status
+            except httpx.HTTPError as e:
+                status, ok = type(e).__name__, False
+            finished = time.perf_counter()
+            if now >= record_from:
+                recorder.record((finished - now) * 1000, status, ok)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    recorder.elapsed_seconds = time.perf_counter() - record_from
+    return recorder.summary(scenario.description)
+
+
+async def run(
+    base_url: str,
+    scenario_names: List[str],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    seed: int,
+    timeout: float
+) -> dict:
+    """Run the selected scenarios one after another against base_url."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        ctx = BenchContext(client=client, seed=seed, run_id=uuid.uuid4().hex[:8])
+        results = {}
+        for name in scenario_names:
+            scenario = SCENARIOS[name]
+            if scenario.needs_auth and not ctx.tokens:
+                try:
+                    ctx.tokens = create_bench_tokens()
+                except Exception as e:
+                    print(f"⚠️ Skipping {name}: could not create benchmark users ({e})")
+                    continue
+            print(f"🏃 {name}: {concurrency} workers, {warmup:g}s warmup + {duration:g}s...")
+            try:
+                results[name] = await run_scenario(ctx, scenario, concurrency, duration, warmup)
+            except httpx.HTTPError as e:
+                print(f"❌ {name} setup failed: {e}")
+                continue
+            latency = results[name]["latency_ms"]
+            print(f"   {results[name]['throughput_rps']} req/s, p50 {latency['p50']}ms, "
+                  f"p95 {latency['p95']}ms, p99 {latency['p99']}ms, errors {results[name]['error_rate']:.2%}")
+
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "base_url": base_url,
+            "concurrency": concurrency,
+            "duration_seconds": duration,
+            "warmup_seconds": warmup,
+            "seed": seed,
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+        },
+        "scenarios": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> dict:
+    """
+    Compare two runs scenario by scenario.
+
+    A scenario regresses if a latency percentile grows by more than threshold (relative)
+    and MIN_LATENCY_DELTA_MS, throughput drops by more than threshold, or the error rate
+    grows by more than ERROR_RATE_THRESHOLD.
+
+    Returns:
+        Dict with per-scenario deltas and the list of regressions
+    """
+    report = {"threshold": threshold, "scenarios": {}, "regressions": []}
+    for name, base in baseline["scenarios"].items():
+        cur = current["scenarios"].get(name)
+        if cur is None:
+            continue
+        rows = {}
+        for p in ("p50", "p95", "p99"):
+            before, after = base["latency_ms"][p], cur["latency_ms"][p]
+            change = (after - before) / before if before else 0.0
+            regressed = change > threshold and after - before > MIN_LATENCY_DELTA_MS
+            rows[f"latency_{p}_ms"] = {"baseline": before, "current": after, "change": round(change, 4), "regressed": regressed}
+        before, after = base["throughput_rps"], cur["throughput_rps"]
+        change = (after - before) / before if before else 0.0
+        rows["throughput_rps"] = {"baseline": before, "current": after, "change": round(change, 4), "regressed": change < -threshold}
+        before, after = base["error_rate"], cur["error_rate"]
+        rows["error_rate"] = {
+            "baseline": before, "current": after, "change": round(after - before, 4),
+            "regressed": after - before > ERROR_RATE_THRESHOLD
+        }
+        report["scenarios"][name] = rows
+        report["regressions"].extend(f"{name}.{metric}" for metric, row in rows.items() if row["regressed"])
+    return report
+
+
+def print_comparison(report: dict) -> None:
+    for name, rows in report["scenarios"].items():
+        print(f"\n{name}")
+        for metric, row in rows.items():
+            flag = "❌ REGRESSION" if row["regressed"] else ""
+            change = f"{row['change']:+.1%}" if metric != "error_rate" else f"{row['change']:+.4f}"
+            print(f"   {metric:<20} {row['baseline']:>10} -> {row['current']:>10} ({change}) {flag}")
+    if report["regressions"]:
+        print(f"\n❌ {len(report['regressions'])} regression(s): {', '.join(report['regressions'])}")
+    else:
+        print(f"\n✅ No regressions (threshold {report['threshold']:.0%})")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load-test the API hot paths.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="List scenarios")
+
+    run_parser = commands.add_parser("run", help="Run scenarios and write a JSON report")
+    run_parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    run_parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenario names")
+    run_parser.add_argument("--concurrency", type=int, default=10)
+    run_parser.add_argument("--duration", type=float, default=20.0, help="Recorded seconds per scenario")
+    run_parser.add_argument("--warmup", type=float, default=3.0, help="Unrecorded seconds per scenario")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    run_parser.add_argument("--output", help="Report path (default: benchmarks/results/<timestamp>.json)")
+
+    compare_parser = commands.add_parser("compare", help="Compare two reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Relative change that counts")
+    compare_parser.add_argument("--output", help="Also write the comparison as JSON")
+
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for scenario in SCENARIOS.values():
+            print(f"{scenario.name:<20} {scenario.description}")
+        return 0
+
+    if args.command == "run":
+        names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+        unknown = [name for name in names if name not in SCENARIOS]
+        if unknown:
+            parser.error(f"unknown scenarios: {', '.join(unknown)}")
+        report = asyncio.run(run(
+            args.base_url, names, args.concurrency, args.duration, args.warmup, args.seed, args.timeout
+        ))
+        output = args.output or os.path.join(
+            RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📊 Report written to {output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    report = compare(baseline, current, args.threshold)
+    print_comparison(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Load-test scenarios for the API hot paths.
+
+Each scenario has an optional setup (run once, not timed) that prepares whatever the
+timed request needs, e.g. warming the mnemonic cache for the cache-hit scenario or
+building a solved grid for /crossword/check. Requests are deterministic for a given
+seed, so two runs against the same data send the same traffic.
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+LANGUAGE = "es"
+LEVEL = "a1"
+GET_CACHED_WORDS = 50
+
+
+@dataclass
+class BenchContext:
+    """Shared state for one benchmark run."""
+    client: httpx.AsyncClient
+    seed: int
+    run_id: str
+    tokens: List[str] = field(default_factory=list)
+    state: Dict[str, Any] = field(default_factory=dict)
+
+    def rng(self, scenario: str) -> random.Random:
+        return random.Random(f"{self.seed}:{scenario}")
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    request: Callable[[BenchContext, int], Awaitable[httpx.Response]]
+    setup: Optional[Callable[[BenchContext], Awaitable[None]]] = None
+    expected_status: Tuple[int, ...] = (200,)
+    needs_auth: bool = False
+
+
+def _auth_headers(ctx: BenchContext, i: int) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {ctx.tokens[i % len(ctx.tokens)]}"}
+
+
+async def _daily_words(ctx: BenchContext) -> List[dict]:
+    """Today's guest words (cached in the context), the input for the other scenarios."""
+    if "daily_words" not in ctx.state:
+        response = await ctx.client.post("/words/daily", json={"level": LEVEL, "limit": 10})
+        response.raise_for_status()
+        ctx.state["daily_words"] = response.json()["words"]
+    return ctx.state["daily_words"]
+
+
+def _mnemonic_word(word: dict) -> dict:
+    return {
+        "word": word.get(f"translation_{LANGUAGE}") or word["word"],
+        "definition": word["definition"],
+        "language": LANGUAGE,
+    }
+
+
+# ----------------------------------------------------------
+# /words/daily
+# ----------------------------------------------------------
+async def words_daily_guest(ctx: BenchContext, i: int) -> httpx.Response:
+    return await ctx.client.post("/words/daily", json={"level": LEVEL, "limit": 10})
+
+
+async def words_daily_auth(ctx: BenchContext, i: int) -> httpx.Response:
+    return await ctx.client.post(
+        "/words/daily", json={"level": LEVEL, "limit": 10}, headers=_auth_headers(ctx, i)
+    )
+
+
+# ----------------------------------------------------------
+# /crossword
+# ----------------------------------------------------------
+async def _setup_crossword(ctx: BenchContext) -> None:
+    words = await _daily_words(ctx)
+    entries = [_mnemonic_word(w) for w in words]
+    ctx.state["crossword_request"] = {
+        "words": [e["word"] for e in entries],
+        "clues": {e["word"]: e["definition"] for e in entries},
+    }
+
+
+async def crossword_today(ctx: BenchContext, i: int) -> httpx.Response:
+    return await ctx.client.post("/crossword/today", json=ctx.state["crossword_request"])
+
+
+async def _setup_crossword_check(ctx: BenchContext) -> None:
+    await _setup_crossword(ctx)
+    response = await ctx.client.post("/crossword/today", json=ctx.state["crossword_request"])
+    response.raise_for_status()
+    puzzle = response.json()
+    # Fill in every answer, the way a finished puzzle is submitted
+    grid = [[dict(cell) for cell in row] for row in puzzle["grid"]]
+    for cell in (cell for row in grid for cell in row):
+        cell["input"] = cell.get("letter") or ""
+    ctx.state["crossword_check"] = {"grid": grid, "words": puzzle["words"]}
+
+
+async def crossword_check(ctx: BenchContext, i: int) -> httpx.Response:
+    return await ctx.client.post("/crossword/check", json=ctx.state["crossword_check"])
+
+
+# ----------------------------------------------------------
+# /mnemonic
+# ----------------------------------------------------------
+async def _setup_mnemonic_hit(ctx: BenchContext) -> None:
+    words = [_mnemonic_word(w) for w in await _daily_words(ctx)]
+    for word in words:
+        response = await ctx.client.post("/mnemonic/generate-text", json=word)
+        response.raise_for_status()
+    ctx.state["mnemonic_hit_words"] = words
+
+
+async def mnemonic_text_hit(ctx: BenchContext, i: int) -> httpx.Response:
+    words = ctx.state["mnemonic_hit_words"]
+    return await ctx.client.post("/mnemonic/generate-text", json=words[i % len(words)])
+
+
+async def mnemonic_text_miss(ctx: BenchContext, i: int) -> httpx.Response:
+    # A word no earlier run has asked for: always a generation (use the fake AI provider)
+    return await ctx.client.post("/mnemonic/generate-text", json={
+        "word": f"bench-{ctx.run_id}-{i}",
+        "definition": f"benchmark word number {i}",
+        "language": LANGUAGE,
+    })
+
+
+async def _setup_get_cached(ctx: BenchContext) -> None:
+    rng = ctx.rng("get_cached_50")
+    words = [
+        {"word": f"bench-cached-{ctx.seed}-{n}", "definition": f"cached benchmark word {n}", "language": LANGUAGE}
+        for n in range(GET_CACHED_WORDS)
+    ]
+    rng.shuffle(words)
+    response = await ctx.client.post("/mnemonic/generate-text/batch", json={"words": words})
+    response.raise_for_status()
+    ctx.state["get_cached_request"] = {"words": words, "image_mode": "url"}
+
+
+async def get_cached_50(ctx: BenchContext, i: int) -> httpx.Response:
+    return await ctx.client.post("/mnemonic/get-cached", json=ctx.state["get_cached_request"])
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario("words_daily_guest", "Guest /words/daily (pre-serialized response)", words_daily_guest),
+        Scenario("words_daily_auth", "Authenticated /words/daily", words_daily_auth, needs_auth=True),
+        Scenario("crossword_today", "/crossword/today for the daily words", crossword_today, _setup_crossword),
+        Scenario("crossword_check", "/crossword/check of a solved puzzle", crossword_check, _setup_crossword_check),
+        Scenario("mnemonic_text_hit", "/mnemonic/generate-text, cache hit", mnemonic_text_hit, _setup_mnemonic_hit),
+        Scenario("mnemonic_text_miss", "/mnemonic/generate-text, cache miss (generates)", mnemonic_text_miss),
+        Scenario("get_cached_50", f"{GET_CACHED_WORDS}-word /mnemonic/get-cached", get_cached_50, _setup_get_cached),
+    ]
+}
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Add backend to path
+BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_ROOT)
+
+# app.core.db needs a URL at import time; tests that touch a database bring their own engine
+os.environ.setdefault("DATABASE_URL", "sqlite://")
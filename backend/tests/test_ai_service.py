@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services import ai_service
+from app.services.ai_providers import QuotaExceededError
+
+
+class FakeProvider:
+    """Provider that answers quota errors, or hangs, and counts its calls."""
+
+    def __init__(self, hang=False):
+        self.calls = 0
+        self.hang = hang
+
+    async def generate_text(self, model_name, contents):
+        self.calls += 1
+        if self.hang:
+            await asyncio.sleep(10)
+        raise QuotaExceededError("429 Resource exhausted", retry_after=None)
+
+    async def generate_image(self, model_name, contents):
+        return await self.generate_text(model_name, contents)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    fake = FakeProvider()
+    monkeypatch.setattr(ai_service, "get_provider", lambda: fake)
+    monkeypatch.setattr(ai_service, "backoff_seconds", lambda attempt, retry_after: 0.05)
+    monkeypatch.setattr(ai_service, "MIN_ATTEMPT_SECONDS", 0.1)
+    # No pacing: only the retries and the deadline decide the timing
+    monkeypatch.setattr(ai_service, "_limiters", {})
+    monkeypatch.setattr(ai_service, "TEXT_RPM", 0)
+    monkeypatch.setattr(ai_service, "TEXT_TPM", 0)
+    monkeypatch.setattr(ai_service, "_semaphore", None)
+    return fake
+
+
+def test_retries_until_max_retries_without_deadline(provider, monkeypatch):
+    monkeypatch.setattr(ai_service, "MAX_RETRIES", 2)
+    with pytest.raises(ai_service.AIProviderError, match="quota exhausted after 3 attempts"):
+        asyncio.run(ai_service.generate_content("test-model", "prompt", timeout=5))
+    assert provider.calls == 3
+
+
+def test_stops_retrying_when_the_deadline_cannot_cover_another_attempt(provider):
+    started = time.monotonic()
+    with pytest.raises(ai_service.AIProviderError, match="quota exhausted"):
+        asyncio.run(ai_service.generate_content("test-model", "prompt", timeout=5, deadline=started + 0.22))
+    # Each retry costs 0.05s of backoff and needs 0.1s left for the attempt itself
+    assert 2 <= provider.calls <= 3
+    assert provider.calls < ai_service.MAX_RETRIES + 1
+    assert time.monotonic() - started < 0.22
+
+
+def test_deadline_cuts_the_attempt_short_without_opening_the_breaker(provider):
+    provider.hang = True
+    started = time.monotonic()
+    with pytest.raises(ai_service.AIDeadlineExceededError):
+        asyncio.run(ai_service.generate_mnemonic_image("word", "definition", "sentence", deadline=started + 0.05))
+    assert time.monotonic() - started < 1
+    assert ai_service.image_breaker.stats()["consecutive_failures"] == 0
+
+
+def test_expired_deadline_fails_without_calling_the_provider(provider):
+    with pytest.raises(ai_service.AIDeadlineExceededError):
+        asyncio.run(ai_service.generate_content("test-model", "prompt", timeout=5, deadline=time.monotonic() - 1))
+    assert provider.calls == 0
@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+from app.services import ai_service, circuit_breaker
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class ProviderDown(Exception):
+    pass
+
+
+class Throttled(Exception):
+    pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("test", failure_threshold=3, reset_seconds=30, failure_types=(ProviderDown,))
+
+
+async def _ok():
+    return "ok"
+
+
+async def _down():
+    raise ProviderDown()
+
+
+async def _throttled():
+    raise Throttled()
+
+
+def _call(breaker, fn):
+    return asyncio.run(breaker.call(fn))
+
+
+def _fail(breaker, times=1, error=ProviderDown):
+    for _ in range(times):
+        with pytest.raises(error):
+            _call(breaker, _down if error is ProviderDown else _throttled)
+
+
+def test_opens_at_the_failure_threshold(breaker):
+    _fail(breaker, 2)
+    assert breaker.state == CLOSED
+    _fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.transitions == {"closed->open": 1}
+
+
+def test_success_resets_the_failure_count(breaker):
+    _fail(breaker, 2)
+    assert _call(breaker, _ok) == "ok"
+    _fail(breaker, 2)
+    assert breaker.state == CLOSED
+
+
+def test_open_circuit_rejects_without_calling(breaker, clock):
+    _fail(breaker, 3)
+    calls = []
+
+    async def fn():
+        calls.append(1)
+
+    clock[0] += 10
+    with pytest.raises(CircuitOpenError) as excinfo:
+        _call(breaker, fn)
+    assert calls == []
+    assert excinfo.value.retry_after == pytest.approx(20)
+    assert breaker.rejected == 1
+
+
+def test_half_open_after_reset_then_successful_probe_closes(breaker, clock):
+    _fail(breaker, 3)
+    clock[0] += 30
+    assert breaker.state == HALF_OPEN
+    assert _call(breaker, _ok) == "ok"
+    assert breaker.state == CLOSED
+    assert breaker.transitions == {"closed->open": 1, "open->half_open": 1, "half_open->closed": 1}
+
+
+def test_failed_probe_reopens(breaker, clock):
+    _fail(breaker, 3)
+    clock[0] += 30
+    _fail(breaker)
+    assert breaker.state == OPEN
+    # The reset timeout starts over from the failed probe
+    assert breaker.retry_after() == pytest.approx(30)
+
+
+def test_half_open_admits_limited_probes(breaker, clock):
+    _fail(breaker, 3)
+    clock[0] += 30
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow_probe():
+            await release.wait()
+            return "ok"
+
+        probe = asyncio.ensure_future(breaker.call(slow_probe))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(_ok)
+        release.set()
+        return await probe
+
+    assert asyncio.run(scenario()) == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_other_exceptions_are_not_failures(breaker, clock):
+    _fail(breaker, 10, error=Throttled)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["consecutive_failures"] == 0
+
+    # ...nor do they decide a probe
+    _fail(breaker, 3)
+    clock[0] += 30
+    _fail(breaker, error=Throttled)
+    assert breaker.state == HALF_OPEN
+    assert _call(breaker, _ok) == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_image_breaker_counts_only_provider_failures():
+    assert ai_service.image_breaker.failure_types == (ai_service.AIProviderError,)
+    for error in (ai_service.AIRateLimitedError, ai_service.AIConfigurationError, ai_service.AIDeadlineExceededError):
+        assert not issubclass(error, ai_service.AIProviderError)
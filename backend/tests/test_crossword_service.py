@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+from app.services import crossword_service
+from app.services.crossword_service import default_grid_size, generate_crossword
+
+WORDS = [
+    "CAT", "SOL", "MAR", "PAN", "AGUA", "LUNE", "ROJO", "TREN", "CASA", "LIVRE",
+    "PERRO", "ÉCOLE", "ÁRBOL", "NIÑO", "GARDEN", "WINDOW", "MAISON", "CIUDAD", "FENÊTRE",
+    "MANZANA", "JOURNÉE", "BICYCLE", "TEACHER", "MONTAÑA", "CHÂTEAU", "KITCHEN", "BIBLIOTECA",
+    "HOSPITAL", "MOUNTAIN", "CAMPAGNE", "MERCREDI", "QUESTION", "TELÉFONO", "ELEPHANT",
+]
+
+
+def _cells(placement):
+    for i in range(len(placement["word"])):
+        if placement["direction"] == "ACROSS":
+            yield placement["row"], placement["col"] + i
+        else:
+            yield placement["row"] + i, placement["col"]
+
+
+def assert_valid_layout(result, words):
+    """Placed words are in the grid, cross only on equal letters and never touch otherwise."""
+    grid, placements = result["grid"], result["placements"]
+    size = len(grid)
+    assert all(len(row) == size for row in grid)
+    assert len({p["word"] for p in placements}) == len(placements)
+    assert {p["word"] for p in placements} <= set(words)
+
+    letters, covered = {}, {}
+    for p in placements:
+        for i, (row, col) in enumerate(_cells(p)):
+            assert 0 <= row < size and 0 <= col < size, f"{p['word']} leaves the grid"
+            assert letters.setdefault((row, col), p["word"][i]) == p["word"][i], (
+                f"{p['word']} crosses a different letter at {(row, col)}"
+            )
+            covered.setdefault((row, col), []).append(p["direction"])
+
+    # At most one word per direction through a cell
+    assert all(len(d) == len(set(d)) for d in covered.values())
+
+    # The grid shows exactly the placed letters
+    for row in range(size):
+        for col in range(size):
+            cell = grid[row][col]
+            assert cell["is_block"] == ((row, col) not in letters)
+            assert cell["letter"] == letters.get((row, col))
+
+    for p in placements:
+        across = p["direction"] == "ACROSS"
+        cells = list(_cells(p))
+        # Nothing directly before or after the word
+        (r0, c0), (r1, c1) = cells[0], cells[-1]
+        before = (r0, c0 - 1) if across else (r0 - 1, c0)
+        after = (r1, c1 + 1) if across else (r1 + 1, c1)
+        assert before not in letters and after not in letters, f"{p['word']} runs into another word"
+        # Side neighbours only where another word crosses this one
+        for row, col in cells:
+            if len(covered[(row, col)]) > 1:
+                continue
+            sides = [(row - 1, col), (row + 1, col)] if across else [(row, col - 1), (row, col + 1)]
+            assert not any(side in letters for side in sides), f"{p['word']} touches a word at {(row, col)}"
+
+
+@pytest.mark.parametrize("size", [10, 15, 25, None])
+@pytest.mark.parametrize("count", [5, 10, 20, 34])
+def test_layout_is_valid(size, count):
+    rng = random.Random(f"{size}:{count}")
+    for _ in range(10):
+        words = [w for w in rng.sample(WORDS, count) if size is None or len(w) <= size]
+        result = generate_crossword([{"word": w, "clue": ""} for w in words], size=size)
+        assert result["placements"]
+        assert_valid_layout(result, words)
+
+
+def test_greedy_pass_is_valid():
+    # The first leaf of the search, before any backtracking
+    ordered = crossword_service._word_order(WORDS[:20], 0)
+    placed = crossword_service._search(ordered, 13, len(ordered) + 1, 1, float("inf"))
+    assert_valid_layout(crossword_service._build_result(placed, 13), WORDS[:20])
+
+
+def test_default_grid_size_fits_typical_daily_words():
+    words = ["GARDEN", "WINDOW", "MAISON", "CIUDAD", "MANZANA", "JOURNÉE", "BICYCLE", "TEACHER",
+             "HOSPITAL", "MOUNTAIN"]
+    size = default_grid_size(words)
+    assert size == 14  # 72 letters, 2.5 cells each
+
+    result = generate_crossword([{"word": w, "clue": ""} for w in words])
+    assert len(result["grid"]) == size
+    assert len(result["placements"]) == len(words)
+    assert_valid_layout(result, words)
+
+
+def test_default_grid_size_bounds():
+    assert default_grid_size(["CAT"]) == crossword_service.CROSSWORD_MIN_GRID_SIZE
+    assert default_grid_size(["ANTIDISESTABLISHMENTARIANISM"]) == crossword_service.CROSSWORD_MIN_GRID_SIZE
+    assert default_grid_size(["ABCDEFGHIJKL"]) == 12
+    assert default_grid_size(WORDS * 2) == default_grid_size(WORDS)
+    assert default_grid_size(["MOUNTAIN"] * 40 + [f"{w}S" for w in WORDS]) <= crossword_service.CROSSWORD_MAX_GRID_SIZE
+
+
+def test_rejects_bad_requests():
+    with pytest.raises(ValueError):
+        generate_crossword([])
+    with pytest.raises(ValueError):
+        generate_crossword([{"word": "CAT", "clue": ""}], size=crossword_service.CROSSWORD_MAX_GRID_SIZE + 1)
@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.mnemonic_cache import MnemonicCache
+from app.services import mnemonic_cache_repository, mnemonic_service
+from app.services.mnemonic_cache_repository import CacheEntry, _upsert_statement, upsert, upsert_many
+
+KEY_A = b"a" * 32
+KEY_B = b"b" * 32
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    """Session factory on a fresh SQLite file holding only mnemonic_cache."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'cache.db'}")
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(MnemonicCache.__table__.create)
+
+    asyncio.run(create())
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+async def _write(sessions, entries):
+    async with sessions() as db:
+        written = await upsert_many(db, entries)
+        await db.commit()
+    return written
+
+
+async def _rows(sessions):
+    async with sessions() as db:
+        result = await db.execute(select(MnemonicCache).order_by(MnemonicCache.cache_key))
+        return result.scalars().all()
+
+
+def _text(key, word, sentence="", language="es"):
+    return CacheEntry(key=key, language=language, mnemonic_word=word, mnemonic_sentence=sentence)
+
+
+def _image(key, digest, language="es"):
+    return CacheEntry(key=key, language=language, image_digest=digest, image_mime="image/png", image_size=3)
+
+
+def test_insert(sessions):
+    async def scenario():
+        written = await _write(sessions, [_text(KEY_A, "gato", "A cat"), _image(KEY_B, "d" * 64, "fr")])
+        return written, await _rows(sessions)
+
+    written, rows = asyncio.run(scenario())
+    assert written == 2
+    a, b = rows
+    assert (a.cache_key, a.language, a.mnemonic_word, a.mnemonic_sentence, a.image_digest) == (
+        KEY_A, "es", "gato", "A cat", None
+    )
+    # Text not generated yet is stored as the "" placeholder
+    assert (b.language, b.mnemonic_word, b.mnemonic_sentence) == ("fr", "", "")
+    assert (b.image_digest, b.image_mime, b.image_size) == ("d" * 64, "image/png", 3)
+
+
+def test_entries_for_one_key_are_merged(sessions):
+    async def scenario():
+        written = await _write(sessions, [_text(KEY_A, "gato", "A cat"), _image(KEY_A, "d" * 64)])
+        return written, await _rows(sessions)
+
+    written, rows = asyncio.run(scenario())
+    assert written == 1
+    assert len(rows) == 1
+    assert (rows[0].mnemonic_word, rows[0].image_digest) == ("gato", "d" * 64)
+
+
+def test_merge_keeps_existing_text_and_image(sessions):
+    async def scenario():
+        await _write(sessions, [_text(KEY_A, "gato", "A cat")])
+        await _write(sessions, [_image(KEY_A, "d" * 64)])
+        # Later writes fill nothing that is already set
+        await _write(sessions, [
+            CacheEntry(key=KEY_A, language="es", mnemonic_word="perro", mnemonic_sentence="A dog",
+                       image_digest="e" * 64, image_mime="image/webp", image_size=9)
+        ])
+        return await _rows(sessions)
+
+    (row,) = asyncio.run(scenario())
+    assert (row.mnemonic_word, row.mnemonic_sentence) == ("gato", "A cat")
+    assert (row.image_digest, row.image_mime, row.image_size) == ("d" * 64, "image/png", 3)
+
+
+def test_image_first_then_text_fills_text(sessions):
+    async def scenario():
+        await _write(sessions, [_image(KEY_A, "d" * 64)])
+        async with sessions() as db:
+            await upsert(db, _text(KEY_A, "gato", "A cat"))
+            await db.commit()
+        return await _rows(sessions)
+
+    (row,) = asyncio.run(scenario())
+    assert (row.mnemonic_word, row.mnemonic_sentence, row.image_digest) == ("gato", "A cat", "d" * 64)
+
+
+def test_concurrent_writers_for_one_key(sessions):
+    async def scenario():
+        # Text and image writers race on a key nobody has written yet
+        writers = [_write(sessions, [_text(KEY_A, "gato", "A cat")]), _write(sessions, [_image(KEY_A, "d" * 64)])]
+        writers += [_write(sessions, [_text(KEY_A, f"word{i}", "Other")]) for i in range(4)]
+        await asyncio.gather(*writers)
+        return await _rows(sessions)
+
+    (row,) = asyncio.run(scenario())
+    # Whichever text writer came first wins, with its own sentence; the image is merged in
+    assert (row.mnemonic_word, row.mnemonic_sentence) in {("gato", "A cat")} | {
+        (f"word{i}", "Other") for i in range(4)
+    }
+    assert row.image_digest == "d" * 64
+
+
+def test_empty_batch_writes_nothing(sessions):
+    assert asyncio.run(_write(sessions, [])) == 0
+    assert asyncio.run(_rows(sessions)) == []
+
+
+def test_unsupported_dialect_is_rejected():
+    with pytest.raises(ValueError, match="mysql"):
+        _upsert_statement("mysql", [_text(KEY_A, "gato").to_values()])
+
+
+def test_batcher_counts_failed_writes(sessions, monkeypatch):
+    async def failing_upsert_many(db, entries):
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(mnemonic_service, "AsyncSessionLocal", sessions)
+    monkeypatch.setattr(mnemonic_cache_repository, "upsert_many", failing_upsert_many)
+    errors_before = mnemonic_service.write_errors
+
+    async def scenario():
+        async with mnemonic_service.CacheWriteBatcher(max_batch=10) as writer:
+            await writer.add(_text(KEY_A, "gato", "A cat"))
+            await writer.add(_text(KEY_B, "chien", "A dog"))
+        return writer.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["batches"], stats["failed_batches"], stats["failed_rows"]) == (0, 1, 2)
+    assert mnemonic_service.write_errors == errors_before + 2
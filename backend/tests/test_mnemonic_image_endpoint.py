@@ -0,0 +1,105 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.api import mnemonic
+from app.api.mnemonic import IMMUTABLE_CACHE_CONTROL, _parse_range
+from app.core.db import get_async_db
+from app.services.blob_store import LocalBlobStore
+from app.services.response_cache import etag_matches
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(92))  # 100 bytes
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Client for the image endpoint, serving PNG from a blob store under tmp_path."""
+    store = LocalBlobStore(str(tmp_path))
+    ref = store.put(PNG)
+    monkeypatch.setattr(mnemonic, "get_blob_store", lambda: store)
+
+    async def no_db():
+        yield None
+
+    app = FastAPI()
+    app.include_router(mnemonic.router)
+    app.dependency_overrides[get_async_db] = no_db
+    with TestClient(app) as test_client:
+        test_client.digest = ref.digest
+        yield test_client
+
+
+def test_parse_range_open_ended():
+    assert _parse_range("bytes=10-", 100) == (10, 99)
+
+
+def test_parse_range_bounded_and_clamped():
+    assert _parse_range("bytes=10-19", 100) == (10, 19)
+    assert _parse_range("bytes=90-500", 100) == (90, 99)
+
+
+def test_parse_range_suffix():
+    assert _parse_range("bytes=-10", 100) == (90, 99)
+    # A suffix longer than the blob is the whole blob
+    assert _parse_range("bytes=-500", 100) == (0, 99)
+
+
+def test_parse_range_ignores_malformed_and_multi_range():
+    assert _parse_range("bytes=-", 100) is None
+    assert _parse_range("items=0-10", 100) is None
+    assert _parse_range("bytes=0-10,20-30", 100) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=150-200", "bytes=20-10"])
+def test_parse_range_out_of_range(header):
+    with pytest.raises(HTTPException) as excinfo:
+        _parse_range(header, 100)
+    assert excinfo.value.status_code == 416
+    assert excinfo.value.headers["Content-Range"] == "bytes */100"
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"other", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"other"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_full_image_is_immutable(client):
+    response = client.get(f"/mnemonic/image/{client.digest}")
+    assert response.status_code == 200
+    assert response.content == PNG
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["etag"] == f'"{client.digest}"'
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_range_request(client):
+    response = client.get(f"/mnemonic/image/{client.digest}", headers={"Range": "bytes=-10"})
+    assert response.status_code == 206
+    assert response.content == PNG[-10:]
+    assert response.headers["content-range"] == "bytes 90-99/100"
+    assert response.headers["content-length"] == "10"
+
+
+def test_unsatisfiable_range(client):
+    response = client.get(f"/mnemonic/image/{client.digest}", headers={"Range": "bytes=100-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */100"
+
+
+def test_if_none_match_returns_304(client):
+    etag = f'"{client.digest}"'
+    response = client.get(f"/mnemonic/image/{client.digest}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+
+def test_unknown_or_invalid_digest_is_404(client):
+    assert client.get(f"/mnemonic/image/{'0' * 64}").status_code == 404
+    assert client.get("/mnemonic/image/not-a-digest").status_code == 404
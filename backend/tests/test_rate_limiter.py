@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from app.services import rate_limiter
+from app.services.rate_limiter import AIMD_DECREASE, AIMD_INCREASE, AIMD_MIN_FACTOR, ModelLimiter, TokenBucket
+
+
+class FakeClock:
+    """time.monotonic() that only moves when asyncio.sleep() is awaited."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake.sleep)
+    return fake
+
+
+def test_bucket_starts_full_with_burst_capacity(clock):
+    bucket = TokenBucket(per_minute=60)
+    # 10 seconds of budget at 1 token per second
+    assert bucket.capacity == bucket.tokens == 10
+    assert bucket.wait_time(10, factor=1.0) == 0
+
+
+def test_bucket_refills_at_rate_times_factor(clock):
+    bucket = TokenBucket(per_minute=60)
+    bucket.take(10)
+    clock.now += 4
+    bucket.refill(clock.now, factor=1.0)
+    assert bucket.tokens == pytest.approx(4)
+    clock.now += 4
+    bucket.refill(clock.now, factor=0.5)
+    assert bucket.tokens == pytest.approx(6)
+    # Never above capacity
+    clock.now += 100
+    bucket.refill(clock.now, factor=1.0)
+    assert bucket.tokens == bucket.capacity
+
+
+def test_bucket_wait_time(clock):
+    bucket = TokenBucket(per_minute=60)
+    bucket.take(10)
+    assert bucket.wait_time(3, factor=1.0) == pytest.approx(3)
+    assert bucket.wait_time(3, factor=0.5) == pytest.approx(6)
+    # More than capacity only needs a full bucket
+    assert bucket.wait_time(1000, factor=1.0) == pytest.approx(10)
+
+
+def test_bucket_drain_keeps_debt(clock):
+    bucket = TokenBucket(per_minute=60)
+    bucket.take(15)
+    bucket.drain(clock.now)
+    assert bucket.tokens == pytest.approx(-5)
+    full = TokenBucket(per_minute=60)
+    full.drain(clock.now)
+    assert full.tokens == 0
+
+
+def test_acquire_paces_once_the_burst_is_spent(clock):
+    limiter = ModelLimiter("model", rpm=60, tpm=0)
+
+    async def scenario():
+        return [await limiter.acquire(100) for _ in range(12)]
+
+    waits = asyncio.run(scenario())
+    assert waits[:10] == [0.0] * 10
+    assert waits[10:] == [pytest.approx(1.0), pytest.approx(1.0)]
+    assert limiter.stats()["throttled_seconds"] == pytest.approx(2.0)
+
+
+def test_acquire_waits_for_the_token_budget(clock):
+    limiter = ModelLimiter("model", rpm=0, tpm=600)  # 10 tokens per second, 100 burst
+
+    async def scenario():
+        return await limiter.acquire(100), await limiter.acquire(50)
+
+    assert asyncio.run(scenario()) == (0.0, pytest.approx(5.0))
+
+
+def test_quota_error_halves_rate_and_honours_retry_after(clock):
+    limiter = ModelLimiter("model", rpm=60, tpm=0)
+    limiter.on_quota_error(retry_after=7)
+    assert limiter.factor == AIMD_DECREASE
+    assert limiter.quota_errors == 1
+    assert limiter.blocked_until == clock.now + 7
+
+    async def scenario():
+        return await limiter.acquire(1)
+
+    # Blocked for Retry-After, then the drained bucket refills at half rate (1 token: 2s)
+    assert asyncio.run(scenario()) == pytest.approx(7 + 2)
+
+
+def test_aimd_factor_floor_and_recovery(clock):
+    limiter = ModelLimiter("model", rpm=60, tpm=0)
+    for _ in range(20):
+        limiter.on_quota_error(retry_after=None)
+    assert limiter.factor == AIMD_MIN_FACTOR
+    assert limiter.blocked_until == 0.0
+
+    limiter.on_success()
+    assert limiter.factor == pytest.approx(AIMD_MIN_FACTOR + AIMD_INCREASE)
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.factor == 1.0
+
+
+def test_record_usage_corrects_the_estimate(clock):
+    limiter = ModelLimiter("model", rpm=0, tpm=600)
+
+    async def scenario():
+        await limiter.acquire(10)
+
+    asyncio.run(scenario())
+    limiter.record_usage(estimated_tokens=10, actual_tokens=40)
+    assert limiter.tokens.tokens == pytest.approx(100 - 40)
+    limiter.record_usage(estimated_tokens=10, actual_tokens=None)
+    assert limiter.tokens.tokens == pytest.approx(100 - 40)
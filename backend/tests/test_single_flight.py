@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from app.services import single_flight
+from app.services.single_flight import Claim, GenerationClaims, SingleFlight
+
+
+def test_one_call_per_key_under_concurrency():
+    flight = SingleFlight()
+    calls = []
+
+    async def scenario():
+        async def work(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return f"result-{key}"
+
+        callers = [flight.do(key, lambda key=key: work(key)) for key in ["a"] * 20 + ["b"] * 10]
+        return await asyncio.gather(*callers), flight.inflight()
+
+    results, inflight = asyncio.run(scenario())
+    assert sorted(calls) == ["a", "b"]
+    assert results == ["result-a"] * 20 + ["result-b"] * 10
+    assert inflight == 0
+
+
+def test_sequential_calls_are_not_coalesced():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        return [await flight.do("a", work) for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [1, 2, 3]
+
+
+def test_every_caller_gets_the_exception():
+    flight = SingleFlight()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("a", failing) for _ in range(5)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+    assert not flight.is_inflight("a")
+
+
+def test_cancelled_caller_does_not_cancel_the_work():
+    flight = SingleFlight()
+
+    async def scenario():
+        async def work():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("a", work))
+        second = asyncio.ensure_future(flight.do("a", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(scenario()) == ("done", True)
+
+
+class _Claims(GenerationClaims):
+    """GenerationClaims whose lock is taken by another worker until released is set."""
+
+    def __init__(self, released_after_attempts):
+        super().__init__()
+        self.attempts = 0
+        self.released_after_attempts = released_after_attempts
+
+    async def try_claim(self, name):
+        self.attempts += 1
+        if self.attempts > self.released_after_attempts:
+            return Claim(None, 0)
+        return None
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(single_flight, "CLAIM_POLL_SECONDS", 0.001)
+
+
+def test_claim_or_wait_returns_the_holders_result():
+    claims = _Claims(released_after_attempts=100)
+    stored = []
+
+    async def done():
+        return stored[0] if stored else None
+
+    async def scenario():
+        async def holder_finishes():
+            await asyncio.sleep(0.01)
+            stored.append("from-other-worker")
+
+        asyncio.ensure_future(holder_finishes())
+        return await claims.claim_or_wait("work", done, timeout=5)
+
+    assert asyncio.run(scenario()) == ("from-other-worker", None)
+
+
+def test_claim_or_wait_claims_once_released():
+    claims = _Claims(released_after_attempts=3)
+
+    async def done():
+        return None
+
+    result, claim = asyncio.run(claims.claim_or_wait("work", done, timeout=5))
+    assert result is None and isinstance(claim, Claim)
+    assert claims.attempts == 4
+
+
+def test_claim_or_wait_gives_up_after_timeout():
+    claims = _Claims(released_after_attempts=10 ** 9)
+
+    async def done():
+        return None
+
+    result, claim = asyncio.run(claims.claim_or_wait("work", done, timeout=0.02))
+    # Unheld claim: the caller does the work itself
+    assert result is None and isinstance(claim, Claim)
+
+
+def test_claims_are_granted_unheld_without_postgres():
+    async def scenario():
+        claims = GenerationClaims()
+        first = await claims.try_claim("work")
+        second = await claims.try_claim("work")
+        await first.release()
+        await first.release()  # releasing twice is harmless
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert isinstance(first, Claim) and isinstance(second, Claim)
@@ -4,6 +4,9 @@ import { useEffect, useState } from "react";
 import Sidebar from "@/components/Sidebar";
 import { api } from "@/lib/api";
 
+// Matches MAX_CACHED_LOOKUP_WORDS in backend/app/api/mnemonic.py
+const MAX_CACHED_LOOKUP_WORDS = 200;
+
 interface WordHistoryItem {
   word: string;
   translation: string;
@@ -68,16 +71,21 @@ export default function WordHistoryPage() {
           language: item.languageCode || (item.language === "Spanish" ? "es" : "fr"),
         }));
 
-        const response = await api("/mnemonic/get-cached", {
-          method: "POST",
-          body: JSON.stringify({
-            words: wordsToLookup,
-          }),
-        });
+        // The endpoint takes at most MAX_CACHED_LOOKUP_WORDS words per request
+        const results: CachedMnemonicData[] = [];
+        for (let start = 0; start < wordsToLookup.length; start += MAX_CACHED_LOOKUP_WORDS) {
+          const response = await api("/mnemonic/get-cached", {
+            method: "POST",
+            body: JSON.stringify({
+              words: wordsToLookup.slice(start, start + MAX_CACHED_LOOKUP_WORDS),
+            }),
+          });
+          results.push(...response.results);
+        }
 
         // Merge cached data with history
         const merged = history.map((item, index) => {
-          const cached = response.results[index];
+          const cached = results[index];
           return {
             ...item,
             mnemonic_word: cached?.mnemonic_word,